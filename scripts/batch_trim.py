@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
 """
-Batch trim all videos in a folder sequentially using ROI config.
+Batch trim all videos in a folder using ROI config.
+
+Marker scans run in a pool of long-lived worker processes (``--jobs``) that
+load the OCR model once each, instead of one trim_by_marker.py process (and
+one EasyOCR initialization) per video. FFmpeg encodes run in background
+threads of the main process, so the next video's marker scan overlaps the
+current video's encode. The final report shows per-stage timing.
 
 Usage:
     python scripts/batch_trim.py \
@@ -12,15 +18,37 @@ Usage:
         --input-dir recordings/forza_extreme \
         --roi-config recordings/forza_extreme/roi_trim_coordinates.yaml \
         --output-dir recordings/forza_extreme/trimmed_output
+
+    # Smart cut (stream-copy whole GOPs, re-encode only the edges)
+    python scripts/batch_trim.py \
+        --input-dir recordings/forza_extreme \
+        --roi-config recordings/forza_extreme/roi_trim_coordinates.yaml \
+        --trim-mode smart
+
+    # Three scan workers, two concurrent encodes
+    python scripts/batch_trim.py \
+        --input-dir recordings/forza_extreme \
+        --roi-config recordings/forza_extreme/roi_trim_coordinates.yaml \
+        --jobs 3 --encode-jobs 2
 """
 
 import argparse
+import multiprocessing
+import os
 import sys
-import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.webm'}
 
+# OCR extractor of this worker process, created once by _init_worker()
+_worker_extractor = None
+_worker_load_seconds = 0.0
+
 
 def find_videos(input_dir: Path) -> list:
     """Find all video files in directory (non-recursive)."""
@@ -31,38 +59,136 @@ def find_videos(input_dir: Path) -> list:
     return sorted(videos)
 
 
-def trim_video(video_path: Path, roi_config: str, output_path: Path) -> bool:
+def _init_worker(jobs: int):
+    """Worker process initializer: load the OCR model once."""
+    global _worker_extractor, _worker_load_seconds
+    from src.extraction.fps_ocr import FPSOCRExtractor
+
+    # Share the cores between workers instead of every worker using all of them
+    try:
+        import torch
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // jobs))
+    except ImportError:
+        pass
+
+    start = time.perf_counter()
+    _worker_extractor = FPSOCRExtractor(roi=None, use_easyocr=True)
+    _worker_load_seconds = time.perf_counter() - start
+
+
+def scan_video(task: tuple) -> dict:
     """
-    Trim a single video using the trim_by_marker script.
+    Marker scan stage of one video (runs in a worker process).
+
+    Args:
+        task: (video_path, roi_config, fps_timeline)
 
     Returns:
-        True if successful, False otherwise
+        Dictionary with video, status, marker_range, roi, timeline data and timing
     """
-    cmd = [
-        'python3',
-        'src/trim/trim_by_marker.py',
-        '--video', str(video_path),
-        '--roi-config', roi_config,
-        '--output', str(output_path)
-    ]
+    global _worker_load_seconds
+    from src.trim.trim_by_marker import resolve_marker_settings, detect_marker_range
+
+    video_path, roi_config, fps_timeline = task
+    result = {'video': video_path, 'status': 'failed', 'timing': {}}
+
+    # Model load time is reported once, with the worker's first video
+    result['timing']['model_load_seconds'] = _worker_load_seconds
+    _worker_load_seconds = 0.0
 
     print(f"\n{'='*80}")
-    print(f"Trimming: {video_path.name}")
+    print(f"Scanning: {Path(video_path).name} (worker {os.getpid()})")
     print(f"{'='*80}")
 
-    result = subprocess.run(cmd)
+    start = time.perf_counter()
+    try:
+        roi, marker_type, marker_pattern = resolve_marker_settings(video_path, roi_config)
+        timeline_step = fps_timeline if fps_timeline and marker_type == 'fps' else None
+        fps_readings = {} if timeline_step else None
+
+        marker_range = detect_marker_range(video_path, roi, marker_type, marker_pattern,
+                                           timeline_step=timeline_step, fps_readings=fps_readings,
+                                           extractor=_worker_extractor)
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+    finally:
+        result['timing']['scan_seconds'] = time.perf_counter() - start
+
+    if marker_range is None:
+        result['error'] = 'Marker never detected'
+        return result
+
+    result.update({
+        'status': 'scanned',
+        'marker_range': marker_range,
+        'roi': roi,
+        'timeline_step': timeline_step,
+        'fps_readings': fps_readings
+    })
+    return result
+
+
+def encode_video(scan: dict, output_path: Path, trim_mode: str) -> dict:
+    """
+    Encode stage of one video (runs in a background thread; FFmpeg does the work).
+
+    Args:
+        scan: scan_video() result
+        output_path: Output path for the trimmed video
+        trim_mode: 'reencode', 'smart', 'lossless' or 'virtual' (see trim_by_marker.py --trim-mode)
 
-    if result.returncode == 0:
-        print(f"✓ Success: {output_path.name}")
-        return True
+    Returns:
+        The scan dict updated with status, output and encode timing
+    """
+    from src.trim.trim_by_marker import trim_video, save_scan_fps_timeline
+    from src.video.sources import probe_video
+
+    video_path = scan['video']
+    first_frame, last_frame = scan['marker_range']
+
+    start = time.perf_counter()
+    try:
+        written = trim_video(video_path, str(output_path), first_frame, last_frame, mode=trim_mode)
+        if scan['timeline_step']:
+            save_scan_fps_timeline(written, video_path, scan['roi'], first_frame, last_frame,
+                                   scan['timeline_step'], scan['fps_readings'],
+                                   probe_video(video_path)['fps'])
+    except Exception as e:
+        scan['status'] = 'failed'
+        scan['error'] = str(e)
     else:
-        print(f"✗ Failed: {video_path.name}")
-        return False
+        scan['status'] = 'success'
+        scan['output'] = written
+    finally:
+        scan['timing']['encode_seconds'] = time.perf_counter() - start
+
+    scan.pop('fps_readings', None)
+    return scan
+
+
+def print_timing_report(results: list, wall_seconds: float):
+    """Print per-video and total time of each stage."""
+    stages = ['model_load_seconds', 'scan_seconds', 'encode_seconds']
+
+    print(f"\nStage timing (seconds):")
+    print(f"  {'Video':<40} {'OCR load':>9} {'Scan':>9} {'Encode':>9}")
+    totals = dict.fromkeys(stages, 0.0)
+    for result in results:
+        timing = result['timing']
+        row = [timing.get(stage, 0.0) for stage in stages]
+        for stage, value in zip(stages, row):
+            totals[stage] += value
+        print(f"  {Path(result['video']).name:<40} {row[0]:>9.1f} {row[1]:>9.1f} {row[2]:>9.1f}")
+    print(f"  {'Total':<40} {totals[stages[0]]:>9.1f} {totals[stages[1]]:>9.1f} {totals[stages[2]]:>9.1f}")
+
+    print(f"\nWall time: {wall_seconds:.1f}s (stage work: {sum(totals.values()):.1f}s, "
+          f"scans and encodes overlap)")
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description='Batch trim all videos in a folder sequentially',
+        description='Batch trim all videos in a folder (parallel OCR scans, background encodes)',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
@@ -76,6 +202,12 @@ Examples:
       --input-dir recordings/cyberpunk \\
       --roi-config recordings/cyberpunk/roi_trim_coordinates.yaml \\
       --output-dir recordings/cyberpunk/output
+
+  # Parallel scans with warm OCR workers
+  python scripts/batch_trim.py \\
+      --input-dir recordings/cyberpunk \\
+      --roi-config recordings/cyberpunk/roi_trim_coordinates.yaml \\
+      --jobs 3
         """
     )
     parser.add_argument('--input-dir', required=True,
@@ -84,6 +216,17 @@ Examples:
                        help='Path to ROI config YAML file')
     parser.add_argument('--output-dir', default=None,
                        help='Output directory (default: <input-dir>/trimmed)')
+    parser.add_argument('--trim-mode', choices=['reencode', 'smart', 'lossless', 'virtual'], default='reencode',
+                       help='reencode: full libx264 re-encode (default); smart: stream-copy whole GOPs, '
+                            're-encode only the edges; lossless: FFV1 .mkv, bit-exact frames; '
+                            'virtual: write .trim.json manifests instead of videos')
+    parser.add_argument('--fps-timeline', type=int, metavar='N',
+                       help='Save the FPS counter read every N frames during the marker scan '
+                            '(<video>.fps.json, picked up by run_analysis.py)')
+    parser.add_argument('--jobs', type=int, default=1,
+                       help='Marker scan worker processes, each loading the OCR model once (default: 1)')
+    parser.add_argument('--encode-jobs', type=int, default=1,
+                       help='Concurrent FFmpeg encodes in the background (default: 1)')
 
     args = parser.parse_args()
 
@@ -120,24 +263,49 @@ Examples:
     print(f"Input directory: {input_dir}")
     print(f"Output directory: {output_dir}")
     print(f"ROI config: {args.roi_config}")
+    print(f"Trim mode: {args.trim_mode}")
+    print(f"Scan workers: {args.jobs}, encode jobs: {args.encode_jobs}")
     print(f"Total videos: {len(videos)}")
     print()
 
-    successful = []
-    failed = []
-
-    for idx, video_path in enumerate(videos, 1):
+    output_paths = {}
+    for video_path in videos:
         output_path = output_dir / video_path.name
-
-        print(f"\n[{idx}/{len(videos)}] Processing: {video_path.name}")
-
-        # Trim video
-        success = trim_video(video_path, args.roi_config, output_path)
-
-        if success:
-            successful.append(video_path.name)
-        else:
-            failed.append(video_path.name)
+        if args.trim_mode == 'lossless':
+            output_path = output_path.with_suffix('.mkv')  # FFV1 needs Matroska
+        elif args.trim_mode == 'virtual':
+            output_path = output_path.with_suffix('.trim.json')
+        output_paths[str(video_path)] = output_path
+
+    tasks = [(str(video_path), args.roi_config, args.fps_timeline) for video_path in videos]
+    results = []
+    encodes = []
+    batch_start = time.perf_counter()
+
+    # Spawned workers: torch/EasyOCR are not fork-safe
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(args.jobs, initializer=_init_worker, initargs=(args.jobs,)) as pool, \
+            ThreadPoolExecutor(max_workers=args.encode_jobs) as encoder:
+        # Encodes are queued as soon as a scan finishes, while other scans continue
+        for idx, scan in enumerate(pool.imap_unordered(scan_video, tasks), 1):
+            name = Path(scan['video']).name
+            if scan['status'] == 'scanned':
+                first_frame, last_frame = scan['marker_range']
+                print(f"\n[{idx}/{len(videos)}] Scanned {name}: frames {first_frame}-{last_frame}, "
+                      f"queued for {args.trim_mode}")
+                encodes.append(encoder.submit(encode_video, scan, output_paths[scan['video']], args.trim_mode))
+            else:
+                print(f"\n[{idx}/{len(videos)}] ✗ Scan failed: {name} ({scan.get('error')})")
+                results.append(scan)
+
+        for future in encodes:
+            results.append(future.result())
+
+    wall_seconds = time.perf_counter() - batch_start
+    results.sort(key=lambda result: result['video'])
+
+    successful = [Path(r['video']).name for r in results if r['status'] == 'success']
+    failed = [Path(r['video']).name for r in results if r['status'] != 'success']
 
     # Print summary
     print(f"\n{'='*80}")
@@ -146,10 +314,13 @@ Examples:
     print(f"Successful: {len(successful)}/{len(videos)}")
     print(f"Failed: {len(failed)}/{len(videos)}")
 
+    print_timing_report(results, wall_seconds)
+
     if failed:
         print(f"\nFailed videos:")
-        for video in failed:
-            print(f"  - {video}")
+        for result in results:
+            if result['status'] != 'success':
+                print(f"  - {Path(result['video']).name}: {result.get('error')}")
         sys.exit(1)
     else:
         print(f"\n✓ All videos trimmed successfully!")
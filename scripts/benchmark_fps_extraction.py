@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark FPS OCR frame reading: per-frame seeking vs forward streaming.
+
+The old FPSOCRExtractor.extract_from_video() seeked (CAP_PROP_POS_FRAMES)
+before every sampled frame, which makes H.264 decode from the previous
+keyframe each time. The current extractor streams forward through frame
+sources. This script times both read paths on the same video and ROI and
+checks that they deliver the same ROI pixels.
+
+Usage:
+    python scripts/benchmark_fps_extraction.py \
+        --video recordings/cyberpunk/4k_dlaa_run1.mp4 \
+        --roi 1700,50,200,80 \
+        --sample-rate 1 \
+        --max-frames 3000
+
+    # Include OCR time (EasyOCR) for the first 200 sampled frames
+    python scripts/benchmark_fps_extraction.py --video ... --roi ... --ocr --max-frames 200
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.video.sources import open_frame_source, FRAME_SOURCE_BACKENDS
+
+
+def iter_seek_rois(video_path: str, roi: tuple, sample_rate: int, max_frames: int):
+    """Previous read path: seek to every sampled frame, then read it."""
+    x, y, w, h = roi
+    cap = cv2.VideoCapture(video_path)
+    try:
+        for frame_idx in range(0, max_frames, sample_rate):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame_idx, frame[y:y+h, x:x+w]
+    finally:
+        cap.release()
+
+
+def iter_stream_rois(video_path: str, roi: tuple, sample_rate: int, max_frames: int, decoder: str):
+    """Current read path: forward scan through a frame source."""
+    x, y, w, h = roi
+    with open_frame_source(video_path, backend=decoder, sample_rate=sample_rate,
+                           max_frames=max_frames) as source:
+        for frame_idx, frame in source:
+            yield frame_idx, frame[y:y+h, x:x+w]
+
+
+def run_path(name: str, rois, ocr_extractor=None) -> dict:
+    """Consume a ROI iterator, optionally running OCR on every ROI."""
+    digests = {}
+    start = time.perf_counter()
+    for frame_idx, roi_img in rois:
+        if ocr_extractor is not None:
+            ocr_extractor.read_fps_from_roi(roi_img)
+        digests[frame_idx] = hashlib.blake2b(roi_img.tobytes(), digest_size=8).hexdigest()
+    elapsed = time.perf_counter() - start
+
+    frames = len(digests)
+    fps = frames / elapsed if elapsed > 0 else 0.0
+    print(f"  {name:<16} {frames:>7} frames  {elapsed:>8.2f}s  {fps:>8.1f} frames/s")
+    return {'name': name, 'frames': frames, 'seconds': round(elapsed, 3),
+            'frames_per_second': round(fps, 2), 'digests': digests}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark FPS OCR frame reading (seek per frame vs forward streaming)',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--video', required=True, help='Video with FPS overlay (ideally a long 4K recording)')
+    parser.add_argument('--roi', required=True, help='ROI as "x,y,width,height"')
+    parser.add_argument('--sample-rate', type=int, default=1,
+                        help='Process every Nth frame (default: 1)')
+    parser.add_argument('--max-frames', type=int,
+                        help='Only read frames before this index (default: whole video)')
+    parser.add_argument('--decoders', nargs='+', choices=FRAME_SOURCE_BACKENDS, default=['opencv', 'ffmpeg'],
+                        help='Streaming backends to benchmark (default: opencv ffmpeg)')
+    parser.add_argument('--skip-seek', action='store_true',
+                        help='Skip the (slow) per-frame seek baseline')
+    parser.add_argument('--ocr', action='store_true',
+                        help='Include EasyOCR time per sampled frame')
+    parser.add_argument('--output', type=Path, help='Save results to JSON file')
+
+    args = parser.parse_args()
+
+    x, y, w, h = map(int, args.roi.split(','))
+    roi = (x, y, w, h)
+
+    cap = cv2.VideoCapture(args.video)
+    if not cap.isOpened():
+        print(f"❌ Cannot open video: {args.video}")
+        return 1
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+
+    max_frames = min(args.max_frames, total_frames) if args.max_frames else total_frames
+
+    ocr_extractor = None
+    if args.ocr:
+        from src.extraction.fps_ocr import FPSOCRExtractor
+        # No OCR memo: every run has to pay for OCR on the same crops
+        ocr_extractor = FPSOCRExtractor(roi=roi, use_easyocr=True, memo_mode=None)
+
+    print("=" * 80)
+    print("FPS Extraction Read Benchmark")
+    print("=" * 80)
+    print(f"Video:       {args.video} ({width}x{height}, {total_frames} frames)")
+    print(f"ROI:         x={x}, y={y}, w={w}, h={h}")
+    print(f"Frames:      0-{max_frames} every {args.sample_rate}")
+    print(f"OCR:         {'EasyOCR' if args.ocr else 'off (read + crop only)'}")
+    print()
+
+    runs = []
+    if not args.skip_seek:
+        runs.append(run_path('seek (before)', iter_seek_rois(args.video, roi, args.sample_rate, max_frames),
+                             ocr_extractor))
+    for decoder in args.decoders:
+        runs.append(run_path(f'stream {decoder}',
+                             iter_stream_rois(args.video, roi, args.sample_rate, max_frames, decoder),
+                             ocr_extractor))
+
+    baseline = runs[0]
+    print()
+    for run in runs[1:]:
+        speedup = run['frames_per_second'] / baseline['frames_per_second'] if baseline['frames_per_second'] else 0
+        mismatched = sum(1 for idx, digest in run['digests'].items()
+                         if baseline['digests'].get(idx) not in (None, digest))
+        print(f"  {run['name']:<16} {speedup:>5.1f}x vs {baseline['name']}, "
+              f"{mismatched} ROI(s) differ")
+        run['speedup'] = round(speedup, 2)
+        run['mismatched_rois'] = mismatched
+
+    if args.output:
+        for run in runs:
+            run.pop('digests')
+        with open(args.output, 'w') as f:
+            json.dump({
+                'video': args.video,
+                'resolution': f"{width}x{height}",
+                'roi': list(roi),
+                'sample_rate': args.sample_rate,
+                'max_frames': max_frames,
+                'ocr': args.ocr,
+                'runs': runs
+            }, f, indent=2)
+        print(f"\n✓ Results saved to: {args.output}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -26,6 +26,11 @@ import yaml
 from pathlib import Path
 from typing import Optional, Tuple
 
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.video.sources import probe_video, read_frame
+
 
 def extract_middle_frame(video_path: str) -> Tuple[any, int, float, int, int]:
     """
@@ -34,22 +39,18 @@ def extract_middle_frame(video_path: str) -> Tuple[any, int, float, int, int]:
     Returns:
         (frame, frame_index, timestamp, width, height)
     """
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise RuntimeError(f"Cannot open video: {video_path}")
-
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    # Exact frame count and frame-exact seek when the video has a frame index
+    video_info = probe_video(video_path)
+    total_frames = video_info['frame_count']
+    fps = video_info['fps']
+    width = video_info['width']
+    height = video_info['height']
 
     # Get middle frame (50% position)
     middle_frame_idx = total_frames // 2
-    cap.set(cv2.CAP_PROP_POS_FRAMES, middle_frame_idx)
-    ret, frame = cap.read()
-    cap.release()
+    frame = read_frame(video_path, middle_frame_idx)
 
-    if not ret:
+    if frame is None:
         raise RuntimeError(f"Failed to read middle frame")
 
     timestamp = middle_frame_idx / fps
@@ -20,8 +20,16 @@ import os
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.metrics.frame.perceptual import AdvancedMetrics, compute_all_metrics, LPIPS_AVAILABLE
+from src.metrics.frame.perceptual import (
+    AdvancedMetrics, compute_all_metrics, compute_optical_flow_consistency, LPIPS_AVAILABLE
+)
 from src.metrics.frame.basic import BasicMetricsGPU, TORCH_AVAILABLE, PYTORCH_MSSSIM_AVAILABLE
+from src.video.sources import open_frame_source, probe_video, FRAME_SOURCE_BACKENDS
+from src.video.prefetch import PrefetchingFrameReader, iter_lockstep
+from src.video.frame_store import DecodedFrameStore
+from src.metrics.frame.reference_cache import ReferenceFeatureCache
+from src.extraction.fps_cache import FPSTimelineCache
+from src.metrics.streaming_stats import StreamingStats
 
 # Check for torch availability (for GPU detection) - already imported above via basic.py
 # (removing duplicate import check)
@@ -78,15 +86,29 @@ def parse_fps_roi(roi_arg: str = None) -> tuple:
 def extract_fps_from_video(
     video_path: str,
     roi: tuple = None,
-    sample_rate: int = 1
+    sample_rate: int = 1,
+    ocr_mode: str = 'detect',
+    digit_templates: int = 0,
+    fps_cache=None,
+    ocr_gate: float = None
 ) -> tuple:
     """
     Extract FPS data from video with FPS overlay.
 
+    Uses the FPS timeline sidecar (``<video>.fps.json``) written by the trim
+    step, or a timeline in the FPS cache, when present instead of running OCR
+    again. OCR results are added to the cache.
+
     Args:
         video_path: Path to video with FPS counter
         roi: Optional ROI as (x, y, width, height)
         sample_rate: Extract every Nth frame
+        ocr_mode: EasyOCR mode ('detect' or 'recognize', see FPSOCRExtractor)
+        digit_templates: OCR readings to calibrate the digit template recognizer
+            on (0 = EasyOCR only, see FPSOCRExtractor)
+        fps_cache: Optional FPSTimelineCache
+        ocr_gate: Carry the last reading forward while less than this fraction
+            of the ROI pixels changed (see ocr_gate.py; None = OCR every crop)
 
     Returns:
         Tuple of (fps_data_list, detected_roi)
@@ -95,6 +117,7 @@ def extract_fps_from_video(
         FPSExtractionError: If extraction fails
     """
     from src.extraction.fps_ocr import FPSOCRExtractor
+    from src.extraction.fps_cache import extractor_engine_name
 
     print(f"  Extracting FPS from: {Path(video_path).name}")
 
@@ -102,7 +125,13 @@ def extract_fps_from_video(
         raise FPSExtractionError(f"Video file not found: {video_path}")
 
     try:
-        extractor = FPSOCRExtractor(roi=roi, use_easyocr=True)
+        loaded = load_stored_fps(video_path, roi, sample_rate, ocr_mode, digit_templates, fps_cache, ocr_gate)
+        if loaded is not None:
+            return loaded
+
+        video_info = probe_video(video_path)
+        extractor = FPSOCRExtractor(roi=roi, use_easyocr=True, ocr_mode=ocr_mode,
+                                    digit_templates=digit_templates, gate_threshold=ocr_gate)
         fps_data, _ = extractor.extract_from_video(
             Path(video_path),
             sample_rate=sample_rate
@@ -115,15 +144,66 @@ def extract_fps_from_video(
 
         print(f"  ✓ Extracted {len(fps_data)} FPS measurements")
 
+        if fps_cache is not None:
+            fps_cache.put(video_path, detected_roi, sample_rate, extractor_engine_name(extractor), fps_data,
+                          extractor.calculate_statistics(fps_data), video_info['frame_count'])
+
         if detected_roi:
             print(f"  ✓ ROI: x={detected_roi[0]}, y={detected_roi[1]}, w={detected_roi[2]}, h={detected_roi[3]}")
 
         return fps_data, detected_roi
 
+    except FPSExtractionError:
+        raise
     except Exception as e:
         raise FPSExtractionError(f"FPS extraction failed: {e}")
 
 
+def load_stored_fps(
+    video_path: str,
+    roi: tuple = None,
+    sample_rate: int = 1,
+    ocr_mode: str = 'detect',
+    digit_templates: int = 0,
+    fps_cache=None,
+    ocr_gate: float = None
+):
+    """
+    FPS data of a video from its timeline sidecar or the FPS cache, without OCR.
+
+    Args: see extract_fps_from_video()
+
+    Returns:
+        Tuple of (fps_data_list, roi), or None if neither has it
+
+    Raises:
+        FPSExtractionError: If the video or its sidecar cannot be read
+    """
+    from src.extraction.fps_timeline import load_fps_timeline, fps_timeline_path
+    from src.extraction.fps_cache import ocr_engine_name
+
+    try:
+        video_fps = probe_video(video_path)['fps']
+        timeline = load_fps_timeline(video_path, sample_rate, video_fps)
+    except (RuntimeError, OSError) as e:
+        raise FPSExtractionError(f"FPS extraction failed: {e}")
+    if timeline is not None:
+        fps_data, timeline_roi = timeline
+        print(f"  ✓ Loaded {len(fps_data)} FPS measurements from {fps_timeline_path(video_path).name} "
+              f"(trim scan, OCR skipped)")
+        if fps_data:
+            return fps_data, timeline_roi
+
+    if fps_cache is not None:
+        cached = fps_cache.get(video_path, sample_rate, video_fps, roi=roi,
+                               engine=ocr_engine_name(True, ocr_mode, digit_templates, gate_threshold=ocr_gate))
+        if cached is not None and cached[0]:
+            print(f"  ✓ Loaded {len(cached[0])} FPS measurements from the FPS cache (OCR skipped)")
+            return cached
+
+    return None
+
+
 def build_fps_lookup(fps_data_list: list) -> dict:
     """
     Build frame index -> FPS data lookup dict for O(1) access.
@@ -181,89 +261,19 @@ def export_per_frame_to_csv(per_frame_data: dict, output_path: str):
     print(f"  Columns: {', '.join(fieldnames)}")
 
 
-def compare_alignment_quality(
-    video1_path: str,
-    video2_path: str,
-    alignment_name: str,
-    sample_rate: int = 1,
-    compute_advanced: bool = True,
-    use_gpu: bool = True,
-    extract_fps: bool = False,
-    fps_video1: str = None,
-    fps_video2: str = None,
-    fps_roi: tuple = None,
-    fps_sample_rate: int = 1,
-    store_per_frame: bool = True
-):
+def _init_metric_engines(use_gpu: bool, compute_advanced: bool, metric_batch_size: int = 1) -> tuple:
     """
-    Compare two aligned videos frame-by-frame.
+    Set up GPU basic metrics and advanced metrics.
 
     Args:
-        video1_path: Path to first video (reference/ground truth)
-        video2_path: Path to second video (distorted/to evaluate)
-        alignment_name: Name of alignment method (for display)
-        sample_rate: Sample every Nth frame for frame-by-frame metrics (1 = all frames)
-        compute_advanced: Enable advanced metrics (LPIPS, FLIP, optical flow)
-        use_gpu: Use GPU acceleration for LPIPS if available
-        extract_fps: Extract FPS data from source videos with overlays
-        fps_video1: Path to source video with FPS overlay for video1 (if different from video1)
-        fps_video2: Path to source video with FPS overlay for video2 (if different from video2)
-        fps_roi: ROI as (x, y, width, height) or None for auto-detection
-        fps_sample_rate: FPS extraction sample rate (1 = every frame)
-        store_per_frame: Store per-frame data in output dict (vs only CSV)
+        use_gpu: Use CUDA if available
+        compute_advanced: Set up LPIPS, FLIP and optical flow
+        metric_batch_size: Frame pairs per metric batch; above 1 the basic
+            metrics run on torch even without CUDA (batched on the CPU)
 
     Returns:
-        Dictionary with metrics
+        Tuple of (BasicMetricsGPU or None, AdvancedMetrics or None)
     """
-    print(f"\n{'='*80}")
-    print(f"Analyzing: {alignment_name}".center(80))
-    print(f"{'='*80}")
-
-    # FPS extraction (if enabled)
-    fps_lookup_v1 = None
-    fps_lookup_v2 = None
-    fps_roi_used = None
-
-    if extract_fps:
-        print(f"\n{'='*80}")
-        print("Extracting FPS Data".center(80))
-        print(f"{'='*80}\n")
-
-        try:
-            if fps_video1:
-                fps_data_v1, roi_v1 = extract_fps_from_video(
-                    fps_video1, fps_roi, fps_sample_rate
-                )
-                fps_lookup_v1 = build_fps_lookup(fps_data_v1)
-                fps_roi_used = roi_v1
-
-            if fps_video2:
-                fps_data_v2, roi_v2 = extract_fps_from_video(
-                    fps_video2, fps_roi, fps_sample_rate
-                )
-                fps_lookup_v2 = build_fps_lookup(fps_data_v2)
-                fps_roi_used = fps_roi_used or roi_v2
-
-        except FPSExtractionError as e:
-            print(f"\n⚠️  {e}")
-            print("Continuing with quality comparison only...\n")
-            extract_fps = False
-
-    cap1 = cv2.VideoCapture(video1_path)
-    cap2 = cv2.VideoCapture(video2_path)
-
-    total_frames1 = int(cap1.get(cv2.CAP_PROP_FRAME_COUNT))
-    total_frames2 = int(cap2.get(cv2.CAP_PROP_FRAME_COUNT))
-
-    frames_to_compare = min(total_frames1, total_frames2)
-
-    print(f"\nVideo 1: {Path(video1_path).name}")
-    print(f"  Frames: {total_frames1}")
-    print(f"\nVideo 2: {Path(video2_path).name}")
-    print(f"  Frames: {total_frames2}")
-    print(f"\nComparing: {frames_to_compare} frames (sampling every {sample_rate} frame)")
-
-    # Initialize advanced metrics if requested
     advanced_metrics = None
     basic_metrics_gpu = None
     device = 'cpu'
@@ -287,6 +297,16 @@ def compare_alignment_quality(
         else:
             print("\n⚠️  GPU requested but CUDA not available, using CPU")
 
+    if metric_batch_size > 1:
+        if basic_metrics_gpu is None and TORCH_AVAILABLE:
+            import torch
+            basic_metrics_gpu = BasicMetricsGPU(device='cpu')
+            print(f"\n✓ Basic metrics (SSIM/MSE/PSNR): torch on CPU ({torch.get_num_threads()} threads)")
+        if basic_metrics_gpu is not None:
+            print(f"  • Batched: {metric_batch_size} frame pairs per metric pass")
+        else:
+            print("\n⚠️  Batched metrics need PyTorch, computing one frame pair at a time")
+
     if compute_advanced:
         advanced_metrics = AdvancedMetrics(device=device)
         print(f"\n✓ Advanced metrics initialized (device: {device})")
@@ -299,198 +319,298 @@ def compare_alignment_quality(
 
     print()
 
-    # Metric storage
-    ssim_scores = []
-    mse_scores = []
-    psnr_scores = []
-    lpips_scores = []
-    flip_scores = []
-    optical_flow_diffs = []
+    return basic_metrics_gpu, advanced_metrics
 
-    # Per-frame data storage
-    per_frame_data_list = []
 
-    # Frame history for temporal metrics (need t-1, t, t+1)
-    frame1_history = []
-    frame2_history = []
+class _ComparisonTarget:
+    """Metric accumulation for one compare video streamed against the reference."""
 
-    frame_idx = 0
-    compared_count = 0
+    def __init__(self, video2_path: str, alignment_name: str, fps_video2: str = None):
+        self.video2_path = video2_path
+        self.alignment_name = alignment_name
+        self.fps_video2 = fps_video2
 
-    pbar = tqdm(total=frames_to_compare, desc="Comparing frames", unit="frame")
+        self.reader = None
+        self.frames_to_compare = 0
+        self.fps_lookup = None
+        self.fps_roi = None
+        self.fps_stream = None  # FPSStream in fused FPS mode
 
-    while frame_idx < frames_to_compare:
-        # Read frames
-        ret1, frame1 = cap1.read()
-        ret2, frame2 = cap2.read()
-
-        if not ret1 or not ret2:
-            break
-
-        # Sample frames
-        if frame_idx % sample_rate == 0:
-            # Compute basic metrics (SSIM, MSE, PSNR)
-            if basic_metrics_gpu is not None:
-                # GPU-accelerated path
-                gpu_results = basic_metrics_gpu.compute_all(frame1, frame2)
-                ssim_score = gpu_results['ssim']
-                mse = gpu_results['mse']
-                psnr = gpu_results['psnr']
-            else:
-                # CPU fallback path
-                gray1 = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
-                gray2 = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
-
-                # Compute SSIM
-                ssim_score = ssim(gray1, gray2)
-
-                # Compute MSE
-                mse = np.mean((frame1.astype(float) - frame2.astype(float)) ** 2)
-
-                # Compute PSNR
-                psnr = cv2.PSNR(frame1, frame2)
-
-            ssim_scores.append(ssim_score)
-            mse_scores.append(mse)
-            psnr_scores.append(psnr)
-
-            # Advanced metrics
-            if compute_advanced and advanced_metrics is not None:
-                # Maintain frame history (need 3 frames for optical flow)
-                frame1_history.append(frame1.copy())
-                frame2_history.append(frame2.copy())
-
-                if len(frame1_history) > 3:
-                    frame1_history.pop(0)
-                    frame2_history.pop(0)
-
-                # Compute advanced metrics (need at least 3 frames for optical flow)
-                prev1 = frame1_history[-2] if len(frame1_history) >= 2 else None
-                prev2 = frame2_history[-2] if len(frame2_history) >= 2 else None
-                next1 = frame1_history[-1] if len(frame1_history) >= 3 else None
-                next2 = frame2_history[-1] if len(frame2_history) >= 3 else None
-
-                adv_results = compute_all_metrics(
-                    frame1, frame2,
-                    prev_frame1=prev1, prev_frame2=prev2,
-                    next_frame1=next1, next_frame2=next2,
-                    metrics_instance=advanced_metrics
-                )
-
-                if 'lpips' in adv_results:
-                    lpips_scores.append(adv_results['lpips'])
-                if 'flip' in adv_results:
-                    flip_scores.append(adv_results['flip'])
-                if 'optical_flow' in adv_results:
-                    optical_flow_diffs.append(adv_results['optical_flow']['difference'])
-
-            # Collect per-frame data (if requested)
-            if store_per_frame:
-                frame_data = {
-                    'frame_index': frame_idx,
-                    'timestamp': round(frame_idx / cap2.get(cv2.CAP_PROP_FPS), 3),
-                    'ssim': float(ssim_score),
-                    'mse': float(mse),
-                    'psnr': float(psnr)
-                }
-
-                # Add FPS from video2 if available (only if FPS extraction enabled)
-                if extract_fps and fps_lookup_v2 and frame_idx in fps_lookup_v2:
-                    fps_entry = fps_lookup_v2[frame_idx]
-                    frame_data['fps'] = fps_entry['fps']
-                    frame_data['fps_interpolated'] = fps_entry.get('interpolated', False)
-
-                # Add advanced metrics if computed
-                if 'lpips' in adv_results:
-                    frame_data['lpips'] = adv_results['lpips']
-                if 'flip' in adv_results:
-                    frame_data['flip'] = adv_results['flip']
-                if 'optical_flow' in adv_results:
-                    frame_data['optical_flow'] = adv_results['optical_flow']['difference']
-
-                per_frame_data_list.append(frame_data)
-
-            compared_count += 1
-
-        frame_idx += 1
-        pbar.update(1)
+        # Metric summaries, updated per frame (bounded memory on long captures)
+        self.ssim_scores = StreamingStats()
+        self.mse_scores = StreamingStats()
+        self.psnr_scores = StreamingStats()
+        self.lpips_scores = StreamingStats()
+        self.flip_scores = StreamingStats()
+        self.optical_flow_diffs = StreamingStats()
 
-    pbar.close()
-    cap1.release()
-    cap2.release()
-
-    # Calculate statistics
-    ssim_array = np.array(ssim_scores)
-    mse_array = np.array(mse_scores)
-    psnr_array = np.array(psnr_scores)
-
-    results = {
-        "alignment_method": alignment_name,
-        "video1": str(video1_path),
-        "video2": str(video2_path),
-        "frames_compared": compared_count,
-        "metrics": {
-            "ssim": {
-                "mean": float(np.mean(ssim_array)),
-                "std": float(np.std(ssim_array)),
-                "min": float(np.min(ssim_array)),
-                "max": float(np.max(ssim_array)),
-                "median": float(np.median(ssim_array))
-            },
-            "mse": {
-                "mean": float(np.mean(mse_array)),
-                "std": float(np.std(mse_array)),
-                "min": float(np.min(mse_array)),
-                "max": float(np.max(mse_array)),
-                "median": float(np.median(mse_array))
-            },
-            "psnr": {
-                "mean": float(np.mean(psnr_array)),
-                "std": float(np.std(psnr_array)),
-                "min": float(np.min(psnr_array)),
-                "max": float(np.max(psnr_array)),
-                "median": float(np.median(psnr_array))
-            }
-        }
-    }
+        # Per-frame data storage
+        self.per_frame_data_list = []
 
-    # Add advanced metrics if computed
-    if compute_advanced:
-        if lpips_scores:
-            lpips_array = np.array(lpips_scores)
-            results["metrics"]["lpips"] = {
-                "mean": float(np.mean(lpips_array)),
-                "std": float(np.std(lpips_array)),
-                "min": float(np.min(lpips_array)),
-                "max": float(np.max(lpips_array)),
-                "median": float(np.median(lpips_array))
-            }
+        # Frame history for temporal metrics (need t-1, t, t+1)
+        self.frame_history = []
+
+        # Pairs awaiting batched metric evaluation: (frame_idx, optical flow result)
+        # and their compare frames (stack reused across batches)
+        self.pending = []
+        self.pending_frames2 = None
+
+        self.compared_count = 0
+
+    def add_frame(self, frame_idx: int, frame1: np.ndarray, frame2: np.ndarray, reference: dict,
+                  basic_metrics_gpu, advanced_metrics, store_per_frame: bool, extract_fps: bool):
+        """
+        Compare one compare-video frame against the current reference frame.
+
+        Args:
+            reference: Reference-side data computed once per reference frame
+                ('gray', 'basic', 'advanced', 'prev', 'next')
+        """
+        # Compute basic metrics (SSIM, MSE, PSNR)
+        if basic_metrics_gpu is not None:
+            # GPU-accelerated path
+            gpu_results = basic_metrics_gpu.compute_all(frame1, frame2, reference=reference['basic'])
+            ssim_score = gpu_results['ssim']
+            mse = gpu_results['mse']
+            psnr = gpu_results['psnr']
+        else:
+            # CPU fallback path
+            gray1 = reference['gray']
+            gray2 = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
+
+            # Compute SSIM
+            ssim_score = ssim(gray1, gray2)
+
+            # Compute MSE
+            mse = np.mean((frame1.astype(float) - frame2.astype(float)) ** 2)
+
+            # Compute PSNR
+            psnr = cv2.PSNR(frame1, frame2)
+
+        # Advanced metrics
+        adv_results = {}
+        if advanced_metrics is not None:
+            # Compute advanced metrics (need at least 3 frames for optical flow)
+            prev2, next2 = self._push_history(frame2)
+
+            adv_results = compute_all_metrics(
+                frame1, frame2,
+                prev_frame1=reference['prev'], prev_frame2=prev2,
+                next_frame1=reference['next'], next_frame2=next2,
+                metrics_instance=advanced_metrics,
+                reference=reference['advanced']
+            )
+
+        self._record(frame_idx, ssim_score, mse, psnr, adv_results, store_per_frame, extract_fps)
+
+    def _push_history(self, frame2: np.ndarray) -> tuple:
+        """Add a compare frame to the temporal history; returns its (prev, next) neighbours for optical flow."""
+        # Maintain frame history (need 3 frames for optical flow)
+        self.frame_history.append(frame2.copy())
+        if len(self.frame_history) > 3:
+            self.frame_history.pop(0)
+
+        prev2 = self.frame_history[-2] if len(self.frame_history) >= 2 else None
+        next2 = self.frame_history[-1] if len(self.frame_history) >= 3 else None
+        return prev2, next2
+
+    def queue_frame(self, frame_idx: int, frame1: np.ndarray, frame2: np.ndarray,
+                    reference: dict, advanced_metrics, batch_size: int):
+        """
+        Add a frame pair to the current metric batch (see _PairBatch).
+
+        The compare frame is copied into the batch stack; optical flow needs
+        the frame history in order and is computed per pair right away.
+
+        Args:
+            reference: Reference-side data (see add_frame())
+            batch_size: Pairs per batch
+        """
+        if self.pending_frames2 is None or self.pending_frames2.shape[1:] != frame2.shape:
+            self.pending_frames2 = np.empty((batch_size,) + frame2.shape, dtype=frame2.dtype)
+        # Compare videos only end early, so a target's pairs fill the first slots of the batch
+        self.pending_frames2[len(self.pending)] = frame2
+
+        optical_flow = None
+        if advanced_metrics is not None:
+            prev2, next2 = self._push_history(frame2)
+            optical_flow = compute_optical_flow_consistency(
+                frame1, frame2, reference['prev'], prev2, reference['next'], next2,
+                advanced_metrics, reference['advanced']
+            )
+        self.pending.append((frame_idx, optical_flow))
+
+    def flush_batch(self, frames1: np.ndarray, basic_reference: dict, advanced_reference: dict,
+                    references: list, basic_metrics_gpu, advanced_metrics,
+                    store_per_frame: bool, extract_fps: bool):
+        """
+        Compute the metrics of the queued frame pairs in one batch and record them.
 
-        if flip_scores:
-            flip_array = np.array(flip_scores)
-            results["metrics"]["flip"] = {
-                "mean": float(np.mean(flip_array)),
-                "std": float(np.std(flip_array)),
-                "min": float(np.min(flip_array)),
-                "max": float(np.max(flip_array)),
-                "median": float(np.median(flip_array))
+        Args:
+            frames1: Reference frame stack of the batch
+            basic_reference: BasicMetricsGPU.prepare_reference_batch(frames1)
+            advanced_reference: AdvancedMetrics.prepare_reference_batch(frames1) or None
+            references: Reference-side data per batch slot (see add_frame())
+        """
+        count = len(self.pending)
+        if count == 0:
+            return
+
+        # This target's pairs are the first `count` slots of the batch
+        frames2 = self.pending_frames2[:count]
+        if count < len(frames1):
+            frames1 = frames1[:count]
+            basic_reference = {key: value[:count] for key, value in basic_reference.items()}
+            if advanced_reference is not None:
+                advanced_reference = {key: value[:count] for key, value in advanced_reference.items()}
+
+        basic_results = basic_metrics_gpu.compute_all_batch(frames1, frames2, reference=basic_reference)
+
+        lpips_scores = None
+        flip_scores = None
+        if advanced_metrics is not None:
+            lpips_scores = advanced_metrics.compute_lpips_batch(frames1, frames2, reference=advanced_reference)
+            flip_scores = advanced_metrics.compute_flip_batch(
+                frames1, frames2, references=[reference['advanced'] for reference in references[:count]]
+            )
+
+        for i, (frame_idx, optical_flow) in enumerate(self.pending):
+            adv_results = {}
+            if lpips_scores is not None:
+                adv_results['lpips'] = float(lpips_scores[i])
+            if flip_scores is not None:
+                adv_results['flip'] = float(flip_scores[i])
+            if optical_flow is not None:
+                adv_results['optical_flow'] = optical_flow
+
+            self._record(frame_idx, float(basic_results['ssim'][i]), float(basic_results['mse'][i]),
+                         float(basic_results['psnr'][i]), adv_results, store_per_frame, extract_fps)
+        self.pending = []
+
+    def _record(self, frame_idx: int, ssim_score: float, mse: float, psnr: float, adv_results: dict,
+                store_per_frame: bool, extract_fps: bool):
+        """Add the metrics of one compared frame to the summaries and per-frame data."""
+        self.ssim_scores.add(ssim_score)
+        self.mse_scores.add(mse)
+        self.psnr_scores.add(psnr)
+
+        if 'lpips' in adv_results:
+            self.lpips_scores.add(adv_results['lpips'])
+        if 'flip' in adv_results:
+            self.flip_scores.add(adv_results['flip'])
+        if 'optical_flow' in adv_results:
+            self.optical_flow_diffs.add(adv_results['optical_flow']['difference'])
+
+        # Collect per-frame data (if requested)
+        if store_per_frame:
+            frame_data = {
+                'frame_index': frame_idx,
+                'timestamp': round(frame_idx / self.reader.fps, 3),
+                'ssim': float(ssim_score),
+                'mse': float(mse),
+                'psnr': float(psnr)
             }
 
-        if optical_flow_diffs:
-            of_array = np.array(optical_flow_diffs)
-            results["metrics"]["optical_flow_consistency"] = {
-                "mean": float(np.mean(of_array)),
-                "std": float(np.std(of_array)),
-                "min": float(np.min(of_array)),
-                "max": float(np.max(of_array)),
-                "median": float(np.median(of_array))
+            # Add FPS from video2 if available (only if FPS extraction enabled)
+            if extract_fps and self.fps_lookup and frame_idx in self.fps_lookup:
+                fps_entry = self.fps_lookup[frame_idx]
+                frame_data['fps'] = fps_entry['fps']
+                frame_data['fps_interpolated'] = fps_entry.get('interpolated', False)
+
+            # Add advanced metrics if computed
+            if 'lpips' in adv_results:
+                frame_data['lpips'] = adv_results['lpips']
+            if 'flip' in adv_results:
+                frame_data['flip'] = adv_results['flip']
+            if 'optical_flow' in adv_results:
+                frame_data['optical_flow'] = adv_results['optical_flow']['difference']
+
+            self.per_frame_data_list.append(frame_data)
+
+        self.compared_count += 1
+
+    def set_fps_data(self, fps_data: list):
+        """Add FPS to the per-frame data already collected (fused FPS OCR finishes after the metrics)."""
+        self.fps_lookup = build_fps_lookup(fps_data)
+        for frame_data in self.per_frame_data_list:
+            fps_entry = self.fps_lookup.get(frame_data['frame_index'])
+            if fps_entry is not None:
+                frame_data['fps'] = fps_entry['fps']
+                frame_data['fps_interpolated'] = fps_entry.get('interpolated', False)
+
+    def build_results(self, video1_path: str, compute_advanced: bool) -> dict:
+        """Assemble the result dict (without pipeline or per-frame sections)."""
+        results = {
+            "alignment_method": self.alignment_name,
+            "video1": str(video1_path),
+            "video2": str(self.video2_path),
+            "frames_compared": self.compared_count,
+            "metrics": {
+                "ssim": self.ssim_scores.summary(),
+                "mse": self.mse_scores.summary(),
+                "psnr": self.psnr_scores.summary()
             }
+        }
+
+        # Add advanced metrics if computed
+        if compute_advanced:
+            if self.lpips_scores.count:
+                results["metrics"]["lpips"] = self.lpips_scores.summary()
+
+            if self.flip_scores.count:
+                results["metrics"]["flip"] = self.flip_scores.summary()
 
-    # Print results
+            if self.optical_flow_diffs.count:
+                results["metrics"]["optical_flow_consistency"] = self.optical_flow_diffs.summary()
+
+        return results
+
+
+class _PairBatch:
+    """
+    Sampled frame pairs awaiting batched metric evaluation (metric_batch_size > 1).
+
+    Reference frames are collected once per batch and shared by every compare
+    video (each target queues its compare frames, see queue_frame()). When the
+    batch is full, the reference stack is uploaded once and each target
+    computes SSIM/MSE/PSNR/LPIPS/FLIP for its pairs in one tensor pass.
+    """
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.frames1 = None  # Reference frame stack (reused across batches)
+        self.references = []  # Reference-side data per slot
+
+    def __len__(self) -> int:
+        return len(self.references)
+
+    def add_reference(self, frame1: np.ndarray, reference: dict):
+        """Copy a reference frame into the next slot."""
+        if self.frames1 is None or self.frames1.shape[1:] != frame1.shape:
+            self.frames1 = np.empty((self.batch_size,) + frame1.shape, dtype=frame1.dtype)
+        self.frames1[len(self.references)] = frame1
+        self.references.append(reference)
+
+    def flush(self, targets: list, basic_metrics_gpu, advanced_metrics, store_per_frame: bool, extract_fps: bool):
+        """Compute and record the metrics of all queued pairs."""
+        if not self.references:
+            return
+
+        frames1 = self.frames1[:len(self.references)]
+        basic_reference = basic_metrics_gpu.prepare_reference_batch(frames1)
+        advanced_reference = advanced_metrics.prepare_reference_batch(frames1) if advanced_metrics is not None else None
+        for target in targets:
+            target.flush_batch(frames1, basic_reference, advanced_reference, self.references,
+                               basic_metrics_gpu, advanced_metrics, store_per_frame, extract_fps)
+        self.references = []
+
+
+def _print_results(results: dict, title: str = "RESULTS"):
+    """Print the metric summary of one comparison."""
     print("\n" + "="*80)
-    print("RESULTS".center(80))
+    print(title.center(80))
     print("="*80)
-    print(f"\nFrames Compared: {compared_count}")
+    print(f"\nFrames Compared: {results['frames_compared']}")
     print(f"\nSSIM (Structural Similarity):")
     print(f"  Mean:   {results['metrics']['ssim']['mean']:.4f}")
     print(f"  Std:    {results['metrics']['ssim']['std']:.4f}")
@@ -527,24 +647,402 @@ def compare_alignment_quality(
         print(f"  Std:    {results['metrics']['optical_flow_consistency']['std']:.2f}")
         print(f"  Median: {results['metrics']['optical_flow_consistency']['median']:.2f}")
 
-    # Add per-frame data (if requested and available)
-    if store_per_frame and per_frame_data_list:
-        results['per_frame_data'] = {
-            "enabled": True,
-            "sample_rate": sample_rate,
-            "fps_sample_rate": fps_sample_rate if extract_fps else None,
-            "fps_source_video1": fps_video1 if extract_fps else None,
-            "fps_source_video2": fps_video2 if extract_fps else None,
-            "fps_roi": {
-                "x": fps_roi_used[0],
-                "y": fps_roi_used[1],
-                "width": fps_roi_used[2],
-                "height": fps_roi_used[3]
-            } if extract_fps and fps_roi_used else None,
-            "frames": per_frame_data_list
-        }
 
-    return results
+def compare_fan_out(
+    video1_path: str,
+    comparisons: list,
+    sample_rate: int = 1,
+    compute_advanced: bool = True,
+    use_gpu: bool = True,
+    extract_fps: bool = False,
+    fps_video1: str = None,
+    fps_roi: tuple = None,
+    fps_sample_rate: int = 1,
+    fps_ocr_mode: str = 'detect',
+    fps_digit_templates: int = 0,
+    fps_ocr_gate: float = None,
+    store_per_frame: bool = True,
+    seek_threshold: int = 0,
+    prefetch_depth: int = 0,
+    decoder: str = 'opencv',
+    decoder_threads: int = 0,
+    frame_store=None,
+    reference_cache=None,
+    fps_cache=None,
+    fused_fps: bool = False,
+    metric_batch_size: int = 1
+) -> list:
+    """
+    Compare one reference video against several videos in a single pass.
+
+    The reference is decoded once and each reference frame is compared against
+    the matching frame of every compare video in lockstep. Reference-side work
+    (grayscale conversion, tensor upload, LAB/edge maps, optical flow error) is
+    done once per frame instead of once per comparison. Each comparison covers
+    min(reference frames, compare frames), exactly like compare_alignment_quality().
+
+    Args:
+        video1_path: Path to reference/ground truth video
+        comparisons: List of dicts with 'video2' (path), 'name' (alignment name)
+            and optionally 'fps_video2' (source video with FPS overlay)
+        fps_video1: Path to source video with FPS overlay for the reference
+            (recorded in per-frame data; per-frame FPS comes from the compare videos)
+        Other arguments: see compare_alignment_quality()
+
+    Returns:
+        List of result dicts (one per comparison, same format as compare_alignment_quality())
+    """
+    targets = [
+        _ComparisonTarget(c['video2'], c['name'], c.get('fps_video2'))
+        for c in comparisons
+    ]
+    if not targets:
+        return []
+
+    title = f"Analyzing: {targets[0].alignment_name}" if len(targets) == 1 else \
+        f"Fan-out: {Path(video1_path).name} vs {len(targets)} videos"
+    print(f"\n{'='*80}")
+    print(title.center(80))
+    print(f"{'='*80}")
+
+    # FPS extraction (if enabled). Only the compare videos' FPS feeds an output
+    # (per-frame data), so only those are extracted
+    fused_targets = []
+    fps_worker = None
+    if extract_fps and store_per_frame:
+        print(f"\n{'='*80}")
+        print("Extracting FPS Data".center(80))
+        print(f"{'='*80}\n")
+
+        try:
+            for target in targets:
+                target.fps_roi = fps_roi
+                if not target.fps_video2:
+                    continue
+
+                if fused_fps and Path(target.fps_video2).resolve() == Path(target.video2_path).resolve():
+                    # The overlay is in the compare video: read it from the metrics pass's frames
+                    print(f"  FPS from: {Path(target.fps_video2).name} (fused with the metrics pass)")
+                    stored = load_stored_fps(target.fps_video2, fps_roi, sample_rate, fps_ocr_mode,
+                                             fps_digit_templates, fps_cache, fps_ocr_gate)
+                    if stored is None:
+                        fused_targets.append(target)
+                        continue
+                    fps_data_v2, roi_v2 = stored
+                else:
+                    fps_data_v2, roi_v2 = extract_fps_from_video(
+                        target.fps_video2, fps_roi, fps_sample_rate, fps_ocr_mode, fps_digit_templates,
+                        fps_cache=fps_cache, ocr_gate=fps_ocr_gate
+                    )
+                target.fps_lookup = build_fps_lookup(fps_data_v2)
+                target.fps_roi = roi_v2
+
+            if fused_targets:
+                from src.extraction.fps_ocr import FPSOCRExtractor
+                from src.extraction.fps_worker import AsyncFPSReader
+
+                try:
+                    fps_worker = AsyncFPSReader(FPSOCRExtractor(roi=fps_roi, use_easyocr=True,
+                                                                ocr_mode=fps_ocr_mode,
+                                                                digit_templates=fps_digit_templates,
+                                                                gate_threshold=fps_ocr_gate))
+                except RuntimeError as e:
+                    raise FPSExtractionError(f"FPS extraction failed: {e}")
+
+        except FPSExtractionError as e:
+            print(f"\n⚠️  {e}")
+            print("Continuing with quality comparison only...\n")
+            extract_fps = False
+            fused_targets = []
+
+    # Frames are copied into the temporal history, so the ffmpeg buffer ring only
+    # has to cover frames in flight (prefetch queue + one being decoded + one in use)
+    source_options = {
+        'backend': decoder,
+        'sample_rate': sample_rate,
+        'seek_threshold': seek_threshold,
+        'threads': decoder_threads,
+        'buffer_count': prefetch_depth + 3
+    }
+    reader1 = open_frame_source(video1_path, frame_store=frame_store, **source_options)
+    for target in targets:
+        target.reader = open_frame_source(target.video2_path, **source_options)
+    for target in fused_targets:
+        target.fps_stream = fps_worker.open_stream(target.reader.fps)
+
+    # Each comparison covers the frames both videos have; the reference is
+    # decoded as far as the longest comparison needs
+    total_frames1 = reader1.frame_count
+    for target in targets:
+        target.frames_to_compare = min(total_frames1, target.reader.frame_count)
+        target.reader.max_frames = target.frames_to_compare
+    frames_to_compare = max(target.frames_to_compare for target in targets)
+    reader1.max_frames = frames_to_compare
+
+    print(f"\nVideo 1: {Path(video1_path).name}")
+    print(f"  Frames: {total_frames1}")
+    for i, target in enumerate(targets, 2):
+        print(f"\nVideo {i}: {Path(target.video2_path).name}")
+        print(f"  Frames: {target.reader.frame_count}")
+    print(f"\nComparing: {frames_to_compare} frames (sampling every {sample_rate} frame)")
+    print(f"Decoder: {decoder}")
+    if prefetch_depth > 0:
+        print(f"Prefetching: background decode, queue depth {prefetch_depth}")
+
+    basic_metrics_gpu, advanced_metrics = _init_metric_engines(use_gpu, compute_advanced, metric_batch_size)
+    batch = _PairBatch(metric_batch_size) if metric_batch_size > 1 and basic_metrics_gpu is not None else None
+
+    reference_features = None
+    if reference_cache is not None and advanced_metrics is not None:
+        reference_features = reference_cache.open(video1_path, sample_rate, decoder=decoder,
+                                                  seek_threshold=seek_threshold,
+                                                  flow_backend=advanced_metrics.flow_backend)
+
+    # Reference frame history for temporal metrics (need t-1, t, t+1)
+    frame1_history = []
+    frames_advanced = 0
+
+    pbar = tqdm(total=frames_to_compare, desc="Comparing frames", unit="frame")
+
+    # Only sampled frames are retrieved; skipped frames are grabbed without conversion
+    readers = [reader1] + [target.reader for target in targets]
+    if prefetch_depth > 0:
+        frame_tuples = PrefetchingFrameReader(readers, depth=prefetch_depth)
+    else:
+        frame_tuples = iter_lockstep(readers)
+
+    for (frame_idx, frame1), *compare_items in frame_tuples:
+        # Reference-side work, shared by every compare video
+        reference = {'gray': None, 'basic': None, 'advanced': None, 'prev': None, 'next': None}
+        if basic_metrics_gpu is not None:
+            if batch is None:  # Batches upload their reference stack at once
+                reference['basic'] = basic_metrics_gpu.prepare_reference(frame1)
+        else:
+            reference['gray'] = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
+
+        if advanced_metrics is not None:
+            frame1_history.append(frame1.copy())
+            if len(frame1_history) > 3:
+                frame1_history.pop(0)
+
+            reference['prev'] = frame1_history[-2] if len(frame1_history) >= 2 else None
+            reference['next'] = frame1_history[-1] if len(frame1_history) >= 3 else None
+            cached = reference_features.get(frame_idx) if reference_features is not None else None
+            reference['advanced'] = advanced_metrics.prepare_reference(
+                frame1, reference['prev'], reference['next'], cached=cached, batched=batch is not None
+            )
+            if reference_features is not None:
+                reference_features.put(frame_idx, reference['advanced'])
+
+        if batch is not None:
+            batch.add_reference(frame1, reference)
+
+        for target, item in zip(targets, compare_items):
+            if item is None:
+                continue  # Compare video already ended
+            if batch is not None:
+                target.queue_frame(frame_idx, frame1, item[1], reference, advanced_metrics, metric_batch_size)
+            else:
+                target.add_frame(frame_idx, frame1, item[1], reference,
+                                 basic_metrics_gpu, advanced_metrics, store_per_frame, extract_fps)
+            if target.fps_stream is not None:
+                target.fps_stream.submit(frame_idx, item[1])
+
+        if batch is not None and len(batch) == metric_batch_size:
+            batch.flush(targets, basic_metrics_gpu, advanced_metrics, store_per_frame, extract_fps)
+
+        pbar.update(frame_idx + 1 - frames_advanced)
+        frames_advanced = frame_idx + 1
+
+    if batch is not None:
+        batch.flush(targets, basic_metrics_gpu, advanced_metrics, store_per_frame, extract_fps)
+
+    pbar.close()
+    reader1.release()
+    for target in targets:
+        target.reader.release()
+
+    if frame_store is not None:
+        origin = "frame store" if reader1.stats['store_hit'] else "decoded (now stored)"
+        print(f"Reference frames: {origin}")
+
+    if reference_features is not None:
+        reference_features.save()
+        print(f"Reference features: {reference_features.stats['hits']} cached, "
+              f"{reference_features.stats['misses']} computed")
+
+    if fps_worker is not None:
+        _finish_fused_fps(fps_worker, fused_targets, sample_rate, fps_cache)
+
+    decode_pipeline = frame_tuples.stats() if prefetch_depth > 0 else None
+
+    all_results = []
+    for target in targets:
+        results = target.build_results(video1_path, compute_advanced)
+        results['ssim_backend'] = basic_metrics_gpu.ssim_backend if basic_metrics_gpu is not None else 'skimage'
+
+        # Print results
+        _print_results(results, "RESULTS" if len(targets) == 1 else f"RESULTS: {target.alignment_name}")
+
+        if decode_pipeline:
+            print(f"\nDecode Pipeline (prefetch depth {decode_pipeline['depth']}):")
+            print(f"  Mean queue occupancy: {decode_pipeline['mean_occupancy']:.2f}")
+            print(f"  Waited for frames:    {decode_pipeline['empty_fraction']*100:.1f}% of pairs "
+                  f"({decode_pipeline['consumer_wait_seconds']:.1f}s)")
+            print(f"  Decoders blocked:     {decode_pipeline['full_fraction']*100:.1f}% of frames "
+                  f"({decode_pipeline['producer_wait_seconds']:.1f}s)")
+            print(f"  Bottleneck:           {decode_pipeline['bound']}")
+            results['decode_pipeline'] = dict(decode_pipeline)
+
+        if target.fps_stream is not None:
+            results['fused_fps_ocr'] = fps_worker.report()
+
+        # Add per-frame data (if requested and available)
+        if store_per_frame and target.per_frame_data_list:
+            fps_roi_used = target.fps_roi
+            results['per_frame_data'] = {
+                "enabled": True,
+                "sample_rate": sample_rate,
+                "fps_sample_rate": (sample_rate if target.fps_stream is not None else fps_sample_rate)
+                if extract_fps else None,
+                "fps_source_video1": fps_video1 if extract_fps else None,
+                "fps_source_video2": target.fps_video2 if extract_fps else None,
+                "fps_roi": {
+                    "x": fps_roi_used[0],
+                    "y": fps_roi_used[1],
+                    "width": fps_roi_used[2],
+                    "height": fps_roi_used[3]
+                } if extract_fps and fps_roi_used else None,
+                "frames": target.per_frame_data_list
+            }
+
+        all_results.append(results)
+
+    return all_results
+
+
+def _finish_fused_fps(fps_worker, fused_targets: list, sample_rate: int, fps_cache=None):
+    """Wait for the fused FPS OCR, add FPS to the per-frame data and cache the timelines."""
+    from src.extraction.fps_cache import extractor_engine_name
+
+    extractor = fps_worker.extractor
+    for target in fused_targets:
+        try:
+            fps_data = target.fps_stream.result()
+        except RuntimeError as e:
+            print(f"\n⚠️  {Path(target.video2_path).name}: {e}")
+            continue
+
+        target.set_fps_data(fps_data)
+        target.fps_roi = extractor.roi
+
+        # Only timelines of the whole video are cached (a comparison can stop at the reference's end)
+        if fps_cache is not None and fps_data and target.frames_to_compare == target.reader.frame_count:
+            fps_cache.put(target.video2_path, extractor.roi, sample_rate, extractor_engine_name(extractor),
+                          fps_data, extractor.calculate_statistics(fps_data), target.frames_to_compare)
+    fps_worker.close()
+
+    report = fps_worker.report()
+    print(f"FPS OCR (fused): {report['crops']} crops read on the OCR thread in {report['ocr_seconds']:.1f}s, "
+          f"waited {report['result_wait_seconds']:.1f}s for it after the last frame")
+
+
+def compare_alignment_quality(
+    video1_path: str,
+    video2_path: str,
+    alignment_name: str,
+    sample_rate: int = 1,
+    compute_advanced: bool = True,
+    use_gpu: bool = True,
+    extract_fps: bool = False,
+    fps_video1: str = None,
+    fps_video2: str = None,
+    fps_roi: tuple = None,
+    fps_sample_rate: int = 1,
+    fps_ocr_mode: str = 'detect',
+    fps_digit_templates: int = 0,
+    fps_ocr_gate: float = None,
+    store_per_frame: bool = True,
+    seek_threshold: int = 0,
+    prefetch_depth: int = 0,
+    decoder: str = 'opencv',
+    decoder_threads: int = 0,
+    frame_store=None,
+    reference_cache=None,
+    fps_cache=None,
+    fused_fps: bool = False,
+    metric_batch_size: int = 1
+):
+    """
+    Compare two aligned videos frame-by-frame.
+
+    Args:
+        video1_path: Path to first video (reference/ground truth)
+        video2_path: Path to second video (distorted/to evaluate)
+        alignment_name: Name of alignment method (for display)
+        sample_rate: Sample every Nth frame for frame-by-frame metrics (1 = all frames)
+        compute_advanced: Enable advanced metrics (LPIPS, FLIP, optical flow)
+        use_gpu: Use GPU acceleration for LPIPS if available
+        extract_fps: Extract FPS data from source videos with overlays
+        fps_video1: Path to source video with FPS overlay for video1 (if different from video1)
+        fps_video2: Path to source video with FPS overlay for video2 (if different from video2)
+        fps_roi: ROI as (x, y, width, height) or None for auto-detection
+        fps_sample_rate: FPS extraction sample rate (1 = every frame)
+        fps_ocr_mode: EasyOCR mode for FPS extraction ('detect' or 'recognize')
+        fps_digit_templates: OCR readings to calibrate the digit template
+            recognizer on for FPS extraction (0 = EasyOCR only)
+        fps_ocr_gate: Skip FPS OCR while less than this fraction of the ROI
+            pixels changed, carrying the last reading (None = OCR every crop)
+        store_per_frame: Store per-frame data in output dict (vs only CSV)
+        seek_threshold: Seek instead of grabbing over gaps larger than this many
+            frames between sampled frames (0 = never seek, always frame-exact)
+        prefetch_depth: Decode both videos on background threads, buffering up to
+            this many sampled frames per video (0 = decode inline)
+        decoder: Frame source backend ('opencv' or 'ffmpeg')
+        decoder_threads: Decoder threads for the ffmpeg backend (0 = auto)
+        frame_store: Optional DecodedFrameStore for the reference video (video1),
+            so comparisons sharing a reference decode it only once
+        reference_cache: Optional ReferenceFeatureCache; reference-only metric
+            features (optical flow error, FLIP edge mask) are read from it when
+            cached and stored after the first computation
+        fps_cache: Optional FPSTimelineCache; FPS timelines are read from it
+            when cached and stored after OCR
+        fused_fps: When the FPS overlay is in the compare video itself, crop it
+            from the frames decoded for the metrics and OCR it on a background
+            thread (see fps_worker.py) instead of a separate decode pass; FPS
+            is then read at sample_rate
+        metric_batch_size: Compute SSIM/MSE/PSNR/LPIPS/FLIP for this many
+            sampled frame pairs per tensor pass (1 = one pair at a time). Runs
+            on torch also without CUDA, with the same SSIM values as the
+            scikit-image path (results record it as 'ssim_backend')
+
+    Returns:
+        Dictionary with metrics
+    """
+    return compare_fan_out(
+        video1_path,
+        [{'video2': video2_path, 'name': alignment_name, 'fps_video2': fps_video2}],
+        sample_rate=sample_rate,
+        compute_advanced=compute_advanced,
+        use_gpu=use_gpu,
+        extract_fps=extract_fps,
+        fps_video1=fps_video1,
+        fps_roi=fps_roi,
+        fps_sample_rate=fps_sample_rate,
+        fps_ocr_mode=fps_ocr_mode,
+        fps_digit_templates=fps_digit_templates,
+        fps_ocr_gate=fps_ocr_gate,
+        store_per_frame=store_per_frame,
+        seek_threshold=seek_threshold,
+        prefetch_depth=prefetch_depth,
+        decoder=decoder,
+        decoder_threads=decoder_threads,
+        frame_store=frame_store,
+        reference_cache=reference_cache,
+        fps_cache=fps_cache,
+        fused_fps=fused_fps,
+        metric_batch_size=metric_batch_size
+    )[0]
 
 
 def main():
@@ -585,6 +1083,24 @@ Advanced Metrics:
                         help='Skip advanced frame metrics (LPIPS, FLIP, optical flow)')
     parser.add_argument('--cpu', action='store_true',
                         help='Force CPU mode (no GPU acceleration for LPIPS)')
+    parser.add_argument('--decoder', choices=FRAME_SOURCE_BACKENDS, default='opencv',
+                        help='Frame decoder backend (default: opencv)')
+    parser.add_argument('--decoder-threads', type=int, default=0,
+                        help='Decoder threads for the ffmpeg backend (default: 0 = auto)')
+    parser.add_argument('--frame-store', type=str,
+                        help='Directory for the decoded reference frame store (memory-mapped, shared across runs)')
+    parser.add_argument('--frame-store-max-gb', type=float, default=50,
+                        help='Size cap of the frame store in GB (default: 50)')
+    parser.add_argument('--reference-cache', type=str,
+                        help='Directory for cached reference-only metric features (flow error, edge masks)')
+    parser.add_argument('--prefetch-depth', type=int, default=0,
+                        help='Decode videos on background threads with a queue of N frames (default: 0 = off)')
+    parser.add_argument('--metric-batch-size', type=int, default=1,
+                        help='Compute frame metrics for N sampled frame pairs per tensor pass, also on CPU '
+                             'with torch (default: 1 = one pair at a time)')
+    parser.add_argument('--seek-threshold', type=int, default=0,
+                        help='Seek instead of grabbing over gaps larger than N frames between samples '
+                             '(default: 0 = never seek)')
 
     # FPS extraction arguments
     parser.add_argument('--extract-fps', action='store_true',
@@ -597,6 +1113,21 @@ Advanced Metrics:
                         help='ROI as "x,y,width,height" or path to fps_roi.json. Omit for auto-detection.')
     parser.add_argument('--fps-sample-rate', type=int, default=1,
                         help='FPS extraction sample rate (1=every frame, default: 1)')
+    parser.add_argument('--fps-ocr-mode', choices=['detect', 'recognize'], default='detect',
+                        help='EasyOCR mode: detect (text detection on every crop) or recognize '
+                             '(recognition only, much faster on CPU) (default: detect)')
+    parser.add_argument('--fused-fps', action='store_true',
+                        help='OCR the FPS overlay of video2 from the frames decoded for the metrics, on a '
+                             'background thread (no separate OCR pass; FPS read at --sample-rate; '
+                             '--fps-video2 defaults to video2)')
+    parser.add_argument('--fps-cache', type=str,
+                        help='Directory for cached FPS timelines (shared across comparisons and runs)')
+    parser.add_argument('--fps-digit-templates', type=int, nargs='?', const=200, default=0, metavar='N',
+                        help='Read the FPS counter by glyph template matching, calibrated on the first N '
+                             'OCR readings (EasyOCR fallback; N defaults to 200; default: off)')
+    parser.add_argument('--fps-ocr-gate', type=float, metavar='FRACTION',
+                        help='Skip FPS OCR and carry the last reading while less than this fraction of the '
+                             'ROI pixels changed (e.g. 0.005 for a tight ROI; default: off)')
     parser.add_argument('--export-csv', type=str,
                         help='Export per-frame data to CSV file for plotting/analysis')
     parser.add_argument('--no-per-frame-data', action='store_true',
@@ -604,6 +1135,13 @@ Advanced Metrics:
 
     args = parser.parse_args()
 
+    frame_store = None
+    if args.frame_store:
+        frame_store = DecodedFrameStore(args.frame_store, int(args.frame_store_max_gb * 1024**3))
+
+    reference_cache = ReferenceFeatureCache(args.reference_cache) if args.reference_cache else None
+    fps_cache = FPSTimelineCache(args.fps_cache) if args.fps_cache else None
+
     # Parse FPS ROI if provided
     fps_roi = parse_fps_roi(args.fps_roi) if hasattr(args, 'fps_roi') and args.fps_roi else None
 
@@ -616,10 +1154,22 @@ Advanced Metrics:
         use_gpu=not args.cpu,
         extract_fps=args.extract_fps if hasattr(args, 'extract_fps') else False,
         fps_video1=args.fps_video1 if hasattr(args, 'fps_video1') else None,
-        fps_video2=args.fps_video2 if hasattr(args, 'fps_video2') else None,
+        fps_video2=args.fps_video2 or (args.video2 if args.fused_fps else None),
         fps_roi=fps_roi,
         fps_sample_rate=args.fps_sample_rate if hasattr(args, 'fps_sample_rate') else 1,
-        store_per_frame=not args.no_per_frame_data if hasattr(args, 'no_per_frame_data') else True
+        fps_ocr_mode=args.fps_ocr_mode,
+        fps_digit_templates=args.fps_digit_templates,
+        fps_ocr_gate=args.fps_ocr_gate,
+        store_per_frame=not args.no_per_frame_data if hasattr(args, 'no_per_frame_data') else True,
+        seek_threshold=args.seek_threshold,
+        prefetch_depth=args.prefetch_depth,
+        decoder=args.decoder,
+        decoder_threads=args.decoder_threads,
+        frame_store=frame_store,
+        reference_cache=reference_cache,
+        fps_cache=fps_cache,
+        fused_fps=args.fused_fps,
+        metric_batch_size=args.metric_batch_size
     )
 
     if args.output:
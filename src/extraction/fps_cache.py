@@ -0,0 +1,201 @@
+"""
+Persistent cache of FPS timelines.
+
+FPS extraction is the slowest step of an analysis run, and its result only
+depends on the video and the OCR setup. Timelines are stored in a cache
+directory, keyed by the video's content fingerprint, the ROI, the sample
+rate and the OCR engine, so every later comparison, temporal.py and
+fps_quality_correlation.py read them back instead of running OCR again.
+
+One ``<fingerprint>_<roi>_s<rate>_<engine>.fps.json`` file per key uses the
+FPS timeline sidecar schema (see fps_timeline.py) plus 'engine' and
+'version'. A timeline read every N frames also serves sample rates that are
+multiples of N.
+
+The engine name covers every option that changes readings. Options that
+carry or skip readings (change gate, perceptual memo, OSD refresh sampling)
+are appended after a '+', so such timelines are only returned to lookups
+that ask for that exact engine, never to lookups that accept any engine.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.extraction.fps_timeline import FPS_TIMELINE_SUFFIX, resample_fps_data
+from src.video.fingerprint import file_fingerprint
+
+# Bumped when the meaning of cache keys changes; entries of other versions are ignored
+# (version 2: engine names include the change gate, memo mode and OSD refresh sampling)
+FPS_CACHE_VERSION = 2
+
+# Separates engine name parts of options that carry or skip readings
+LOSSY_ENGINE_MARK = '+'
+
+
+def ocr_engine_name(use_easyocr: bool = True, ocr_mode: str = 'detect', digit_templates: int = 0,
+                    gate_threshold: Optional[float] = None, memo_mode: Optional[str] = 'exact',
+                    osd_refresh: bool = False, tesseract_montage: bool = False) -> str:
+    """
+    Cache key part for the OCR setup that produced a timeline.
+
+    Args:
+        use_easyocr: EasyOCR (True) or Tesseract (False)
+        ocr_mode: EasyOCR mode ('detect' or 'recognize')
+        digit_templates: Digit template calibration readings (0 = off)
+        gate_threshold: OCR change gate threshold (None = off)
+        memo_mode: OCR memo mode ('exact', 'perceptual' or None)
+        osd_refresh: One OCR'd frame per OSD refresh (see osd_refresh.py)
+        tesseract_montage: Tesseract montage recognition
+
+    Returns:
+        Engine name such as 'easyocr-detect', 'tesseract-montage-templates' or
+        'easyocr-recognize+gate0.005+perceptual'
+    """
+    if use_easyocr:
+        name = f"easyocr-{ocr_mode}"
+    else:
+        name = "tesseract-montage" if tesseract_montage else "tesseract"
+    if digit_templates:
+        name += "-templates"
+
+    if gate_threshold:
+        name += f"{LOSSY_ENGINE_MARK}gate{gate_threshold:g}"
+    if memo_mode == 'perceptual':
+        name += f"{LOSSY_ENGINE_MARK}perceptual"
+    if osd_refresh:
+        name += f"{LOSSY_ENGINE_MARK}refresh"
+    return name
+
+
+def extractor_engine_name(extractor) -> str:
+    """
+    ocr_engine_name() of the setup of an FPSOCRExtractor.
+
+    Args:
+        extractor: FPSOCRExtractor that read the timeline
+
+    Returns:
+        Engine name
+    """
+    return ocr_engine_name(
+        extractor.use_easyocr, extractor.ocr_mode, int(extractor.templates is not None),
+        gate_threshold=extractor.gate.threshold if extractor.gate is not None else None,
+        memo_mode=extractor.memo.mode if extractor.memo is not None else None,
+        osd_refresh=extractor.osd_refresh,
+        tesseract_montage=extractor.tesseract is not None and extractor.tesseract.montage
+    )
+
+
+class FPSTimelineCache:
+    """Directory of FPS timelines keyed by video fingerprint, ROI, sample rate and OCR engine."""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Cache directory
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _path(self, fingerprint: str, roi: Tuple[int, int, int, int], sample_rate: int, engine: str) -> Path:
+        x, y, w, h = roi
+        return self.root / f"{fingerprint}_{x}-{y}-{w}-{h}_s{sample_rate}_{engine}{FPS_TIMELINE_SUFFIX}"
+
+    def get(self, video_path: str, sample_rate: Optional[int], video_fps: float,
+            roi: Tuple[int, int, int, int] = None,
+            engine: str = None) -> Optional[Tuple[List[Dict], Tuple[int, int, int, int]]]:
+        """
+        Cached FPS timeline of a video at a sample rate.
+
+        Args:
+            video_path: Video or trim manifest
+            sample_rate: Requested step between FPS samples; None takes the
+                finest cached timeline as is
+            video_fps: Video frame rate (for timestamps)
+            roi: OCR region; None accepts any (e.g. an auto-detected one)
+            engine: ocr_engine_name() of the OCR setup; None accepts any
+                setup that OCR'd every sampled frame (no gate, perceptual
+                memo or refresh sampling)
+
+        Returns:
+            (fps_data, roi) or None on a miss. Of several matching timelines,
+            the one with the largest usable step is resampled (the finest one
+            without a sample rate).
+        """
+        fingerprint = file_fingerprint(video_path)
+        best = None
+        for path in self.root.glob(f"{fingerprint}_*{FPS_TIMELINE_SUFFIX}"):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                timeline_rate = int(data['sample_rate'])
+                timeline_roi = tuple(data['roi'])
+                timeline_engine = data['engine']
+                frame_count = int(data['frame_count'])
+                version = data.get('version')
+            except (OSError, ValueError, KeyError, TypeError):
+                continue  # Unreadable entry: treated as missing, rewritten by the next put()
+
+            if version != FPS_CACHE_VERSION:
+                continue  # Older key scheme: the engine name may hide a lossy setup
+            if roi is not None and timeline_roi != tuple(roi):
+                continue
+            if engine is None and LOSSY_ENGINE_MARK in timeline_engine:
+                continue
+            if engine is not None and timeline_engine != engine:
+                continue
+            if sample_rate is not None and sample_rate % timeline_rate != 0:
+                continue
+            if best is None or (timeline_rate > best[0] if sample_rate is not None else timeline_rate < best[0]):
+                best = (timeline_rate, data['fps_data'], frame_count, timeline_roi)
+
+        if best is None:
+            self.stats['misses'] += 1
+            return None
+
+        self.stats['hits'] += 1
+        timeline_rate, fps_data, frame_count, timeline_roi = best
+        if sample_rate is not None and timeline_rate != sample_rate:
+            fps_data = resample_fps_data(fps_data, frame_count, sample_rate, video_fps)
+        return fps_data, timeline_roi
+
+    def put(self, video_path: str, roi: Tuple[int, int, int, int], sample_rate: int, engine: str,
+            fps_data: List[Dict], statistics: Dict, frame_count: int) -> Path:
+        """
+        Store the FPS timeline of a video (atomically replaces an existing entry).
+
+        Args:
+            video_path: Video or trim manifest the frame indices refer to
+            roi: OCR region (x, y, width, height)
+            sample_rate: Step between OCR'd frames
+            engine: ocr_engine_name() of the OCR setup
+            fps_data: fill_fps_gaps() output
+            statistics: FPSOCRExtractor.calculate_statistics() of fps_data
+            frame_count: Video length
+
+        Returns:
+            Cache file path
+        """
+        fingerprint = file_fingerprint(video_path)
+        path = self._path(fingerprint, roi, sample_rate, engine)
+        data = {
+            'video_path': str(video_path),
+            'roi': list(roi),
+            'statistics': statistics,
+            'fps_data': fps_data,
+            'sample_rate': sample_rate,
+            'frame_count': frame_count,
+            'fingerprint': fingerprint,
+            'engine': engine,
+            'version': FPS_CACHE_VERSION
+        }
+
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.partial")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        return path
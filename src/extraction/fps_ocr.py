@@ -18,27 +18,138 @@ import json
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import numpy as np
 import cv2
 from tqdm import tqdm
-import statistics
+
+# Add project root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.video.sources import (open_frame_source, iter_frame_batches, read_frame,
+                               FRAME_SOURCE_BACKENDS)
+from src.extraction.ocr_memo import OCRMemo, ROI_HASH_MODES, DEFAULT_MEMO_SIZE
+from src.extraction.ocr_gate import OCRChangeGate, DEFAULT_GATE_THRESHOLD
+from src.extraction.ocr_templates import DigitTemplateRecognizer, DEFAULT_CALIBRATION_CROPS
+from src.extraction.tesseract_engine import TesseractEngine
+from src.extraction.osd_refresh import RefreshSampler
+from src.metrics.streaming_stats import StreamingStats
+
+# ROI frames read from the frame source per batch
+ROI_BATCH_SIZE = 64
+
+# ROI crops per batched EasyOCR call (readtext_batched)
+DEFAULT_OCR_BATCH_SIZE = 32
+
+# EasyOCR modes: full text detection + recognition on every crop, or
+# recognition only on the text lines found by one detection pass
+OCR_MODES = ('detect', 'recognize')
+
+# Recognition-only mode re-runs text detection when any line reads below this confidence
+RECOGNITION_MIN_CONFIDENCE = 0.5
+
+
+def fill_fps_gaps(readings: List[Tuple[int, Optional[float]]], video_fps: float,
+                  max_gap: int = 10, carried_frames: Set[int] = None) -> List[Dict]:
+    """
+    Turn per-frame OCR readings into FPS data entries.
+
+    Frames where OCR failed reuse the last valid value (marked as
+    interpolated) for up to max_gap - 1 consecutive failures, which covers
+    brief OSD flicker; longer gaps get no entries.
+
+    Args:
+        readings: (frame_index, fps_value or None) in frame order
+        video_fps: Video frame rate (for timestamps)
+        max_gap: Consecutive failures after which no value is carried
+        carried_frames: Frames whose reading was carried forward by the OCR
+            change gate (marked as carried)
+
+    Returns:
+        List of {'frame', 'timestamp', 'fps'[, 'interpolated' | 'carried']} dicts
+    """
+    fps_data = []
+    last_valid_fps = None
+    consecutive_failures = 0
+
+    for frame_idx, fps_value in readings:
+        if fps_value is not None:
+            fps_data.append({
+                'frame': frame_idx,
+                'timestamp': frame_idx / video_fps,
+                'fps': fps_value
+            })
+            if carried_frames and frame_idx in carried_frames:
+                fps_data[-1]['carried'] = True
+            last_valid_fps = fps_value
+            consecutive_failures = 0
+        else:
+            consecutive_failures += 1
+            # If OCR fails, use last valid value (common for brief frame drops)
+            if last_valid_fps is not None and consecutive_failures < max_gap:
+                fps_data.append({
+                    'frame': frame_idx,
+                    'timestamp': frame_idx / video_fps,
+                    'fps': last_valid_fps,
+                    'interpolated': True
+                })
+
+    return fps_data
 
 
 class FPSOCRExtractor:
     """Extract FPS values from on-screen display using OCR"""
 
-    def __init__(self, roi: Tuple[int, int, int, int] = None, use_easyocr: bool = True):
+    def __init__(self, roi: Tuple[int, int, int, int] = None, use_easyocr: bool = True,
+                 memo_mode: Optional[str] = 'exact', memo_size: int = DEFAULT_MEMO_SIZE,
+                 gate_threshold: Optional[float] = None,
+                 ocr_batch_size: int = DEFAULT_OCR_BATCH_SIZE, ocr_mode: str = 'detect',
+                 digit_templates: int = 0, tesseract_montage: bool = False,
+                 osd_refresh: bool = False):
         """
         Initialize OCR extractor
 
         Args:
             roi: Region of interest as (x, y, width, height). If None, will attempt auto-detection
             use_easyocr: Use EasyOCR (True) or Tesseract (False)
+            memo_mode: Reuse OCR results of repeated ROI crops ('exact' or
+                'perceptual', see ocr_memo.py); None runs OCR on every crop
+            memo_size: Maximum number of remembered OCR results
+            gate_threshold: Carry the last reading forward while less than this
+                fraction of the ROI pixels changed (see ocr_gate.py); None
+                or 0 runs OCR on every crop
+            ocr_batch_size: ROI crops per batched EasyOCR call (1 = one call per crop)
+            ocr_mode: 'detect' (EasyOCR text detection + recognition on every crop) or
+                'recognize' (recognition only on the text lines of the ROI, see
+                readtext_batch())
+            digit_templates: Read crops by glyph template matching after calibrating
+                on this many OCR engine readings, with the engine as fallback
+                (see ocr_templates.py); 0 disables it
+            tesseract_montage: Tesseract: recognize each batch of crops as one
+                tiled image instead of one call per crop (see tesseract_engine.py)
+            osd_refresh: Estimate the OSD refresh period and OCR one frame per
+                refresh in extract_from_video() (see osd_refresh.py)
         """
+        if ocr_batch_size < 1:
+            raise ValueError(f"ocr_batch_size must be >= 1, got {ocr_batch_size}")
+        if ocr_mode not in OCR_MODES:
+            raise ValueError(f"Unknown OCR mode: {ocr_mode}. Use one of: {', '.join(OCR_MODES)}")
+
         self.roi = roi
         self.use_easyocr = use_easyocr
         self.reader = None
+        self.tesseract = None
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        self.memo = OCRMemo(memo_mode, memo_size) if memo_mode else None
+        self.gate = OCRChangeGate(gate_threshold) if gate_threshold else None
+        self.ocr_batch_size = ocr_batch_size
+        self.ocr_mode = ocr_mode
+        self._text_lines = None  # Recognition-only mode: [x_min, x_max, y_min, y_max] per text line
+
+        self.ocr_stats = {'recognized': 0, 'detected': 0}
+        self.templates = DigitTemplateRecognizer(digit_templates) if digit_templates else None
+        self.osd_refresh = osd_refresh
+        self.refresh_sampler = None  # RefreshSampler of the last extract_from_video() call
 
         if use_easyocr:
             try:
@@ -53,12 +164,10 @@ class FPSOCRExtractor:
 
         if not self.use_easyocr:
             try:
-                import pytesseract
-                # Test if tesseract is available
-                pytesseract.get_tesseract_version()
-                print("  ✓ Tesseract ready")
-            except Exception as e:
-                print(f"  ✗ Tesseract not available: {e}")
+                self.tesseract = TesseractEngine(montage=tesseract_montage)
+                print(f"  ✓ Tesseract ready ({self.tesseract.backend})")
+            except RuntimeError as e:
+                print(f"  ✗ {e}")
                 print("  Install Tesseract: brew install tesseract (macOS) or apt install tesseract-ocr (Linux)")
                 raise RuntimeError("No OCR engine available")
 
@@ -141,14 +250,13 @@ class FPSOCRExtractor:
         resized = cv2.resize(gray, (w * scale_factor, h * scale_factor), interpolation=cv2.INTER_CUBIC)
 
         # Enhance contrast using CLAHE
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(resized)
+        enhanced = self._clahe.apply(resized)
 
         # Threshold to get clean black text on white background
         # MSI Afterburner typically uses bright text, so invert for OCR
         _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
-        # Denoise
+        # Denoise (removes isolated speckle left by the threshold; clean crops pass unchanged)
         denoised = cv2.fastNlMeansDenoising(binary, None, h=10, templateWindowSize=7, searchWindowSize=21)
 
         return denoised
@@ -199,128 +307,335 @@ class FPSOCRExtractor:
         """
         Extract FPS value from ROI using OCR
 
+        Crops seen before are answered from the OCR memo (if enabled).
+
         Args:
             roi_img: Cropped ROI image
 
         Returns:
             FPS value or None if OCR failed
         """
-        # For colored text (like cyan FPS overlays), use original or simple grayscale
-        # Heavy preprocessing can distort colored text
-        if len(roi_img.shape) == 3:
-            # Try with original RGB first (EasyOCR handles color well)
-            img_for_ocr = roi_img
-        else:
-            img_for_ocr = roi_img
+        if self.memo is not None:
+            return self.memo.get_or_compute(roi_img, self._ocr_fps)
+        return self._ocr_fps(roi_img)
+
+    def read_fps_gated(self, roi_img: np.ndarray) -> Tuple[Optional[float], bool]:
+        """
+        Extract FPS value from ROI, carrying the last reading while the ROI is unchanged
+
+        Args:
+            roi_img: Cropped ROI image
+
+        Returns:
+            (FPS value or None, carried): carried is True if OCR was skipped
+        """
+        if self.gate is not None:
+            return self.gate.get_or_compute(roi_img, self.read_fps_from_roi)
+        return self.read_fps_from_roi(roi_img), False
+
+    def read_fps_batch(self, roi_imgs: List[np.ndarray]) -> List[Tuple[Optional[float], bool]]:
+        """
+        Batched read_fps_gated(): crops that still need OCR after the change gate
+        and the memo are recognized together (see readtext_batch())
+
+        Args:
+            roi_imgs: Same-shape ROI crops in frame order
+
+        Returns:
+            (FPS value or None, carried) per crop
+        """
+        if self.gate is not None:
+            return self.gate.get_or_compute_batch(roi_imgs, self._read_fps_batch_memo)
+        return [(fps_value, False) for fps_value in self._read_fps_batch_memo(roi_imgs)]
+
+    def _read_fps_batch_memo(self, roi_imgs: List[np.ndarray]) -> List[Optional[float]]:
+        if self.memo is not None:
+            return self.memo.get_or_compute_batch(roi_imgs, self._ocr_fps_batch)
+        return self._ocr_fps_batch(roi_imgs)
 
-        # Run OCR
+    def _ocr_fps_batch(self, roi_imgs: List[np.ndarray]) -> List[Optional[float]]:
+        """Read ROI crops (digit templates, then the OCR engine) and parse the FPS values."""
+        return [self.extract_fps_from_text(text) if text is not None else None
+                for text in self._read_text_batch(roi_imgs)]
+
+    def _read_text_batch(self, roi_imgs: List[np.ndarray]) -> List[Optional[str]]:
+        """
+        OCR text per crop, None where OCR failed
+
+        With digit templates, crops the templates cannot read go to the OCR
+        engine and its readings are learned; every TEMPLATE_AUDIT_INTERVAL-th
+        template reading is checked against the engine.
+        """
+        if self.templates is None:
+            return self._engine_text_batch(roi_imgs)
+
+        texts = self.templates.read_batch(roi_imgs)
+        fallback = [i for i, text in enumerate(texts) if text is None]
+        audit = [i for i, text in enumerate(texts) if text is not None and self.templates.should_audit()]
+        if not fallback and not audit:
+            return texts
+
+        learned = []  # (crop, text) engine readings with an FPS value
+        for i, text in zip(fallback + audit, self._engine_text_batch([roi_imgs[i] for i in fallback + audit])):
+            if texts[i] is not None:
+                self.templates.record_audit(self.extract_fps_from_text(text) == self.extract_fps_from_text(texts[i]))
+            if self.extract_fps_from_text(text) is not None:
+                learned.append((roi_imgs[i], text))
+            texts[i] = text
+
+        if learned:
+            self.templates.learn(*map(list, zip(*learned)))
+        return texts
+
+    def _engine_text_batch(self, roi_imgs: List[np.ndarray]) -> List[Optional[str]]:
+        """Run the OCR engine on ROI crops (batched for EasyOCR, and for Tesseract in montage mode)."""
         if self.use_easyocr:
-            try:
-                results = self.reader.readtext(img_for_ocr, detail=0)
-                text = ' '.join(results) if results else ''
-            except Exception as e:
-                return None
-        else:
-            # For Tesseract, use preprocessed image
-            processed = self.preprocess_roi(roi_img)
-            import pytesseract
-            # Configure tesseract for digits
-            custom_config = r'--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789FPSfps.:, '
-            text = pytesseract.image_to_string(processed, config=custom_config)
+            return [' '.join(results) if results is not None else None
+                    for results in self.readtext_batch(roi_imgs, detail=0)]
 
-        # Parse FPS
-        return self.extract_fps_from_text(text)
+        # For Tesseract, use preprocessed image
+        return self.tesseract.read_batch([self.preprocess_roi(roi_img) for roi_img in roi_imgs])
+
+    def readtext_batch(self, roi_imgs: List[np.ndarray], detail: int = 0) -> List[Optional[list]]:
+        """
+        Run EasyOCR on ROI crops
+
+        In 'detect' mode, crops go to readtext_batched(), ocr_batch_size crops
+        per call: the text detector runs once per batch on the stacked crops
+        instead of once per crop (recognition still runs per crop, as in
+        readtext()). The crops must have the same shape (ROI crops of one
+        video do). If a batched call fails, its crops are read one by one so a
+        bad crop only loses its own result.
+
+        In 'recognize' mode, the text detector (most of the OCR time) is
+        skipped: the recognizer reads the text lines found by the last
+        detection pass. Crops go through detection only until text is found
+        and whenever a line reads below RECOGNITION_MIN_CONFIDENCE; that
+        detection also updates the text lines.
+
+        Args:
+            roi_imgs: Same-shape ROI crops
+            detail: EasyOCR detail level (0: text only, 1: boxes and confidences)
+
+        Returns:
+            readtext() result per crop, None where OCR failed
+        """
+        if self.ocr_mode == 'recognize':
+            return self._recognize_batch(roi_imgs, detail)
+        return self._detect_batch(roi_imgs, detail)
+
+    def _recognize_batch(self, roi_imgs: List[np.ndarray], detail: int) -> List[Optional[list]]:
+        results = [None] * len(roi_imgs)
+        fallback = []
+        for i, roi_img in enumerate(roi_imgs):
+            lines = None
+            if self._text_lines is not None:
+                try:
+                    lines = self.reader.recognize(roi_img, horizontal_list=self._text_lines, free_list=[],
+                                                  detail=1)
+                except Exception:
+                    lines = None
+
+            if lines and min(conf for _, _, conf in lines) >= RECOGNITION_MIN_CONFIDENCE:
+                self.ocr_stats['recognized'] += 1
+                results[i] = lines if detail else [text for _, text, _ in lines]
+            else:
+                fallback.append(i)
+
+        if fallback:
+            self.ocr_stats['detected'] += len(fallback)
+            detected = self._detect_batch([roi_imgs[i] for i in fallback], detail=1)
+            for i, boxes in zip(fallback, detected):
+                if boxes:
+                    self._text_lines = self._find_text_lines(boxes, roi_imgs[i].shape[1])
+                results[i] = boxes if detail or boxes is None else [text for _, text, _ in boxes]
+
+        return results
+
+    @staticmethod
+    def _find_text_lines(boxes: list, width: int) -> List[List[int]]:
+        """
+        Line boxes [x_min, x_max, y_min, y_max] covering EasyOCR result boxes
+
+        Boxes on the same row are merged, and each line is widened by its
+        height on both sides (room for a digit more; recognition time grows
+        with the line width, so lines are not stretched to the full ROI).
+        """
+        rows = sorted(([int(min(x for x, _ in box)), int(max(x for x, _ in box)),
+                        int(min(y for _, y in box)), int(max(y for _, y in box))] for box, _, _ in boxes),
+                      key=lambda row: row[2])
+        lines = [rows[0]]
+        for x_min, x_max, y_min, y_max in rows[1:]:
+            line = lines[-1]
+            if y_min <= line[3]:
+                line[:] = [min(line[0], x_min), max(line[1], x_max), line[2], max(line[3], y_max)]
+            else:
+                lines.append([x_min, x_max, y_min, y_max])
+
+        return [[max(0, x_min - (y_max - y_min)), min(width, x_max + (y_max - y_min)), max(0, y_min), y_max]
+                for x_min, x_max, y_min, y_max in lines]
+
+    def _detect_batch(self, roi_imgs: List[np.ndarray], detail: int) -> List[Optional[list]]:
+        results = []
+        for start in range(0, len(roi_imgs), self.ocr_batch_size):
+            chunk = list(roi_imgs[start:start + self.ocr_batch_size])
+            if len(chunk) > 1:
+                try:
+                    results.extend(self.reader.readtext_batched(chunk, detail=detail))
+                    continue
+                except Exception:
+                    pass
+
+            for roi_img in chunk:
+                try:
+                    results.append(self.reader.readtext(roi_img, detail=detail))
+                except Exception:
+                    results.append(None)
+
+        return results
+
+    def reset_video_state(self):
+        """Forget the last OCR'd crop and the ROI text lines (call before reading a new video)."""
+        if self.gate is not None:
+            self.gate.reset()
+        self._text_lines = None
+
+    def _ocr_fps(self, roi_img: np.ndarray) -> Optional[float]:
+        """Run the OCR engine on a ROI crop and parse the FPS value."""
+        return self._ocr_fps_batch([roi_img])[0]
 
     def extract_from_video(
         self,
         video_path: Path,
         sample_rate: int = 1,
-        preview_frame: int = 0
+        preview_frame: int = 0,
+        decoder: str = 'opencv',
+        pix_fmt: str = 'bgr24'
     ) -> Tuple[List[Dict], Optional[np.ndarray]]:
         """
         Extract FPS data from video
 
+        Frames are read in a single forward pass: skipped frames are grabbed
+        without conversion and only the ROI of each sampled frame is passed to
+        OCR, so the cost scales with the frame count instead of the GOP length.
+        ROI crops go to EasyOCR in batches of ocr_batch_size.
+        The crop happens in the frame source (in the FFmpeg filter graph for the
+        ffmpeg backend), so full frames are never held in Python.
+
         Args:
-            video_path: Path to video file
+            video_path: Path to video file or trim manifest (.trim.json)
             sample_rate: Process every Nth frame (1 = every frame, 30 = every 30th frame)
             preview_frame: Frame number to extract as ROI preview (default: 0)
+            decoder: Frame source backend ('opencv' or 'ffmpeg')
+            pix_fmt: ROI pixel format for OCR ('bgr24' or 'gray'; gray is smaller
+                but may change OCR results)
 
         Returns:
             Tuple of (fps_data_list, preview_image)
         """
-        cap = cv2.VideoCapture(str(video_path))
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-
-        print(f"  Video: {total_frames} frames @ {video_fps:.2f} FPS")
-
         # Auto-detect ROI if not provided
         if self.roi is None:
             print("  Attempting auto-detection of FPS counter...")
-            ret, first_frame = cap.read()
-            if ret:
+            first_frame = read_frame(str(video_path), 0)
+            if first_frame is not None:
                 self.roi = self.auto_detect_roi(first_frame, "top_right")
                 if self.roi:
                     print(f"  ✓ Auto-detected ROI: x={self.roi[0]}, y={self.roi[1]}, w={self.roi[2]}, h={self.roi[3]}")
                 else:
                     print("  ✗ Auto-detection failed. Please provide ROI manually with --roi")
-                    cap.release()
                     return [], None
-            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Reset to beginning
 
-        fps_data = []
-        preview_image = None
-        last_valid_fps = None
-        consecutive_failures = 0
+        source = open_frame_source(str(video_path), backend=decoder, sample_rate=sample_rate,
+                                   crop=self.roi, pix_fmt=pix_fmt)
+        total_frames = source.frame_count
+        video_fps = source.fps
 
-        with tqdm(total=total_frames // sample_rate, desc="Extracting FPS", unit="frame") as pbar:
-            for frame_idx in range(0, total_frames, sample_rate):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
-
-                if not ret:
-                    break
-
-                # Extract ROI
-                x, y, w, h = self.roi
-                roi_img = frame[y:y+h, x:x+w]
-
-                # Save preview
-                if frame_idx == preview_frame:
-                    preview_image = frame.copy()
-                    cv2.rectangle(preview_image, (x, y), (x+w, y+h), (0, 255, 0), 2)
-                    cv2.putText(preview_image, "FPS ROI", (x, y-10),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-
-                # Extract FPS
-                fps_value = self.read_fps_from_roi(roi_img)
-
-                if fps_value is not None:
-                    fps_data.append({
-                        'frame': frame_idx,
-                        'timestamp': frame_idx / video_fps,
-                        'fps': fps_value
-                    })
-                    last_valid_fps = fps_value
-                    consecutive_failures = 0
-                else:
-                    consecutive_failures += 1
-                    # If OCR fails, use last valid value (common for brief frame drops)
-                    if last_valid_fps is not None and consecutive_failures < 10:
-                        fps_data.append({
-                            'frame': frame_idx,
-                            'timestamp': frame_idx / video_fps,
-                            'fps': last_valid_fps,
-                            'interpolated': True
-                        })
+        print(f"  Video: {total_frames} frames @ {video_fps:.2f} FPS")
+
+        readings = []  # (frame_idx, fps_value or None)
+        carried_frames = set()  # Frames that skipped OCR (change gate, OSD refresh sampling)
+        frames_read = 0
+        self.reset_video_state()
+        sampler = RefreshSampler(self.read_fps_batch, video_fps, sample_rate) if self.osd_refresh else None
+        self.refresh_sampler = sampler
+        gate_before = dict(self.gate.stats) if self.gate is not None else None
 
-                pbar.update(1)
+        def add_readings(batch_readings):
+            for frame_idx, fps_value, carried in batch_readings:
+                readings.append((frame_idx, fps_value))
+                if carried:
+                    carried_frames.add(frame_idx)
 
-        cap.release()
+        with tqdm(total=total_frames // sample_rate, desc="Extracting FPS", unit="frame") as pbar:
+            try:
+                for frame_indices, roi_batch in iter_frame_batches(source, ROI_BATCH_SIZE):
+                    if sampler is not None:
+                        add_readings(sampler.feed(frame_indices, roi_batch))
+                    else:
+                        add_readings((frame_idx, fps_value, carried) for frame_idx, (fps_value, carried)
+                                     in zip(frame_indices, self.read_fps_batch(roi_batch)))
+                    frames_read = frame_indices[-1] + 1
+                    pbar.update(len(frame_indices))
+                if sampler is not None:
+                    add_readings(sampler.flush())
+            finally:
+                source.release()
+
+        fps_data = fill_fps_gaps(readings, video_fps, carried_frames=carried_frames)
+
+        if sampler is not None and sampler.period is not None:
+            refresh = sampler.report()
+            print(f"  OSD refresh sampling: {refresh['skipped_frames']} of {len(readings)} frames skipped OCR "
+                  f"({refresh['skip_rate']:.0%}, {refresh['period_ms']:.0f} ms refresh period)")
+        if self.gate is not None:
+            gated = {key: self.gate.stats[key] - gate_before[key] for key in gate_before}
+            print(f"  OCR gate: {gated['carried']} of {gated['ocr'] + gated['carried']} frames skipped OCR "
+                  f"({gated['carried'] / max(1, gated['ocr'] + gated['carried']):.0%}, ROI unchanged)")
+        if self.use_easyocr and self.ocr_mode == 'recognize':
+            print(f"  OCR recognition-only: {self.ocr_stats['recognized']} crops, "
+                  f"{self.ocr_stats['detected']} with text detection")
+        if self.templates is not None:
+            templates = self.templates.report()
+            agreement = templates['audit_agreement']
+            print(f"  Digit templates: {templates['matched']} of {templates['matched'] + templates['fallback']} "
+                  f"crops read by template matching ({templates['match_rate']:.0%})"
+                  + (f", {agreement:.1%} agreement with the OCR engine on {templates['audited']} audited crops"
+                     if agreement is not None else ""))
+        if self.memo is not None:
+            memo = self.memo.report()
+            print(f"  OCR memo ({memo['mode']}): {memo['hits']} of {memo['hits'] + memo['misses']} "
+                  f"crops reused ({memo['hit_rate']:.0%})")
+
+        # Preview (only for a frame the scan actually sampled, as before)
+        preview_image = None
+        if preview_frame % sample_rate == 0 and preview_frame < frames_read:
+            preview_image = self.render_roi_preview(video_path, preview_frame)
 
         return fps_data, preview_image
 
-    def calculate_statistics(self, fps_data: List[Dict]) -> Dict:
+    def render_roi_preview(self, video_path: Path, frame_idx: int) -> Optional[np.ndarray]:
+        """
+        Read one full frame and draw the ROI on it.
+
+        Args:
+            video_path: Path to video file
+            frame_idx: Frame to render
+
+        Returns:
+            Annotated BGR frame or None if the frame cannot be read
+        """
+        frame = read_frame(str(video_path), frame_idx)
+        if frame is None:
+            return None
+
+        x, y, w, h = self.roi
+        cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
+        cv2.putText(frame, "FPS ROI", (x, y-10),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        return frame
+
+    @staticmethod
+    def calculate_statistics(fps_data: List[Dict]) -> Dict:
         """
         Calculate FPS statistics from extracted data
 
@@ -333,21 +648,19 @@ class FPSOCRExtractor:
         if not fps_data:
             return {}
 
-        fps_values = [d['fps'] for d in fps_data]
-
-        # Sort for percentile calculations
-        sorted_fps = sorted(fps_values)
+        fps_stats = StreamingStats().update(d['fps'] for d in fps_data)
 
         return {
-            'avg_fps': statistics.mean(fps_values),
-            'median_fps': statistics.median(fps_values),
-            'min_fps': min(fps_values),
-            'max_fps': max(fps_values),
-            'std_fps': statistics.stdev(fps_values) if len(fps_values) > 1 else 0,
-            '1%_low': sorted_fps[int(len(sorted_fps) * 0.01)],
-            '0.1%_low': sorted_fps[int(len(sorted_fps) * 0.001)],
+            'avg_fps': fps_stats.mean,
+            'median_fps': fps_stats.median(),
+            'min_fps': fps_stats.min,
+            'max_fps': fps_stats.max,
+            'std_fps': fps_stats.std(ddof=1),
+            '1%_low': fps_stats.quantile(0.01),
+            '0.1%_low': fps_stats.quantile(0.001),
             'frame_count': len(fps_data),
-            'interpolated_count': sum(1 for d in fps_data if d.get('interpolated', False))
+            'interpolated_count': sum(1 for d in fps_data if d.get('interpolated', False)),
+            'carried_count': sum(1 for d in fps_data if d.get('carried', False))
         }
 
 
@@ -389,10 +702,79 @@ def main():
         default=0,
         help="Frame number to use for ROI preview (default: 0)"
     )
+    parser.add_argument(
+        "--decoder",
+        choices=FRAME_SOURCE_BACKENDS,
+        default="opencv",
+        help="Frame decoder backend (default: opencv)"
+    )
+    parser.add_argument(
+        "--pix-fmt",
+        choices=["bgr24", "gray"],
+        default="bgr24",
+        help="ROI pixel format passed to OCR (default: bgr24)"
+    )
     parser.add_argument(
         "--use-tesseract",
         action="store_true",
-        help="Use Tesseract instead of EasyOCR"
+        help="Use Tesseract instead of EasyOCR (in-process with tesserocr if installed)"
+    )
+    parser.add_argument(
+        "--tesseract-montage",
+        action="store_true",
+        help="Tesseract: recognize each batch of ROI crops as one tiled image (one call per batch)"
+    )
+    parser.add_argument(
+        "--ocr-memo",
+        choices=ROI_HASH_MODES + ('off',),
+        default="exact",
+        help="Reuse OCR results of repeated ROI crops: exact (pixel-identical), "
+             "perceptual (near-identical, dhash) or off (default: exact)"
+    )
+    parser.add_argument(
+        "--ocr-mode",
+        choices=OCR_MODES,
+        default="detect",
+        help="EasyOCR mode: detect (text detection + recognition on every crop) or recognize "
+             "(recognition only on the ROI's text lines, detection only when confidence drops; "
+             "several times faster on CPU) (default: detect)"
+    )
+    parser.add_argument(
+        "--digit-templates",
+        type=int,
+        nargs="?",
+        const=DEFAULT_CALIBRATION_CROPS,
+        default=0,
+        metavar="N",
+        help="Read the counter by glyph template matching, calibrated on the first N OCR readings "
+             f"(EasyOCR/Tesseract fallback on low match confidence; N defaults to {DEFAULT_CALIBRATION_CROPS})"
+    )
+    parser.add_argument(
+        "--osd-refresh",
+        action="store_true",
+        help="Detect the OSD refresh period in the first seconds and OCR one frame per refresh "
+             "(change frames are located exactly by bisection)"
+    )
+    parser.add_argument(
+        "--ocr-batch-size",
+        type=int,
+        default=DEFAULT_OCR_BATCH_SIZE,
+        help=f"ROI crops per batched EasyOCR call (default: {DEFAULT_OCR_BATCH_SIZE})"
+    )
+    parser.add_argument(
+        "--ocr-gate",
+        type=float,
+        nargs="?",
+        const=DEFAULT_GATE_THRESHOLD,
+        metavar="FRACTION",
+        help="Skip OCR and carry the last reading while less than this fraction of the "
+             f"ROI pixels changed (FRACTION defaults to {DEFAULT_GATE_THRESHOLD}; default: off)"
+    )
+    parser.add_argument(
+        "--ocr-memo-size",
+        type=int,
+        default=DEFAULT_MEMO_SIZE,
+        help=f"Maximum remembered OCR results (default: {DEFAULT_MEMO_SIZE})"
     )
 
     args = parser.parse_args()
@@ -416,14 +798,22 @@ def main():
             print("\n  No ROI specified, will attempt auto-detection")
 
         # Initialize extractor
-        extractor = FPSOCRExtractor(roi=roi, use_easyocr=not args.use_tesseract)
+        extractor = FPSOCRExtractor(roi=roi, use_easyocr=not args.use_tesseract,
+                                    memo_mode=None if args.ocr_memo == 'off' else args.ocr_memo,
+                                    memo_size=args.ocr_memo_size, gate_threshold=args.ocr_gate,
+                                    ocr_batch_size=args.ocr_batch_size, ocr_mode=args.ocr_mode,
+                                    digit_templates=args.digit_templates,
+                                    tesseract_montage=args.tesseract_montage,
+                                    osd_refresh=args.osd_refresh)
 
         # Extract FPS data
         print("\n[1/2] Extracting FPS from video...")
         fps_data, preview_image = extractor.extract_from_video(
             args.video,
             sample_rate=args.sample_rate,
-            preview_frame=args.preview_frame
+            preview_frame=args.preview_frame,
+            decoder=args.decoder,
+            pix_fmt=args.pix_fmt
         )
 
         if not fps_data:
@@ -442,6 +832,8 @@ def main():
 
         if stats['interpolated_count'] > 0:
             print(f"  ⚠ {stats['interpolated_count']} frames interpolated due to OCR failures")
+        if stats['carried_count'] > 0:
+            print(f"  ✓ {stats['carried_count']} frames carried forward (ROI unchanged, OCR skipped)")
 
         # Save output
         output_data = {
@@ -450,6 +842,16 @@ def main():
             'statistics': stats,
             'fps_data': fps_data
         }
+        if extractor.memo is not None:
+            output_data['ocr_memo'] = extractor.memo.report()
+        if extractor.gate is not None:
+            output_data['ocr_gate'] = extractor.gate.report()
+        if extractor.use_easyocr:
+            output_data['ocr_engine'] = {'mode': extractor.ocr_mode, **extractor.ocr_stats}
+        if extractor.templates is not None:
+            output_data['digit_templates'] = extractor.templates.report()
+        if extractor.refresh_sampler is not None:
+            output_data['osd_refresh'] = extractor.refresh_sampler.report()
 
         args.output.parent.mkdir(parents=True, exist_ok=True)
         with open(args.output, 'w') as f:
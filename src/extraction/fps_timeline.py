@@ -0,0 +1,147 @@
+"""
+FPS timeline sidecars.
+
+When a recording is trimmed on its FPS counter (marker type ``fps``), the
+marker scan already OCRs the counter. With a timeline step, the scan reads
+every Nth frame of the detected range and trim_by_marker.py saves the values,
+re-indexed to trimmed-video frame numbers, next to the trimmed video (or trim
+manifest) as ``<name>.fps.json``. The analysis stage loads that file instead
+of running OCR on the trimmed video a second time.
+
+The file uses the fps_ocr.py output schema ('video_path', 'roi',
+'statistics', 'fps_data') plus:
+- sample_rate: Step of the OCR'd frames (trimmed frame indices 0, N, 2N, ...)
+- frame_count: Trimmed video length
+- fingerprint: file_fingerprint() of the trimmed video or manifest it belongs to
+- source / source_first_frame: Untrimmed video the values were read from
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.extraction.fps_ocr import fill_fps_gaps
+from src.video.fingerprint import file_fingerprint
+from src.video.trim_manifest import TRIM_MANIFEST_SUFFIX
+
+FPS_TIMELINE_SUFFIX = '.fps.json'
+
+
+def fps_timeline_path(video_path: str) -> Path:
+    """Sidecar path of a (trimmed) video or trim manifest: ``x.mp4`` / ``x.trim.json`` -> ``x.fps.json``."""
+    video_path = str(video_path)
+    if video_path.endswith(TRIM_MANIFEST_SUFFIX):
+        return Path(video_path[:-len(TRIM_MANIFEST_SUFFIX)] + FPS_TIMELINE_SUFFIX)
+    return Path(video_path).with_suffix(FPS_TIMELINE_SUFFIX)
+
+
+def save_fps_timeline(video_path: str, roi: Tuple[int, int, int, int], sample_rate: int,
+                      fps_data: List[Dict], statistics: Dict, frame_count: int,
+                      source_path: str = None, source_first_frame: int = 0) -> Path:
+    """
+    Write the FPS timeline sidecar of a trimmed video.
+
+    Args:
+        video_path: Trimmed video or trim manifest the frame indices refer to
+        roi: OCR region (x, y, width, height)
+        sample_rate: Step between OCR'd frames
+        fps_data: fill_fps_gaps() output with trimmed frame indices
+        statistics: FPSOCRExtractor.calculate_statistics() of fps_data
+        frame_count: Trimmed video length
+        source_path: Untrimmed video the values were read from
+        source_first_frame: Source frame of trimmed frame 0
+
+    Returns:
+        Sidecar path
+    """
+    path = fps_timeline_path(video_path)
+    data = {
+        'video_path': str(video_path),
+        'roi': list(roi),
+        'statistics': statistics,
+        'fps_data': fps_data,
+        'sample_rate': sample_rate,
+        'frame_count': frame_count,
+        'fingerprint': file_fingerprint(video_path),
+        'source': str(source_path) if source_path else None,
+        'source_first_frame': source_first_frame
+    }
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_fps_timeline(video_path: str, sample_rate: int,
+                      video_fps: float) -> Optional[Tuple[List[Dict], Tuple[int, int, int, int]]]:
+    """
+    Load the FPS timeline sidecar of a video for a given sample rate.
+
+    A timeline recorded every N frames serves any sample rate that is a
+    multiple of N: the readings at the requested frames are taken and OCR
+    gaps are re-filled, which gives the same result as OCR at that rate.
+
+    Args:
+        video_path: Video or trim manifest the analysis reads
+        sample_rate: Requested step between FPS samples
+        video_fps: Video frame rate (for timestamps)
+
+    Returns:
+        (fps_data, roi) or None if there is no usable sidecar
+    """
+    path = fps_timeline_path(video_path)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        timeline_rate = int(data['sample_rate'])
+        fingerprint = data['fingerprint']
+        frame_count = int(data['frame_count'])
+    except (OSError, ValueError, KeyError):
+        return None
+
+    if fingerprint != file_fingerprint(video_path):
+        print(f"  ⚠️  Ignoring stale FPS timeline {path.name} (video changed)")
+        return None
+    if sample_rate % timeline_rate != 0:
+        print(f"  ⚠️  FPS timeline {path.name} was read every {timeline_rate} frames, "
+              f"cannot serve sample rate {sample_rate}")
+        return None
+
+    return resample_fps_data(data['fps_data'], frame_count, sample_rate, video_fps), tuple(data['roi'])
+
+
+def resample_fps_data(fps_data: List[Dict], frame_count: int, sample_rate: int,
+                      video_fps: float) -> List[Dict]:
+    """
+    Take the readings at every ``sample_rate``-th frame of a timeline and re-fill OCR gaps.
+
+    Interpolated or missing entries are OCR failures, so filling them again
+    after subsampling gives the same result as OCR at that rate. The
+    timeline's own step must divide ``sample_rate``.
+
+    Args:
+        fps_data: fill_fps_gaps() output of the timeline
+        frame_count: Video length the timeline covers
+        sample_rate: Requested step between FPS samples
+        video_fps: Video frame rate (for timestamps)
+
+    Returns:
+        fill_fps_gaps() output at the requested sample rate
+    """
+    entries = {entry['frame']: entry for entry in fps_data}
+    readings = []
+    carried_frames = set()
+    for frame_idx in range(0, frame_count, sample_rate):
+        entry = entries.get(frame_idx)
+        valid = entry is not None and not entry.get('interpolated', False)
+        readings.append((frame_idx, entry['fps'] if valid else None))
+        if valid and entry.get('carried', False):
+            carried_frames.add(frame_idx)
+
+    return fill_fps_gaps(readings, video_fps, carried_frames=carried_frames)
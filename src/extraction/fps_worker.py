@@ -0,0 +1,188 @@
+"""
+Asynchronous FPS OCR on frames decoded by another loop.
+
+A comparison decodes every sampled frame of the compare video for its
+metrics. When that video also carries the FPS overlay, a separate OCR pass
+decodes it a second time. Fused mode crops the ROI from the frames the
+metrics loop already has and hands the crops to one background OCR thread:
+
+- submit() only copies the crop into a batch and never waits for OCR; full
+  batches go to the worker through an unbounded queue (crops are small)
+- the worker runs FPSOCRExtractor.read_fps_batch() per batch, in frame
+  order per video, so the change gate and memo work as in a separate pass
+- result() waits until the video's crops are read and returns the same
+  fps_data as FPSOCRExtractor.extract_from_video() at the metric sample rate
+
+Several videos (fan-out comparisons) share the worker and its extractor
+(one OCR model in memory). Each video gets its own change gate, since the
+gate compares a crop with the previous crop of the same video.
+"""
+
+import queue
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.extraction.fps_ocr import FPSOCRExtractor, ROI_BATCH_SIZE, fill_fps_gaps
+from src.extraction.ocr_gate import OCRChangeGate
+
+_END = object()
+
+
+class FPSStream:
+    """ROI crops of one video, read by an AsyncFPSReader."""
+
+    def __init__(self, worker: 'AsyncFPSReader', video_fps: float):
+        self.worker = worker
+        self.video_fps = video_fps
+        self.gate = OCRChangeGate(worker.extractor.gate.threshold) if worker.extractor.gate is not None else None
+
+        self.readings = []  # (frame_idx, fps_value or None), filled by the worker
+        self.carried_frames = set()
+        self.error = None
+        self._batch_indices = []
+        self._batch_crops = []
+        self._done = threading.Event()
+
+    def submit(self, frame_idx: int, frame: np.ndarray):
+        """
+        Queue the ROI of a decoded frame for OCR (returns immediately).
+
+        Args:
+            frame_idx: Frame index (ascending per stream)
+            frame: Full BGR frame; the ROI is copied, so the frame buffer may be reused
+        """
+        if self.worker.extractor.roi is None:
+            if self.worker.roi_detection_failed:
+                return
+            self.worker.detect_roi(frame)
+            if self.worker.extractor.roi is None:
+                return
+
+        x, y, w, h = self.worker.extractor.roi
+        self._batch_indices.append(frame_idx)
+        self._batch_crops.append(frame[y:y + h, x:x + w].copy())
+        if len(self._batch_crops) >= self.worker.batch_size:
+            self._send()
+
+    def _send(self):
+        if self._batch_crops:
+            self.worker.put((self, self._batch_indices, self._batch_crops))
+            self._batch_indices = []
+            self._batch_crops = []
+
+    def result(self) -> List[Dict]:
+        """
+        Wait until all submitted crops are read.
+
+        Returns:
+            fill_fps_gaps() output for the submitted frames
+
+        Raises:
+            RuntimeError: If OCR failed on the worker thread
+        """
+        self._send()
+        self.worker.put((self, None, None))  # Marker: everything before it belongs to this stream
+
+        start = time.perf_counter()
+        self._done.wait()
+        self.worker.stats['result_wait_seconds'] += time.perf_counter() - start
+
+        if self.error is not None:
+            raise RuntimeError(f"FPS OCR failed: {self.error}") from self.error
+        return fill_fps_gaps(self.readings, self.video_fps, carried_frames=self.carried_frames)
+
+
+class AsyncFPSReader:
+    """Read FPS from ROI crops of one or more videos on a background thread."""
+
+    def __init__(self, extractor: FPSOCRExtractor, batch_size: int = ROI_BATCH_SIZE):
+        """
+        Args:
+            extractor: OCR setup (ROI, engine, memo, gate); None ROI is
+                auto-detected on the first submitted frame
+            batch_size: Crops per read_fps_batch() call
+        """
+        self.extractor = extractor
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self.roi_detection_failed = False
+
+        self.stats = {'crops': 0, 'batches': 0, 'max_backlog': 0,
+                      'ocr_seconds': 0.0, 'result_wait_seconds': 0.0}
+
+    def open_stream(self, video_fps: float) -> FPSStream:
+        """
+        Start reading a new video.
+
+        Args:
+            video_fps: Frame rate of the video (for timestamps)
+        """
+        return FPSStream(self, video_fps)
+
+    def detect_roi(self, frame: np.ndarray):
+        """Auto-detect the FPS counter on the first frame (as extract_from_video() does)."""
+        print("  Attempting auto-detection of FPS counter...")
+        self.extractor.roi = self.extractor.auto_detect_roi(frame, "top_right")
+        if self.extractor.roi:
+            print(f"  ✓ Auto-detected ROI: x={self.extractor.roi[0]}, y={self.extractor.roi[1]}, "
+                  f"w={self.extractor.roi[2]}, h={self.extractor.roi[3]}")
+        else:
+            print("  ✗ FPS counter auto-detection failed, no FPS data")
+            self.roi_detection_failed = True
+
+    def put(self, item):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="fps-ocr", daemon=True)
+            self._thread.start()
+        self._queue.put(item)
+        self.stats['max_backlog'] = max(self.stats['max_backlog'], self._queue.qsize())
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                return
+
+            stream, frame_indices, crops = item
+            if frame_indices is None:
+                stream._done.set()
+                continue
+            if stream.error is not None:
+                continue
+
+            start = time.perf_counter()
+            try:
+                self.extractor.gate = stream.gate
+                readings = self.extractor.read_fps_batch(crops)
+            except Exception as e:
+                stream.error = e
+                continue
+            self.stats['ocr_seconds'] += time.perf_counter() - start
+            self.stats['crops'] += len(crops)
+            self.stats['batches'] += 1
+
+            for frame_idx, (fps_value, carried) in zip(frame_indices, readings):
+                stream.readings.append((frame_idx, fps_value))
+                if carried:
+                    stream.carried_frames.add(frame_idx)
+
+    def close(self):
+        """Stop the worker thread (after the streams' result() calls)."""
+        if self._thread is not None:
+            self._queue.put(_END)
+            self._thread.join()
+            self._thread = None
+
+    def report(self) -> Dict:
+        """Worker counters for result JSON files."""
+        return {
+            'crops': self.stats['crops'],
+            'batches': self.stats['batches'],
+            'max_backlog_batches': self.stats['max_backlog'],
+            'ocr_seconds': round(self.stats['ocr_seconds'], 2),
+            'result_wait_seconds': round(self.stats['result_wait_seconds'], 2)
+        }
@@ -0,0 +1,120 @@
+"""
+Change gate in front of OCR.
+
+The OSD counter redraws about once a second, so most ROI crops differ from
+the last OCR'd crop only by encoder noise. The gate compares each crop with
+the last crop that went to OCR: the difference is binarized (a pixel changed
+if any channel moved by more than PIXEL_DELTA levels, which encoder noise
+does not reach) and if the mean of that change mask stays within the
+threshold, the previous reading is carried forward instead of running OCR.
+
+Channels are compared separately because colored OSD text can have the same
+gray level as the scene behind it. A background that moves behind the
+overlay changes pixels too, which sends those crops to OCR (the gate saves
+most work on overlays with a steady background).
+
+Carried values are flagged as ``carried`` in FPS data, unlike
+``interpolated`` values which fill OCR failures.
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+# Fraction of ROI pixels that may change before the crop is OCR'd again;
+# a changed digit changes several percent of the pixels of a tight ROI
+DEFAULT_GATE_THRESHOLD = 0.005
+
+# Level change (0-255, any channel) above which a pixel counts as changed
+PIXEL_DELTA = 32
+
+
+class OCRChangeGate:
+    """Carry the last OCR reading forward while the ROI crop stays the same."""
+
+    def __init__(self, threshold: float = DEFAULT_GATE_THRESHOLD):
+        """
+        Args:
+            threshold: Maximum fraction of changed pixels (0-1) between a crop
+                and the last OCR'd crop for a reading to be carried
+        """
+        if not 0 <= threshold < 1:
+            raise ValueError(f"Gate threshold must be in [0, 1), got {threshold}")
+
+        self.threshold = threshold
+        self._reference = None  # Last OCR'd crop (int16)
+        self._value = None
+
+        self.stats = {'ocr': 0, 'carried': 0}
+
+    def reset(self):
+        """Forget the last OCR'd crop, so the next crop always goes to OCR."""
+        self._reference = None
+        self._value = None
+
+    def difference(self, roi_img: np.ndarray) -> float:
+        """Fraction of pixels that differ from the last OCR'd crop (1.0 if there is none)."""
+        if self._reference is None or roi_img.shape != self._reference.shape:
+            return 1.0
+        changed = np.abs(roi_img.astype(np.int16) - self._reference) > PIXEL_DELTA
+        if changed.ndim == 3:
+            changed = changed.any(axis=2)
+        return float(changed.mean())
+
+    def get_or_compute(self, roi_img: np.ndarray, compute: Callable[[np.ndarray], Any]) -> Tuple[Any, bool]:
+        """
+        Return the carried reading for an unchanged crop, or run OCR on it.
+
+        Args:
+            roi_img: ROI crop
+            compute: OCR function called when the crop changed
+
+        Returns:
+            (value, carried): carried is True if OCR was skipped
+        """
+        return self.get_or_compute_batch([roi_img], lambda crops: [compute(crops[0])])[0]
+
+    def get_or_compute_batch(self, roi_imgs: List[np.ndarray],
+                             compute_batch: Callable[[List[np.ndarray]], List[Any]]) -> List[Tuple[Any, bool]]:
+        """
+        Batched get_or_compute(): all changed crops go to one compute call.
+
+        Gate decisions only depend on the crops, so they are made for the whole
+        batch first; carried crops take the reading of the last changed crop
+        before them (or of the last OCR'd crop of the previous batch).
+
+        Args:
+            roi_imgs: ROI crops in frame order
+            compute_batch: OCR function called on the list of changed crops
+
+        Returns:
+            (value, carried) per crop
+        """
+        read = []  # Crops that go to OCR
+        sources = []  # Per crop: (index into read, -1 for the previous reading; carried)
+        for i, roi_img in enumerate(roi_imgs):
+            if self.difference(roi_img) <= self.threshold:
+                self.stats['carried'] += 1
+                sources.append((len(read) - 1, True))
+            else:
+                self.stats['ocr'] += 1
+                self._reference = roi_img.astype(np.int16)
+                read.append(i)
+                sources.append((len(read) - 1, False))
+
+        values = compute_batch([roi_imgs[i] for i in read]) if read else []
+        previous = self._value
+        if values:
+            self._value = values[-1]
+
+        return [(values[j] if j >= 0 else previous, carried) for j, carried in sources]
+
+    def report(self) -> Dict:
+        """Settings and counters for result JSON files."""
+        frames = self.stats['ocr'] + self.stats['carried']
+        return {
+            'threshold': self.threshold,
+            'ocr_frames': self.stats['ocr'],
+            'carried_frames': self.stats['carried'],
+            'skip_rate': self.stats['carried'] / frames if frames else 0.0
+        }
@@ -0,0 +1,144 @@
+"""
+Memoization of OCR results by ROI crop content.
+
+The OSD FPS counter updates about once a second, so on 60 fps captures
+dozens of consecutive ROI crops show the same reading. The memo maps a hash
+of each crop to its OCR result, so only crops with new content reach the
+OCR engine.
+
+Hash modes:
+- exact: BLAKE2b of the crop pixels. Only pixel-identical crops share a
+  result, so readings are the same as running OCR on every crop.
+- perceptual: difference hash (imagehash.dhash) of the grayscale crop.
+  Near-identical crops (encoder noise, slight background changes behind the
+  overlay) share a result too, which gives far more hits on lossy captures
+  but could merge two readings whose digits differ by only a few pixels.
+
+The memo is an LRU bounded to ``max_entries`` results.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+ROI_HASH_MODES = ('exact', 'perceptual')
+DEFAULT_MEMO_SIZE = 4096
+
+# dhash grid size (hash_size^2 bits); finer than the default 8 so digits stay distinguishable
+PERCEPTUAL_HASH_SIZE = 16
+
+
+class OCRMemo:
+    """LRU memo of OCR results keyed by a hash of the ROI crop."""
+
+    def __init__(self, mode: str = 'exact', max_entries: int = DEFAULT_MEMO_SIZE):
+        """
+        Args:
+            mode: 'exact' (pixel-identical crops) or 'perceptual' (dhash)
+            max_entries: Maximum number of remembered results
+        """
+        if mode not in ROI_HASH_MODES:
+            raise ValueError(f"Unknown ROI hash mode: {mode}. Use one of: {', '.join(ROI_HASH_MODES)}")
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be >= 1, got {max_entries}")
+
+        self.mode = mode
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def key(self, roi_img: np.ndarray) -> bytes:
+        """Hash of a ROI crop (includes the crop shape)."""
+        shape = str(roi_img.shape).encode()
+        if self.mode == 'exact':
+            digest = hashlib.blake2b(np.ascontiguousarray(roi_img).data, digest_size=16)
+            digest.update(shape)
+            return digest.digest()
+
+        import cv2
+        import imagehash
+        from PIL import Image
+
+        gray = cv2.cvtColor(roi_img, cv2.COLOR_BGR2GRAY) if roi_img.ndim == 3 else roi_img
+        phash = imagehash.dhash(Image.fromarray(gray), hash_size=PERCEPTUAL_HASH_SIZE)
+        return shape + phash.hash.tobytes()
+
+    def get_or_compute(self, roi_img: np.ndarray, compute: Callable[[np.ndarray], Optional[float]]):
+        """
+        Return the remembered result for a crop, or compute and remember it.
+
+        Args:
+            roi_img: ROI crop
+            compute: OCR function called on a miss
+
+        Returns:
+            OCR result (may be None for failed reads, which are remembered too)
+        """
+        key = self.key(roi_img)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return self._entries[key]
+
+        self.stats['misses'] += 1
+        value = compute(roi_img)
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+        return value
+
+    def get_or_compute_batch(self, roi_imgs: List[np.ndarray],
+                             compute_batch: Callable[[List[np.ndarray]], List[Optional[float]]]) -> List:
+        """
+        Batched get_or_compute(): all crops without a remembered result go to one compute call.
+
+        Crops that repeat within the batch are computed once (and count as hits).
+
+        Args:
+            roi_imgs: ROI crops
+            compute_batch: OCR function called on the list of missing crops
+
+        Returns:
+            OCR result per crop
+        """
+        keys = [self.key(roi_img) for roi_img in roi_imgs]
+        results = {}
+        missing = {}  # key -> first crop with it
+        for i, key in enumerate(keys):
+            if key in results or key in missing:
+                self.stats['hits'] += 1
+            elif key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                results[key] = self._entries[key]
+            else:
+                self.stats['misses'] += 1
+                missing[key] = i
+
+        if missing:
+            values = compute_batch([roi_imgs[i] for i in missing.values()])
+            for key, value in zip(missing, values):
+                results[key] = value
+                self._entries[key] = value
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats['evictions'] += 1
+
+        return [results[key] for key in keys]
+
+    def report(self) -> Dict:
+        """Settings and counters for result JSON files."""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            'mode': self.mode,
+            'max_entries': self.max_entries,
+            'entries': len(self._entries),
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+            'evictions': self.stats['evictions'],
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+        }
@@ -0,0 +1,326 @@
+"""
+Template matching recognizer for OSD counters.
+
+MSI Afterburner / RivaTuner draw the OSD with one fixed font at one fixed
+size, so once the glyphs of a recording are known, reading the counter is a
+template match instead of a neural network pass. The recognizer calibrates
+itself on crops read by the OCR engine:
+
+1. Text color: the first ``calibration_crops`` engine-read crops are
+   binarized (Otsu on the brightest channel, minority class = text). The
+   most common colors of the text pixels are candidates, and the one whose
+   ink (pixels within TEXT_COLOR_TOLERANCE in every channel) splits the
+   most crops into as many glyphs as their OCR text has characters becomes
+   the text color.
+2. Glyphs: ink is split into text lines (row runs) and glyphs (column runs
+   within a line). A crop whose glyph count equals the length of its OCR
+   text (whitespace removed) labels each glyph with its character.
+3. Templates: glyph patches (line height x glyph width) are resized to
+   TEMPLATE_SHAPE and averaged per character.
+
+Reading a batch binarizes all crops at once, segments them and scores every
+glyph against every template with one matrix product. A crop is only
+answered from the templates if all of its glyphs match (score, margin over
+the runner-up character and glyph width); otherwise it goes to the OCR
+engine, whose reading is learned as a new sample. Characters that did not
+occur during calibration (a digit the counter had not shown yet) therefore
+fall back until the engine has read them once.
+
+Every TEMPLATE_AUDIT_INTERVAL-th template reading is also read by the
+engine, which gives the agreement rate reported in ``report()``.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# (height, width) glyph patches are resized to
+TEMPLATE_SHAPE = (24, 16)
+
+# Maximum level difference (any channel) from the text color for a pixel to count as ink
+TEXT_COLOR_TOLERANCE = 64
+
+# Text color candidates: most common colors in bins of COLOR_BIN levels per channel
+CANDIDATE_COLORS = 8
+COLOR_BIN = 32
+
+# Ink runs smaller than this are noise, not glyphs or text lines
+MIN_GLYPH_PIXELS = 4
+MIN_LINE_HEIGHT = 4
+
+# Column gap (fraction of the line height) that separates two words
+WORD_GAP = 0.35
+
+# Glyph match requirements: similarity to the best template (0-1), lead over
+# the best other character, and width difference (fraction of the template width)
+DEFAULT_MIN_SCORE = 0.9
+MIN_MARGIN = 0.05
+MAX_WIDTH_DIFFERENCE = 0.25
+
+DEFAULT_CALIBRATION_CROPS = 200
+TEMPLATE_AUDIT_INTERVAL = 100
+
+
+def _runs(active: np.ndarray) -> List[Tuple[int, int]]:
+    """[start, end) index ranges where a 1-D array is nonzero."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], (active > 0).astype(np.int8), [0]))))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def ink_masks(roi_imgs: List[np.ndarray], text_color: np.ndarray) -> np.ndarray:
+    """Ink masks (pixels close to the text color), an (N, H, W) array for same-shape crops."""
+    if len({roi_img.shape for roi_img in roi_imgs}) > 1:
+        return [ink_masks([roi_img], text_color)[0] for roi_img in roi_imgs]
+    crops = np.asarray(roi_imgs, dtype=np.int16)
+    if crops.ndim == 3:
+        crops = crops[..., np.newaxis]
+    return (np.abs(crops - text_color) <= TEXT_COLOR_TOLERANCE).all(axis=3)
+
+
+def segment_glyphs(mask: np.ndarray) -> List[List[Tuple[int, int, int, int]]]:
+    """
+    Split an ink mask into text lines of glyph boxes
+
+    Args:
+        mask: Boolean ink mask of one crop
+
+    Returns:
+        Per text line (top to bottom), glyph boxes (y0, y1, x0, x1) from left to right
+    """
+    lines = []
+    for y0, y1 in _runs(mask.sum(axis=1)):
+        if y1 - y0 < MIN_LINE_HEIGHT:
+            continue
+        columns = mask[y0:y1].sum(axis=0)
+        glyphs = [(y0, y1, x0, x1) for x0, x1 in _runs(columns) if columns[x0:x1].sum() >= MIN_GLYPH_PIXELS]
+        if glyphs:
+            lines.append(glyphs)
+    return lines
+
+
+class DigitTemplateRecognizer:
+    """Read OSD text by matching glyphs against templates learned from OCR results."""
+
+    def __init__(self, calibration_crops: int = DEFAULT_CALIBRATION_CROPS,
+                 min_score: float = DEFAULT_MIN_SCORE):
+        """
+        Args:
+            calibration_crops: Engine-read crops collected before the text color
+                and the first templates are learned
+            min_score: Minimum glyph similarity (0-1) for a template reading
+        """
+        if calibration_crops < 1:
+            raise ValueError(f"calibration_crops must be >= 1, got {calibration_crops}")
+
+        self.calibration_crops = calibration_crops
+        self.min_score = min_score
+        self.text_color = None  # Learned at calibration (one value per channel)
+
+        self._pending = []  # (crop, text) collected before calibration
+        self._sums = {}  # Character -> summed glyph patches
+        self._widths = {}  # Character -> summed glyph widths
+        self._counts = {}  # Character -> number of glyphs
+        self._matrix = None  # Cached (characters, templates, template norms, widths)
+        self._since_audit = 0
+
+        self.stats = {'matched': 0, 'fallback': 0, 'samples': 0, 'rejected_samples': 0,
+                      'audited': 0, 'audit_agreed': 0}
+
+    @property
+    def calibrated(self) -> bool:
+        """True once the text color is known and at least one glyph template exists."""
+        return self.text_color is not None and bool(self._counts)
+
+    def _glyph_patches(self, mask: np.ndarray, glyphs: List[Tuple[int, int, int, int]]) -> np.ndarray:
+        """Glyph boxes of one mask as flattened TEMPLATE_SHAPE patches."""
+        height, width = TEMPLATE_SHAPE
+        return np.array([cv2.resize(mask[y0:y1, x0:x1].astype(np.float32), (width, height),
+                                    interpolation=cv2.INTER_AREA).ravel()
+                         for y0, y1, x0, x1 in glyphs], dtype=np.float32)
+
+    def learn(self, roi_imgs: List[np.ndarray], texts: List[str]):
+        """
+        Add engine-read crops as labeled samples
+
+        Before calibration the crops are only collected; the text color and
+        the first templates are learned once calibration_crops crops are in.
+
+        Args:
+            roi_imgs: Same-shape ROI crops
+            texts: OCR text per crop (crops without a valid reading should not be passed)
+        """
+        calibrating = self.text_color is None
+        if calibrating:
+            self._pending.extend(zip(roi_imgs, texts))
+            if len(self._pending) < self.calibration_crops:
+                return
+            roi_imgs, texts = map(list, zip(*self._pending))
+            self._pending = []
+            self.text_color = self._learn_text_color(roi_imgs, texts)
+
+        for mask, text in zip(ink_masks(roi_imgs, self.text_color), texts):
+            label = ''.join(text.split())
+            glyphs = [glyph for line in segment_glyphs(mask) for glyph in line]
+            if not label or len(glyphs) != len(label):
+                self.stats['rejected_samples'] += 1
+                continue
+
+            self.stats['samples'] += 1
+            for char, patch, (_, _, x0, x1) in zip(label, self._glyph_patches(mask, glyphs), glyphs):
+                if char not in self._counts:
+                    self._sums[char] = np.zeros_like(patch)
+                    self._widths[char] = 0
+                    self._counts[char] = 0
+                self._sums[char] += patch
+                self._widths[char] += x1 - x0
+                self._counts[char] += 1
+            self._matrix = None
+
+        if calibrating:
+            if self._counts:
+                print(f"  ✓ Digit templates: {len(self._counts)} characters "
+                      f"({''.join(sorted(self._counts))}) from {self.stats['samples']} of {len(roi_imgs)} crops")
+            else:
+                print(f"  ⚠️  Digit templates: glyphs did not match the OCR text in any of "
+                      f"{len(roi_imgs)} crops, reading with the OCR engine only")
+
+    @staticmethod
+    def _learn_text_color(roi_imgs: List[np.ndarray], texts: List[str]) -> np.ndarray:
+        """Text color candidate that segments the most calibration crops into their OCR text length."""
+        pixels = []
+        for roi_img in roi_imgs:
+            crop = roi_img if roi_img.ndim == 3 else roi_img[..., np.newaxis]
+            brightness = np.ascontiguousarray(crop.max(axis=2))
+            _, binary = cv2.threshold(brightness, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            text = binary > 0
+            if text.mean() > 0.5:
+                text = ~text
+            pixels.append(crop[text])
+        pixels = np.concatenate(pixels)
+
+        bins = np.ravel_multi_index((pixels // COLOR_BIN).T.astype(np.intp), (256 // COLOR_BIN,) * pixels.shape[1])
+        counts = np.bincount(bins)
+        candidates = [np.median(pixels[bins == b], axis=0).astype(np.int16)
+                      for b in np.argsort(counts)[::-1][:CANDIDATE_COLORS] if counts[b] > 0]
+
+        lengths = [len(''.join(text.split())) for text in texts]
+
+        def segmented(color: np.ndarray) -> int:
+            return sum(sum(len(line) for line in segment_glyphs(mask)) == length
+                       for mask, length in zip(ink_masks(roi_imgs, color), lengths))
+
+        return max(candidates, key=segmented)
+
+    def _templates(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        if self._matrix is None:
+            chars = sorted(self._counts)
+            templates = np.array([self._sums[c] / self._counts[c] for c in chars], dtype=np.float32)
+            widths = np.array([self._widths[c] / self._counts[c] for c in chars], dtype=np.float32)
+            self._matrix = (chars, templates, (templates ** 2).sum(axis=1), widths)
+        return self._matrix
+
+    def read_batch(self, roi_imgs: List[np.ndarray]) -> List[Optional[str]]:
+        """
+        Read same-shape crops by template matching
+
+        Glyph similarity is 2 g.t / (|g|^2 + |t|^2) between the glyph patch g
+        and the template t (1.0 for identical patches), computed for all
+        glyphs of the batch against all templates with one matrix product.
+
+        Args:
+            roi_imgs: Same-shape ROI crops
+
+        Returns:
+            Text per crop (words separated by spaces), None where a glyph did
+            not match or no text was found (these need the OCR engine)
+        """
+        if not self.calibrated or len(roi_imgs) == 0:
+            self.stats['fallback'] += len(roi_imgs)
+            return [None] * len(roi_imgs)
+
+        chars, templates, template_norms, template_widths = self._templates()
+        masks = ink_masks(roi_imgs, self.text_color)
+
+        layouts = []  # Per crop: text lines of glyph boxes
+        patches = []
+        for mask in masks:
+            lines = segment_glyphs(mask)
+            layouts.append(lines)
+            glyphs = [glyph for line in lines for glyph in line]
+            if glyphs:
+                patches.append(self._glyph_patches(mask, glyphs))
+
+        glyph_chars = []
+        glyph_ok = np.zeros(0, dtype=bool)
+        if patches:
+            patches = np.concatenate(patches)
+            widths = np.array([x1 - x0 for lines in layouts for line in lines for _, _, x0, x1 in line],
+                              dtype=np.float32)
+            norms = (patches ** 2).sum(axis=1)
+            scores = 2 * (patches @ templates.T) / np.maximum(norms[:, None] + template_norms[None, :], 1e-6)
+            width_ok = np.abs(widths[:, None] - template_widths[None, :]) <= \
+                np.maximum(1.0, MAX_WIDTH_DIFFERENCE * template_widths[None, :])
+            scores = np.where(width_ok, scores, 0.0)
+
+            ranked = np.sort(scores, axis=1)
+            best_score = ranked[:, -1]
+            runner_up = ranked[:, -2] if len(chars) > 1 else np.zeros(len(scores))
+            glyph_ok = (best_score >= self.min_score) & (best_score - runner_up >= MIN_MARGIN)
+            glyph_chars = [chars[i] for i in scores.argmax(axis=1)]
+
+        texts = []
+        g = 0
+        for lines in layouts:
+            count = sum(len(line) for line in lines)
+            if count == 0 or not glyph_ok[g:g + count].all():
+                texts.append(None)
+                self.stats['fallback'] += 1
+                g += count
+                continue
+
+            words = []
+            for line in lines:
+                word = glyph_chars[g]
+                for (y0, y1, _, prev_x1), (_, _, x0, _) in zip(line, line[1:]):
+                    g += 1
+                    if x0 - prev_x1 > WORD_GAP * (y1 - y0):
+                        words.append(word)
+                        word = ''
+                    word += glyph_chars[g]
+                g += 1
+                words.append(word)
+            texts.append(' '.join(words))
+            self.stats['matched'] += 1
+
+        return texts
+
+    def should_audit(self) -> bool:
+        """True for every TEMPLATE_AUDIT_INTERVAL-th template reading (also read by the engine)."""
+        self._since_audit += 1
+        if self._since_audit >= TEMPLATE_AUDIT_INTERVAL:
+            self._since_audit = 0
+            return True
+        return False
+
+    def record_audit(self, agreed: bool):
+        """Count an audited template reading and whether the engine read the same value."""
+        self.stats['audited'] += 1
+        if agreed:
+            self.stats['audit_agreed'] += 1
+
+    def report(self) -> Dict:
+        """Settings and counters for result JSON files."""
+        reads = self.stats['matched'] + self.stats['fallback']
+        return {
+            'calibration_crops': self.calibration_crops,
+            'characters': ''.join(sorted(self._counts)),
+            'text_color': self.text_color.tolist() if self.text_color is not None else None,
+            'matched': self.stats['matched'],
+            'fallback': self.stats['fallback'],
+            'match_rate': self.stats['matched'] / reads if reads else 0.0,
+            'samples': self.stats['samples'],
+            'rejected_samples': self.stats['rejected_samples'],
+            'audited': self.stats['audited'],
+            'audit_agreement': self.stats['audit_agreed'] / self.stats['audited'] if self.stats['audited'] else None
+        }
@@ -0,0 +1,247 @@
+"""
+OSD-refresh-aware FPS sampling.
+
+Afterburner / RivaTuner redraw the FPS readout on a fixed period (typically
+250-1000 ms), so between two refreshes every frame shows the same value.
+RefreshSampler estimates that period from the first seconds of a video and
+then OCRs one frame per refresh instead of every sampled frame:
+
+1. Calibration: for the first REFRESH_CALIBRATION_SECONDS every sampled
+   frame is read. Frames where the reading changes are refresh events; the
+   intervals between them are multiples of the refresh period (a refresh
+   may show the same value), see estimate_refresh_period().
+2. Probing: after that, one frame right after each expected refresh is
+   read (PROBE_GUARD of a period late, which absorbs refresh jitter). If its
+   value equals the previous reading, all frames since the previous probe
+   take that value. If it changed, the change frame is located by bisection
+   over the buffered crops (starting at the expected refresh), so readings
+   stay frame-exact, and the refresh phase is re-anchored on it, which
+   tracks drift.
+
+This assumes the value changes at most once between two probes, which
+holds when the period is not overestimated. Under-estimates (e.g. half the
+true period) only cost extra probes. If no consistent period is found,
+every frame is read as before.
+
+Frames that were not read are marked as carried in FPS data.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+REFRESH_CALIBRATION_SECONDS = 8.0
+
+# Value changes needed during calibration to estimate the period
+MIN_REFRESH_EVENTS = 5
+
+# Intervals between changes may deviate by this fraction of the period from a
+# multiple of it; intervals that fit must cover this fraction of the calibration time
+PERIOD_TOLERANCE = 0.1
+MIN_PERIOD_FIT = 0.8
+
+# Shortest plausible OSD refresh period (seconds)
+MIN_REFRESH_PERIOD = 0.1
+
+# Probes are taken this fraction of a period after the expected refresh (at least one frame)
+PROBE_GUARD = 0.1
+
+
+def estimate_refresh_period(change_frames: List[int], video_fps: float, sample_rate: int = 1) -> Optional[float]:
+    """
+    Estimate the OSD refresh period from frames where the reading changed
+
+    The period is the longest change interval (at least MIN_REFRESH_PERIOD)
+    whose multiples match intervals covering at least MIN_PERIOD_FIT of the
+    calibration time within PERIOD_TOLERANCE, refined by least squares over
+    the intervals that fit. Refreshes happen on a fixed clock, so the
+    tolerance does not grow with the multiple. Weighting by time and taking
+    the longest candidate keeps an OCR misread (two short intervals) from
+    failing the fit or splitting the period into fractions.
+
+    Args:
+        change_frames: Frames where the reading differs from the previous one, ascending
+        video_fps: Video frame rate
+        sample_rate: Step between read frames (resolution of the change frames)
+
+    Returns:
+        Period in frames, or None if there are too few changes, no consistent
+        period, or the period is shorter than two sampled frames
+    """
+    if len(change_frames) < MIN_REFRESH_EVENTS:
+        return None
+
+    intervals = np.diff(np.asarray(change_frames, dtype=np.float64))
+    for candidate in np.unique(intervals)[::-1]:
+        if candidate < max(2 * sample_rate, MIN_REFRESH_PERIOD * video_fps):
+            break
+        multiples = np.maximum(1, np.round(intervals / candidate))
+        tolerance = max(sample_rate, PERIOD_TOLERANCE * candidate)
+        fits = np.abs(intervals - multiples * candidate) <= tolerance
+        if intervals[fits].sum() >= MIN_PERIOD_FIT * intervals.sum():
+            return float(multiples[fits] @ intervals[fits] / (multiples[fits] @ multiples[fits]))
+    return None
+
+
+class RefreshSampler:
+    """Read one sampled frame per OSD refresh and expand the readings to every sampled frame."""
+
+    def __init__(self, read_batch: Callable[[List[np.ndarray]], List[Tuple[Optional[float], bool]]],
+                 video_fps: float, sample_rate: int = 1,
+                 calibration_seconds: float = REFRESH_CALIBRATION_SECONDS):
+        """
+        Args:
+            read_batch: Reads ROI crops, returning (value, carried) per crop
+                (e.g. FPSOCRExtractor.read_fps_batch)
+            video_fps: Video frame rate
+            sample_rate: Step between sampled frames
+            calibration_seconds: Video time read in full to estimate the period
+        """
+        self.read_batch = read_batch
+        self.video_fps = video_fps
+        self.sample_rate = sample_rate
+        self.calibration_frames = int(calibration_seconds * video_fps)
+
+        self.period = None  # Frames, once estimated
+        self.calibrating = True
+        self._change_frames = []
+        self._last_value = None
+        self._anchor = None  # Frame of the last located refresh
+        self._last_probe = None
+        self._pending = []  # (frame_idx, crop) after the last probe
+
+        self.stats = {'read': 0, 'skipped': 0, 'bisections': 0}
+
+    def feed(self, frame_indices: List[int], roi_imgs) -> List[Tuple[int, Optional[float], bool]]:
+        """
+        Add the next sampled frames
+
+        Readings are returned as soon as they are known; frames after the last
+        probe are held back until the next probe (or flush()).
+
+        Args:
+            frame_indices: Frame index per crop, ascending
+            roi_imgs: ROI crops
+
+        Returns:
+            (frame_idx, value, carried) for frames whose reading is now known, in order
+        """
+        if self.calibrating:
+            readings = [(frame_idx, value, carried) for frame_idx, (value, carried)
+                        in zip(frame_indices, self.read_batch(roi_imgs))]
+            self.stats['read'] += len(readings)
+            self._calibrate(readings)
+            return readings
+
+        if self.period is None:
+            self.stats['read'] += len(frame_indices)
+            return [(frame_idx, value, carried) for frame_idx, (value, carried)
+                    in zip(frame_indices, self.read_batch(roi_imgs))]
+
+        self._pending.extend(zip(frame_indices, roi_imgs))
+        return self._drain(final=False)
+
+    def flush(self) -> List[Tuple[int, Optional[float], bool]]:
+        """Readings of the frames held back after the last probe (call at the end of the video)."""
+        return self._drain(final=True)
+
+    def _calibrate(self, readings: List[Tuple[int, Optional[float], bool]]):
+        for frame_idx, value, _ in readings:
+            if value is None:
+                continue
+            if self._last_value is not None and value != self._last_value:
+                self._change_frames.append(frame_idx)
+            self._last_value = value
+            self._last_probe = frame_idx
+
+        if readings[-1][0] + 1 < self.calibration_frames:
+            return
+
+        self.calibrating = False
+        self.period = estimate_refresh_period(self._change_frames, self.video_fps, self.sample_rate)
+        if self.period is None:
+            print(f"  ⚠️  OSD refresh period not detected ({len(self._change_frames)} value changes in "
+                  f"{self.calibration_frames} frames), reading every sampled frame")
+            return
+
+        self._anchor = self._change_frames[-1]
+        self._last_probe = readings[-1][0]
+        print(f"  ✓ OSD refresh period: {self.period:.1f} frames "
+              f"({self.period / self.video_fps * 1000:.0f} ms), reading one frame per refresh")
+
+    def _expected_refresh(self, after: int) -> float:
+        """First expected refresh frame after frame ``after``."""
+        k = np.floor((after - self._anchor) / self.period) + 1
+        return self._anchor + k * self.period
+
+    def _drain(self, final: bool) -> List[Tuple[int, Optional[float], bool]]:
+        readings = []
+        if not self._pending:
+            return readings
+
+        guard = max(1.0, PROBE_GUARD * self.period)
+        while self._pending:
+            refresh = self._expected_refresh(self._last_probe)
+            target = refresh + guard
+            j = next((i for i, (frame_idx, _) in enumerate(self._pending) if frame_idx >= target), None)
+            if j is None:
+                if not final:
+                    break
+                j = len(self._pending) - 1
+
+            values = {j: self._read(j)}
+            if values[j][0] != self._last_value:
+                change = self._locate_change(j, refresh, values)
+                self._anchor = self._pending[change][0]
+            else:
+                change = j + 1
+
+            for i, (frame_idx, _) in enumerate(self._pending[:j + 1]):
+                if i in values:
+                    readings.append((frame_idx, values[i][0], values[i][1]))
+                else:
+                    readings.append((frame_idx, self._last_value if i < change else values[j][0], True))
+                    self.stats['skipped'] += 1
+
+            self._last_value = values[j][0]
+            self._last_probe = self._pending[j][0]
+            del self._pending[:j + 1]
+
+        return readings
+
+    def _read(self, i: int) -> Tuple[Optional[float], bool]:
+        self.stats['read'] += 1
+        return self.read_batch([self._pending[i][1]])[0]
+
+    def _locate_change(self, j: int, refresh: float, values: Dict) -> int:
+        """
+        Index of the first pending frame showing the new value (bisection)
+
+        The first split is the frame before the expected refresh, so a
+        refresh on schedule is confirmed with about two extra reads.
+        """
+        self.stats['bisections'] += 1
+        lo, hi = -1, j  # Last known old value (-1 = the previous probe), first known new value
+        first = next((i for i, (frame_idx, _) in enumerate(self._pending) if frame_idx >= refresh), j) - 1
+        mid = first if lo < first < hi else (lo + hi) // 2
+        while hi - lo > 1:
+            values[mid] = self._read(mid)
+            if values[mid][0] == self._last_value:
+                lo = mid
+            else:
+                hi = mid
+            mid = (lo + hi) // 2
+        return hi
+
+    def report(self) -> Dict:
+        """Detected period and read counters for result JSON files."""
+        frames = self.stats['read'] + self.stats['skipped']
+        return {
+            'period_frames': self.period,
+            'period_ms': self.period / self.video_fps * 1000 if self.period else None,
+            'change_events': len(self._change_frames),
+            'read_frames': self.stats['read'],
+            'skipped_frames': self.stats['skipped'],
+            'skip_rate': self.stats['skipped'] / frames if frames else 0.0,
+            'bisections': self.stats['bisections']
+        }
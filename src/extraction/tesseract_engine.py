@@ -0,0 +1,166 @@
+"""
+Tesseract backend for FPS OCR.
+
+pytesseract runs the tesseract executable once per call, which writes the
+image to a temporary file, starts a process and loads the language model
+again for every ROI crop. This engine keeps one in-process Tesseract handle
+(tesserocr, ``pip install tesserocr``) configured once for the whole run,
+and falls back to pytesseract when tesserocr is not installed.
+
+Montage mode tiles many preprocessed ROI crops into one image (one crop per
+row, separated by background-colored gaps) and recognizes it in one call
+as a block of text. Words are assigned back to crops by the vertical center
+of their bounding box, so a crop without a reading does not shift the
+others. With pytesseract this is one tesseract process per batch instead of
+one per crop. Tesseract sees the tiles as one page, so readings can differ
+slightly from single-line recognition; it is opt-in.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# Characters of FPS counter text ("60 FPS", "FPS: 59.9")
+CHAR_WHITELIST = '0123456789FPSfps.:, '
+
+# Single text line per crop, block of lines per montage
+PSM_SINGLE_LINE = 7
+PSM_SINGLE_BLOCK = 6
+
+# Crops per montage image, and background rows between crops
+MONTAGE_TILES = 32
+MONTAGE_GAP = 16
+
+
+class TesseractEngine:
+    """Recognize preprocessed ROI crops with one long-lived Tesseract handle."""
+
+    def __init__(self, montage: bool = False):
+        """
+        Args:
+            montage: Recognize batches of crops as one tiled image (see module docstring)
+
+        Raises:
+            RuntimeError: If neither tesserocr nor the tesseract executable is available
+        """
+        self.montage = montage
+        self._api = None
+
+        if TESSEROCR_AVAILABLE:
+            try:
+                self._api = tesserocr.PyTessBaseAPI(psm=PSM_SINGLE_LINE, oem=tesserocr.OEM.DEFAULT)
+            except RuntimeError as e:
+                print(f"  ⚠️  tesserocr could not load Tesseract data ({e}), using pytesseract")
+            else:
+                self._api.SetVariable('tessedit_char_whitelist', CHAR_WHITELIST)
+                self.backend = 'tesserocr'
+                return
+
+        try:
+            import pytesseract
+            pytesseract.get_tesseract_version()
+        except Exception as e:
+            raise RuntimeError(f"Tesseract not available: {e}")
+        self.backend = 'pytesseract'
+
+    def close(self):
+        """Release the Tesseract handle."""
+        if self._api is not None:
+            self._api.End()
+            self._api = None
+
+    def read_batch(self, images: List[np.ndarray]) -> List[str]:
+        """
+        Recognize preprocessed (grayscale) ROI crops
+
+        Args:
+            images: Grayscale crops, e.g. FPSOCRExtractor.preprocess_roi() output
+
+        Returns:
+            Text per crop ('' where nothing was read)
+        """
+        if not self.montage or len(images) < 2:
+            return [self._read_line(image) for image in images]
+
+        texts = []
+        for start in range(0, len(images), MONTAGE_TILES):
+            texts.extend(self._read_montage(images[start:start + MONTAGE_TILES]))
+        return texts
+
+    def _read_line(self, image: np.ndarray) -> str:
+        if self._api is not None:
+            self._api.SetPageSegMode(PSM_SINGLE_LINE)
+            self._set_image(image)
+            return self._api.GetUTF8Text()
+
+        import pytesseract
+        return pytesseract.image_to_string(image, config=f'--oem 3 --psm {PSM_SINGLE_LINE} '
+                                                         f'-c tessedit_char_whitelist={CHAR_WHITELIST}')
+
+    def _set_image(self, image: np.ndarray):
+        image = np.ascontiguousarray(image)
+        self._api.SetImageBytes(image.tobytes(), image.shape[1], image.shape[0], 1, image.shape[1])
+
+    def _read_montage(self, images: List[np.ndarray]) -> List[str]:
+        """Recognize crops tiled into one image, splitting the words back by tile."""
+        montage, tile_rows = build_montage(images)
+        words = []  # (text, x, y center)
+
+        if self._api is not None:
+            self._api.SetPageSegMode(PSM_SINGLE_BLOCK)
+            self._set_image(montage)
+            self._api.Recognize()
+            level = tesserocr.RIL.WORD
+            for word in tesserocr.iterate_level(self._api.GetIterator(), level):
+                text = word.GetUTF8Text(level)
+                box = word.BoundingBox(level)
+                if text and box:
+                    words.append((text, box[0], (box[1] + box[3]) / 2))
+        else:
+            import pytesseract
+            data = pytesseract.image_to_data(montage, output_type=pytesseract.Output.DICT,
+                                             config=f'--oem 3 --psm {PSM_SINGLE_BLOCK} '
+                                                    f'-c tessedit_char_whitelist={CHAR_WHITELIST}')
+            for text, left, top, height in zip(data['text'], data['left'], data['top'], data['height']):
+                if text.strip():
+                    words.append((text, left, top + height / 2))
+
+        tiles = [[] for _ in images]
+        for text, x, y in words:
+            for i, (top, bottom) in enumerate(tile_rows):
+                if top - MONTAGE_GAP / 2 <= y < bottom + MONTAGE_GAP / 2:
+                    tiles[i].append((x, text.strip()))
+                    break
+        return [' '.join(text for _, text in sorted(tile)) for tile in tiles]
+
+
+def build_montage(images: List[np.ndarray]) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """
+    Stack grayscale crops vertically, separated by MONTAGE_GAP background rows
+
+    Each crop is padded with its own background level (median pixel value),
+    so the gaps look like empty page to Tesseract.
+
+    Returns:
+        (montage image, (top, bottom) rows of each crop)
+    """
+    width = max(image.shape[1] for image in images)
+    pieces = []
+    tile_rows = []
+    y = MONTAGE_GAP
+    for image in images:
+        background = int(np.median(image))
+        tile = np.full((image.shape[0] + MONTAGE_GAP, width), background, dtype=np.uint8)
+        tile[:image.shape[0], :image.shape[1]] = image
+        pieces.append(tile)
+        tile_rows.append((y, y + image.shape[0]))
+        y += tile.shape[0]
+
+    top_margin = np.full((MONTAGE_GAP, width), int(np.median(images[0])), dtype=np.uint8)
+    return np.vstack([top_margin] + pieces), tile_rows
@@ -28,12 +28,21 @@ from scipy.stats import pearsonr, spearmanr
 from statsmodels.stats.stattools import durbin_watson
 from typing import Dict, List, Tuple, Optional
 import argparse
+import sys
 
+# Add project root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-def load_per_frame_data(json_file: Path) -> Optional[pd.DataFrame]:
+
+def load_per_frame_data(json_file: Path, fps_cache=None) -> Optional[pd.DataFrame]:
     """
     Load per-frame data from comparison JSON
 
+    Args:
+        json_file: Comparison result JSON
+        fps_cache: Optional FPSTimelineCache; comparisons run without FPS
+            extraction get the compare video's cached FPS timeline
+
     Returns:
         DataFrame with columns: frame_index, timestamp, fps, ssim, lpips, flip, etc.
     """
@@ -54,6 +63,10 @@ def load_per_frame_data(json_file: Path) -> Optional[pd.DataFrame]:
         # Convert to DataFrame
         df = pd.DataFrame(frames)
 
+        if 'fps' not in df.columns and fps_cache is not None:
+            add_cached_fps(df, per_frame.get('fps_source_video2') or data.get('video2'),
+                           per_frame.get('sample_rate'), fps_cache)
+
         # Add metadata
         comparison_name = json_file.stem
         parts = comparison_name.split('_')
@@ -67,7 +80,30 @@ def load_per_frame_data(json_file: Path) -> Optional[pd.DataFrame]:
         return None
 
 
-def load_all_per_frame_data(results_dir: Path) -> pd.DataFrame:
+def add_cached_fps(df: pd.DataFrame, video_path: Optional[str], sample_rate: Optional[int], fps_cache):
+    """
+    Add 'fps' / 'fps_interpolated' columns from the compare video's cached FPS timeline
+
+    Frames without a cached reading keep NaN. Nothing is added when the video
+    is missing or has no cached timeline usable at the comparison's sample rate.
+    """
+    if not video_path or not Path(video_path).exists():
+        return
+
+    from src.video.sources import probe_video
+
+    cached = fps_cache.get(video_path, sample_rate, probe_video(video_path)['fps'])
+    if cached is None:
+        return
+
+    lookup = {entry['frame']: entry for entry in cached[0]}
+    df['fps'] = [lookup[i]['fps'] if i in lookup else np.nan for i in df['frame_index']]
+    df['fps_interpolated'] = [lookup[i].get('interpolated', False) if i in lookup else False
+                              for i in df['frame_index']]
+    print(f"  ✓ {Path(video_path).name}: FPS from the FPS cache")
+
+
+def load_all_per_frame_data(results_dir: Path, fps_cache=None) -> pd.DataFrame:
     """Load all per-frame data from a results directory"""
     all_frames = []
 
@@ -78,7 +114,7 @@ def load_all_per_frame_data(results_dir: Path) -> pd.DataFrame:
         if 'Consistency' in json_file.stem:
             continue
 
-        df = load_per_frame_data(json_file)
+        df = load_per_frame_data(json_file, fps_cache)
         if df is not None and not df.empty:
             all_frames.append(df)
 
@@ -467,6 +503,8 @@ def main():
                        help='Output directory')
     parser.add_argument('--max-temporal-plots', type=int, default=4,
                        help='Maximum number of temporal plots to generate')
+    parser.add_argument('--fps-cache', type=str,
+                       help='FPS timeline cache directory; fills in FPS for comparisons run without --extract-fps')
 
     args = parser.parse_args()
 
@@ -480,7 +518,11 @@ def main():
     # Load data
     if args.results_dir:
         print(f"📂 Loading from: {args.results_dir}")
-        df = load_all_per_frame_data(Path(args.results_dir))
+        fps_cache = None
+        if args.fps_cache:
+            from src.extraction.fps_cache import FPSTimelineCache
+            fps_cache = FPSTimelineCache(args.fps_cache)
+        df = load_all_per_frame_data(Path(args.results_dir), fps_cache)
     else:
         print("❌ Must provide --results-dir")
         return
@@ -29,6 +29,11 @@ import cv2
 from skimage.metrics import structural_similarity as ssim
 from skimage.metrics import peak_signal_noise_ratio as psnr
 
+# Add project root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.video.sources import open_frame_source, FRAME_SOURCE_BACKENDS
+
 
 def load_fps_from_ocr_json(json_path: Path) -> pd.DataFrame:
     """
@@ -48,7 +53,44 @@ def load_fps_from_ocr_json(json_path: Path) -> pd.DataFrame:
     if not fps_data:
         raise ValueError(f"No FPS data in {json_path}")
 
-    # Convert to DataFrame
+    return aggregate_fps_by_second(fps_data)
+
+
+def load_fps_from_cache(cache_dir: Path, video_path: Path, video_fps: float) -> pd.DataFrame:
+    """
+    Load a video's FPS timeline from the FPS cache and aggregate by second
+
+    Uses the finest cached timeline of the video, whatever ROI and OCR engine
+    it was read with, as long as every sampled frame was OCR'd (timelines
+    with carried or skipped readings are not used, see src/extraction/fps_cache.py).
+
+    Args:
+        cache_dir: FPS cache directory (e.g. run_analysis.py's fps_cache setting)
+        video_path: Video with the FPS overlay
+        video_fps: Video frame rate
+
+    Returns:
+        DataFrame with columns: second, avg_fps, min_fps, max_fps, std_fps
+    """
+    from src.extraction.fps_cache import FPSTimelineCache
+
+    cached = FPSTimelineCache(cache_dir).get(str(video_path), None, video_fps)
+    if cached is None or not cached[0]:
+        raise ValueError(f"No cached FPS timeline for {video_path} in {cache_dir}")
+
+    return aggregate_fps_by_second(cached[0])
+
+
+def aggregate_fps_by_second(fps_data: List[Dict]) -> pd.DataFrame:
+    """
+    Aggregate FPS data entries by second
+
+    Args:
+        fps_data: FPS data entries ('timestamp', 'fps')
+
+    Returns:
+        DataFrame with columns: second, avg_fps, min_fps, max_fps, std_fps
+    """
     df = pd.DataFrame(fps_data)
 
     # Group by second (timestamp already in seconds)
@@ -68,7 +110,9 @@ def load_fps_from_ocr_json(json_path: Path) -> pd.DataFrame:
 def calculate_temporal_quality(
     ground_truth_video: Path,
     test_video: Path,
-    fps: int = 60
+    fps: int = 60,
+    decoder: str = 'opencv',
+    decoder_threads: int = 0
 ) -> pd.DataFrame:
     """
     Calculate SSIM and PSNR for each second of video
@@ -77,14 +121,16 @@ def calculate_temporal_quality(
         ground_truth_video: Path to baseline video
         test_video: Path to test video
         fps: Video FPS (default: 60)
+        decoder: Frame source backend ('opencv' or 'ffmpeg')
+        decoder_threads: Decoder threads for the ffmpeg backend (0 = auto)
 
     Returns:
         DataFrame with columns: second, avg_ssim, avg_psnr, frame_count
     """
-    cap_gt = cv2.VideoCapture(str(ground_truth_video))
-    cap_test = cv2.VideoCapture(str(test_video))
+    source_gt = open_frame_source(str(ground_truth_video), backend=decoder, threads=decoder_threads)
+    source_test = open_frame_source(str(test_video), backend=decoder, threads=decoder_threads)
 
-    total_frames = int(cap_gt.get(cv2.CAP_PROP_FRAME_COUNT))
+    total_frames = source_gt.frame_count
 
     results = []
     current_second = 0
@@ -92,13 +138,9 @@ def calculate_temporal_quality(
     ssim_values = []
     psnr_values = []
 
-    for frame_idx in tqdm(range(total_frames), desc="Analyzing frames", unit="frame"):
-        ret_gt, frame_gt = cap_gt.read()
-        ret_test, frame_test = cap_test.read()
-
-        if not ret_gt or not ret_test:
-            break
-
+    frame_pairs = zip(source_gt, source_test)
+    for (_, frame_gt), (_, frame_test) in tqdm(frame_pairs, total=total_frames,
+                                               desc="Analyzing frames", unit="frame"):
         # Convert to grayscale for SSIM
         gray_gt = cv2.cvtColor(frame_gt, cv2.COLOR_BGR2GRAY)
         gray_test = cv2.cvtColor(frame_test, cv2.COLOR_BGR2GRAY)
@@ -147,8 +189,8 @@ def calculate_temporal_quality(
             'frame_count': len(ssim_values)
         })
 
-    cap_gt.release()
-    cap_test.release()
+    source_gt.release()
+    source_test.release()
 
     return pd.DataFrame(results)
 
@@ -347,12 +389,22 @@ def main():
     parser = argparse.ArgumentParser(
         description="Temporal Quality-Performance Analyzer (OCR version)"
     )
-    parser.add_argument(
+    fps_source = parser.add_mutually_exclusive_group(required=True)
+    fps_source.add_argument(
         "--fps-json",
         type=Path,
-        required=True,
         help="JSON file with FPS data from OCR extraction"
     )
+    fps_source.add_argument(
+        "--fps-cache",
+        type=Path,
+        help="FPS timeline cache directory (timelines cached by earlier comparisons)"
+    )
+    parser.add_argument(
+        "--fps-video",
+        type=Path,
+        help="Video with the FPS overlay to look up in --fps-cache (default: --video-test)"
+    )
     parser.add_argument(
         "--video-test",
         type=Path,
@@ -392,6 +444,18 @@ def main():
         default=60,
         help="Video FPS (default: 60)"
     )
+    parser.add_argument(
+        "--decoder",
+        choices=FRAME_SOURCE_BACKENDS,
+        default="opencv",
+        help="Frame decoder backend (default: opencv)"
+    )
+    parser.add_argument(
+        "--decoder-threads",
+        type=int,
+        default=0,
+        help="Decoder threads for the ffmpeg backend (default: 0 = auto)"
+    )
 
     args = parser.parse_args()
 
@@ -400,9 +464,12 @@ def main():
         print("Temporal Quality-Performance Analysis (OCR)".center(60))
         print("=" * 60)
 
-        # Load FPS data from OCR JSON
+        # Load FPS data from OCR JSON or the FPS cache
         print("\n[1/4] Loading FPS data from OCR...")
-        fps_data = load_fps_from_ocr_json(args.fps_json)
+        if args.fps_json:
+            fps_data = load_fps_from_ocr_json(args.fps_json)
+        else:
+            fps_data = load_fps_from_cache(args.fps_cache, args.fps_video or args.video_test, args.fps)
         print(f"  ✓ Loaded {len(fps_data)} seconds of FPS data")
 
         # Calculate quality metrics
@@ -410,7 +477,9 @@ def main():
         quality_data = calculate_temporal_quality(
             args.video_ground_truth,
             args.video_test,
-            args.fps
+            args.fps,
+            decoder=args.decoder,
+            decoder_threads=args.decoder_threads
         )
         print(f"  ✓ Analyzed {len(quality_data)} seconds of quality data")
 
@@ -223,6 +223,44 @@ def generate_image_report(results, include_psnr=False):
 # GPU-Accelerated Basic Metrics
 # ============================================================================
 
+def _uniform_ssim_batch(gray1: np.ndarray, gray2: np.ndarray, device: str = 'cpu') -> np.ndarray:
+    """
+    SSIM of uint8 grayscale image pairs, computed like skimage's structural_similarity().
+
+    Same definition as the skimage default: 7x7 uniform window, sample
+    covariance, K1=0.01, K2=0.03, data range 255, mean over the pixels whose
+    window lies inside the image. A pooling pass without padding covers
+    exactly those pixels, so no border handling is needed. Runs in float64,
+    which matches skimage to rounding error.
+
+    Args:
+        gray1: First grayscale images (B, H, W), uint8
+        gray2: Second grayscale images (B, H, W), uint8
+        device: Torch device to compute on
+
+    Returns:
+        SSIM score per pair (B,)
+    """
+    win_size = 7
+    cov_norm = win_size ** 2 / (win_size ** 2 - 1)
+    c1 = (0.01 * 255.0) ** 2
+    c2 = (0.03 * 255.0) ** 2
+
+    x = torch.from_numpy(np.ascontiguousarray(gray1)).to(device).double().unsqueeze(1)
+    y = torch.from_numpy(np.ascontiguousarray(gray2)).to(device).double().unsqueeze(1)
+
+    def window_mean(t):
+        return F.avg_pool2d(t, win_size, stride=1)
+
+    ux, uy = window_mean(x), window_mean(y)
+    vx = cov_norm * (window_mean(x * x) - ux * ux)
+    vy = cov_norm * (window_mean(y * y) - uy * uy)
+    vxy = cov_norm * (window_mean(x * y) - ux * uy)
+
+    s = ((2 * ux * uy + c1) * (2 * vxy + c2)) / ((ux ** 2 + uy ** 2 + c1) * (vx + vy + c2))
+    return s.mean(dim=(1, 2, 3)).cpu().numpy()
+
+
 class BasicMetricsGPU:
     """
     GPU-accelerated basic image quality metrics using PyTorch.
@@ -232,6 +270,10 @@ class BasicMetricsGPU:
 
     Falls back to CPU implementations if GPU is unavailable or if required
     libraries (pytorch-msssim) are not installed.
+
+    On CUDA, SSIM comes from pytorch-msssim (11x11 Gaussian window). On the
+    CPU it is computed like scikit-image (7x7 uniform window), so CPU results
+    are the same with and without batching; see ``ssim_backend``.
     """
 
     def __init__(self, device='cuda'):
@@ -253,6 +295,9 @@ class BasicMetricsGPU:
             print("⚠️  pytorch-msssim not available, SSIM will fall back to CPU")
             print("   Install with: pip install pytorch-msssim")
 
+        # SSIM implementation used for every score: 'pytorch-msssim' or 'skimage'
+        self.ssim_backend = 'pytorch-msssim' if PYTORCH_MSSSIM_AVAILABLE and device != 'cpu' else 'skimage'
+
     def _frame_to_tensor(self, frame: np.ndarray) -> torch.Tensor:
         """
         Convert OpenCV BGR frame to PyTorch tensor.
@@ -342,7 +387,7 @@ class BasicMetricsGPU:
         Returns:
             SSIM score (0-1 range, higher is better)
         """
-        if not PYTORCH_MSSSIM_AVAILABLE:
+        if self.ssim_backend == 'skimage':
             # Fallback to CPU implementation
             gray1 = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
             gray2 = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
@@ -363,7 +408,26 @@ class BasicMetricsGPU:
 
         return ssim_value
 
-    def compute_all(self, frame1: np.ndarray, frame2: np.ndarray) -> Dict[str, float]:
+    def prepare_reference(self, frame: np.ndarray) -> Dict[str, object]:
+        """
+        Upload a reference frame once for comparison against several frames.
+
+        Args:
+            frame: Reference frame (OpenCV BGR format)
+
+        Returns:
+            Dict with the device tensor and its grayscale version, for compute_all(reference=...)
+        """
+        tensor = self._frame_to_tensor(frame)
+        reference = {'tensor': tensor}
+        if self.ssim_backend == 'pytorch-msssim':
+            reference['gray'] = self._tensor_to_grayscale(tensor)
+        else:
+            reference['gray_cpu'] = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return reference
+
+    def compute_all(self, frame1: np.ndarray, frame2: np.ndarray,
+                    reference: Dict[str, object] = None) -> Dict[str, float]:
         """
         Compute all basic metrics (SSIM, MSE, PSNR) in a single GPU pass.
 
@@ -373,12 +437,16 @@ class BasicMetricsGPU:
         Args:
             frame1: First frame (OpenCV BGR format)
             frame2: Second frame (OpenCV BGR format)
+            reference: Optional prepare_reference(frame1) result to skip re-uploading frame1
 
         Returns:
             Dictionary with 'ssim', 'mse', and 'psnr' values
         """
+        if reference is None:
+            reference = {}
+
         # Convert frames to tensors once
-        f1 = self._frame_to_tensor(frame1)
+        f1 = reference['tensor'] if 'tensor' in reference else self._frame_to_tensor(frame1)
         f2 = self._frame_to_tensor(frame2)
 
         with torch.no_grad():
@@ -392,13 +460,15 @@ class BasicMetricsGPU:
                 psnr_value = 10 * np.log10((255.0 ** 2) / mse)
 
             # SSIM (grayscale)
-            if PYTORCH_MSSSIM_AVAILABLE:
-                gray1 = self._tensor_to_grayscale(f1)
+            if self.ssim_backend == 'pytorch-msssim':
+                gray1 = reference['gray'] if 'gray' in reference else self._tensor_to_grayscale(f1)
                 gray2 = self._tensor_to_grayscale(f2)
                 ssim_score = torch_ssim(gray1, gray2, data_range=255.0, size_average=True).item()
             else:
                 # Fallback to CPU for SSIM
-                gray1_cpu = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
+                gray1_cpu = reference.get('gray_cpu')
+                if gray1_cpu is None:
+                    gray1_cpu = cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY)
                 gray2_cpu = cv2.cvtColor(frame2, cv2.COLOR_BGR2GRAY)
                 ssim_score = ssim(gray1_cpu, gray2_cpu)
 
@@ -407,3 +477,88 @@ class BasicMetricsGPU:
             'mse': mse,
             'psnr': psnr_value
         }
+
+    def _frames_to_tensor(self, frames: np.ndarray) -> torch.Tensor:
+        """
+        Convert a stack of OpenCV BGR frames to a PyTorch tensor.
+
+        The stack is transferred as uint8 (a quarter of the float32 size) and
+        converted on the device.
+
+        Args:
+            frames: Frame stack (B, H, W, C) in BGR format
+
+        Returns:
+            PyTorch tensor (B, C, H, W) in BGR format on device
+        """
+        tensor = torch.from_numpy(np.ascontiguousarray(frames)).to(self.device)
+        return tensor.permute(0, 3, 1, 2).float()
+
+    def prepare_reference_batch(self, frames: np.ndarray) -> Dict[str, object]:
+        """
+        Upload a stack of reference frames once for comparison against several stacks.
+
+        Args:
+            frames: Reference frame stack (B, H, W, C) in BGR format
+
+        Returns:
+            Dict with the device tensor and its grayscale version, for compute_all_batch(reference=...)
+        """
+        tensor = self._frames_to_tensor(frames)
+        reference = {'tensor': tensor}
+        if self.ssim_backend == 'pytorch-msssim':
+            reference['gray'] = self._tensor_to_grayscale(tensor)
+        else:
+            reference['gray_cpu'] = np.stack([cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames])
+        return reference
+
+    def compute_all_batch(self, frames1: np.ndarray, frames2: np.ndarray,
+                          reference: Dict[str, object] = None) -> Dict[str, np.ndarray]:
+        """
+        Compute SSIM, MSE and PSNR for a batch of frame pairs in one tensor pass.
+
+        Each stack is converted and transferred once, and every metric runs on
+        the whole batch, which uses the intra-op threads of torch on CPU and
+        amortizes kernel launches on GPU. Per-pair results match compute_all().
+
+        Args:
+            frames1: First frames (B, H, W, C), OpenCV BGR format
+            frames2: Second frames (B, H, W, C), OpenCV BGR format
+            reference: Optional prepare_reference_batch(frames1) result to skip re-uploading frames1
+
+        Returns:
+            Dictionary with 'ssim', 'mse', and 'psnr' arrays of length B
+        """
+        if reference is None:
+            reference = {}
+
+        f1 = reference['tensor'] if 'tensor' in reference else self._frames_to_tensor(frames1)
+        f2 = self._frames_to_tensor(frames2)
+
+        with torch.no_grad():
+            # MSE per frame (squared differences are integers, summed exactly in float64)
+            squared_sum = ((f1 - f2) ** 2).sum(dim=(1, 2, 3), dtype=torch.float64)
+            mse = (squared_sum / f1[0].numel()).cpu().numpy()
+
+            # PSNR (from MSE), inf for identical frames
+            with np.errstate(divide='ignore'):
+                psnr_values = np.where(mse == 0, np.inf, 10 * np.log10((255.0 ** 2) / mse))
+
+            # SSIM (grayscale)
+            if self.ssim_backend == 'pytorch-msssim':
+                gray1 = reference['gray'] if 'gray' in reference else self._tensor_to_grayscale(f1)
+                gray2 = self._tensor_to_grayscale(f2)
+                ssim_scores = torch_ssim(gray1, gray2, data_range=255.0, size_average=False).double().cpu().numpy()
+            else:
+                # Same grayscale conversion and window as the scikit-image path
+                gray1_cpu = reference.get('gray_cpu')
+                if gray1_cpu is None:
+                    gray1_cpu = np.stack([cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames1])
+                gray2_cpu = np.stack([cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames2])
+                ssim_scores = _uniform_ssim_batch(gray1_cpu, gray2_cpu, self.device)
+
+        return {
+            'ssim': ssim_scores,
+            'mse': mse,
+            'psnr': psnr_values
+        }
@@ -66,12 +66,117 @@ class AdvancedMetrics:
         # Add batch dimension and move to device
         return tensor.unsqueeze(0).to(self.device)
 
-    def compute_lpips(self, frame1: np.ndarray, frame2: np.ndarray) -> Optional[float]:
+    def _lpips_tensor(self, frame: np.ndarray) -> 'torch.Tensor':
+        """Convert a BGR frame to the normalized RGB tensor LPIPS expects."""
+        # Convert BGR → RGB
+        img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        # Normalize to [-1, 1] and convert to torch tensor
+        img_tensor = torch.from_numpy(img_rgb).permute(2, 0, 1).float() / 127.5 - 1.0
+
+        # Add batch dimension
+        return img_tensor.unsqueeze(0).to(self.device)
+
+    def _frames_to_tensor_batch(self, frames: np.ndarray) -> 'torch.Tensor':
+        """
+        Convert a stack of OpenCV BGR frames to a PyTorch tensor.
+
+        Args:
+            frames: Frame stack (B, H, W, C) in BGR format
+
+        Returns:
+            PyTorch tensor (B, C, H, W) in BGR format on device (uploaded as uint8)
+        """
+        if not LPIPS_AVAILABLE:
+            raise ImportError("PyTorch required for tensor conversion")
+
+        import torch
+        tensor = torch.from_numpy(np.ascontiguousarray(frames)).to(self.device)
+        return tensor.permute(0, 3, 1, 2).float()
+
+    def _lpips_tensor_batch(self, frames: np.ndarray) -> 'torch.Tensor':
+        """Convert a BGR frame stack (B, H, W, C) to the normalized RGB tensor LPIPS expects."""
+        # BGR → RGB on the device, normalized to [-1, 1]
+        return torch.flip(self._frames_to_tensor_batch(frames), dims=[1]) / 127.5 - 1.0
+
+    @property
+    def flip_backend(self) -> str:
+        """FLIP implementation compute_flip() uses ('cpu' or 'gpu')."""
+        return 'gpu' if self.device == 'cuda' and KORNIA_AVAILABLE and LPIPS_AVAILABLE else 'cpu'
+
+    @property
+    def flow_backend(self) -> str:
+        """Optical flow implementation compute_optical_flow_error() uses ('cpu' or 'gpu')."""
+        return 'gpu' if self.device == 'cuda' and KORNIA_AVAILABLE and LPIPS_AVAILABLE else 'cpu'
+
+    def prepare_reference(self, frame: np.ndarray,
+                          prev_frame: Optional[np.ndarray] = None,
+                          next_frame: Optional[np.ndarray] = None,
+                          cached: Optional[Dict] = None,
+                          batched: bool = False) -> Dict[str, any]:
+        """
+        Precompute the reference-frame side of all metrics.
+
+        When one reference frame is compared against several videos, pass the
+        result to compute_all_metrics(reference=...) so the reference tensor
+        upload, LAB/edge conversion and optical flow error are done only once.
+
+        Args:
+            frame: Reference frame (BGR)
+            prev_frame, next_frame: Reference temporal neighbours (for optical flow)
+            cached: Features of this frame loaded from a ReferenceFeatures cache
+                ('flow_error', 'flip_edges'); these are not recomputed
+            batched: The frame goes through compute_*_batch(), which take the
+                LPIPS tensor from prepare_reference_batch(); skip the upload
+
+        Returns:
+            Dict of precomputed reference data
+        """
+        reference = dict(cached) if cached else {}
+
+        if LPIPS_AVAILABLE and not batched:
+            reference['lpips_tensor'] = self._lpips_tensor(frame)
+
+        # Only the CPU FLIP path consumes these
+        if self.flip_backend == 'cpu':
+            reference['flip_lab'] = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+            if 'flip_edges' not in reference:
+                reference['flip_edges'] = cv2.Canny(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), 50, 150)
+
+        if prev_frame is not None and next_frame is not None and 'flow_error' not in reference:
+            try:
+                reference['flow_error'] = self.compute_optical_flow_error(prev_frame, frame, next_frame)
+            except Exception:
+                pass  # compute_all_metrics retries per pair and reports the failure
+
+        return reference
+
+    def prepare_reference_batch(self, frames: np.ndarray) -> Dict[str, any]:
+        """
+        Upload a stack of reference frames once for the batched metrics.
+
+        Per-frame reference data (FLIP maps, optical flow error) still comes
+        from prepare_reference(..., batched=True).
+
+        Args:
+            frames: Reference frame stack (B, H, W, C), BGR
+
+        Returns:
+            Dict of precomputed reference tensors, for compute_lpips_batch(reference=...)
+        """
+        reference = {}
+        if LPIPS_AVAILABLE:
+            reference['lpips_tensor'] = self._lpips_tensor_batch(frames)
+        return reference
+
+    def compute_lpips(self, frame1: np.ndarray, frame2: np.ndarray,
+                      reference: Optional[Dict] = None) -> Optional[float]:
         """
         Compute LPIPS (Learned Perceptual Image Patch Similarity).
 
         Args:
             frame1, frame2: BGR images (OpenCV format)
+            reference: Optional prepare_reference() result for frame1
 
         Returns:
             LPIPS distance (lower is better, range [0, 1+])
@@ -79,23 +184,43 @@ class AdvancedMetrics:
         if not LPIPS_AVAILABLE:
             return None
 
-        # Convert BGR → RGB
-        img1_rgb = cv2.cvtColor(frame1, cv2.COLOR_BGR2RGB)
-        img2_rgb = cv2.cvtColor(frame2, cv2.COLOR_BGR2RGB)
-
-        # Normalize to [-1, 1] and convert to torch tensor
-        img1_tensor = torch.from_numpy(img1_rgb).permute(2, 0, 1).float() / 127.5 - 1.0
-        img2_tensor = torch.from_numpy(img2_rgb).permute(2, 0, 1).float() / 127.5 - 1.0
-
-        # Add batch dimension
-        img1_tensor = img1_tensor.unsqueeze(0).to(self.device)
-        img2_tensor = img2_tensor.unsqueeze(0).to(self.device)
+        if reference is not None and 'lpips_tensor' in reference:
+            img1_tensor = reference['lpips_tensor']
+        else:
+            img1_tensor = self._lpips_tensor(frame1)
+        img2_tensor = self._lpips_tensor(frame2)
 
         with torch.no_grad():
             distance = self.lpips_model(img1_tensor, img2_tensor)
 
         return float(distance.item())
 
+    def compute_lpips_batch(self, frames1: np.ndarray, frames2: np.ndarray,
+                            reference: Optional[Dict] = None) -> Optional[np.ndarray]:
+        """
+        Compute LPIPS for a batch of frame pairs in one network pass.
+
+        Args:
+            frames1, frames2: BGR frame stacks (B, H, W, C)
+            reference: Optional prepare_reference_batch() result for frames1
+
+        Returns:
+            Array of B LPIPS distances (lower is better), or None if LPIPS is unavailable
+        """
+        if not LPIPS_AVAILABLE:
+            return None
+
+        if reference is not None and 'lpips_tensor' in reference:
+            img1_tensor = reference['lpips_tensor']
+        else:
+            img1_tensor = self._lpips_tensor_batch(frames1)
+        img2_tensor = self._lpips_tensor_batch(frames2)
+
+        with torch.no_grad():
+            distances = self.lpips_model(img1_tensor, img2_tensor)
+
+        return distances.flatten().double().cpu().numpy()
+
     def compute_optical_flow_error(self, prev_frame: np.ndarray,
                                     curr_frame: np.ndarray,
                                     next_frame: np.ndarray) -> Dict[str, float]:
@@ -388,7 +513,8 @@ class AdvancedMetrics:
 
         return warped
 
-    def compute_flip(self, frame1: np.ndarray, frame2: np.ndarray) -> float:
+    def compute_flip(self, frame1: np.ndarray, frame2: np.ndarray,
+                     reference: Optional[Dict] = None) -> float:
         """
         Compute FLIP-like metric (simplified version).
 
@@ -401,32 +527,40 @@ class AdvancedMetrics:
 
         Args:
             frame1, frame2: BGR images
+            reference: Optional prepare_reference() result for frame1 (CPU path)
 
         Returns:
             FLIP score (lower is better)
         """
         # Try GPU version first if available
-        if self.device == 'cuda' and KORNIA_AVAILABLE and LPIPS_AVAILABLE:
+        if self.flip_backend == 'gpu':
             try:
                 return self.compute_flip_gpu(frame1, frame2)
             except Exception as e:
                 warnings.warn(f"GPU FLIP failed, falling back to CPU: {e}")
 
         # CPU fallback
-        return self.compute_flip_cpu(frame1, frame2)
+        return self.compute_flip_cpu(frame1, frame2, reference)
 
-    def compute_flip_cpu(self, frame1: np.ndarray, frame2: np.ndarray) -> float:
+    def compute_flip_cpu(self, frame1: np.ndarray, frame2: np.ndarray,
+                         reference: Optional[Dict] = None) -> float:
         """
         CPU implementation of FLIP metric.
 
         Args:
             frame1, frame2: BGR images
+            reference: Optional prepare_reference() result for frame1
 
         Returns:
             FLIP score (lower is better)
         """
+        if reference is None:
+            reference = {}
+
         # Convert to LAB color space (perceptually uniform)
-        lab1 = cv2.cvtColor(frame1, cv2.COLOR_BGR2LAB)
+        lab1 = reference.get('flip_lab')
+        if lab1 is None:
+            lab1 = cv2.cvtColor(frame1, cv2.COLOR_BGR2LAB)
         lab2 = cv2.cvtColor(frame2, cv2.COLOR_BGR2LAB)
 
         # Compute per-channel differences
@@ -438,7 +572,9 @@ class AdvancedMetrics:
         weighted_diff = diff_l * 0.5 + diff_a * 0.25 + diff_b * 0.25
 
         # Apply edge-aware filtering (artifacts more visible at edges)
-        edges1 = cv2.Canny(cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY), 50, 150)
+        edges1 = reference.get('flip_edges')
+        if edges1 is None:
+            edges1 = cv2.Canny(cv2.cvtColor(frame1, cv2.COLOR_BGR2GRAY), 50, 150)
         edge_mask = (edges1 > 0).astype(float)
 
         # Weight errors near edges more heavily
@@ -456,12 +592,54 @@ class AdvancedMetrics:
         Returns:
             FLIP score (lower is better)
         """
-        import torch
-
         # Convert frames to tensors (1, 3, H, W) in BGR format
         f1 = self._frame_to_tensor(frame1)
         f2 = self._frame_to_tensor(frame2)
 
+        return float(self._flip_gpu_tensors(f1, f2)[0].item())
+
+    def compute_flip_batch(self, frames1: np.ndarray, frames2: np.ndarray,
+                           references: Optional[list] = None) -> np.ndarray:
+        """
+        Compute FLIP for a batch of frame pairs.
+
+        On the GPU backend the whole batch goes through one Kornia pass; the
+        CPU backend computes each pair as compute_flip_cpu() does.
+
+        Args:
+            frames1, frames2: BGR frame stacks (B, H, W, C)
+            references: Optional prepare_reference() result per frame of frames1 (CPU path)
+
+        Returns:
+            Array of B FLIP scores (lower is better)
+        """
+        if self.flip_backend == 'gpu':
+            try:
+                f1 = self._frames_to_tensor_batch(frames1)
+                f2 = self._frames_to_tensor_batch(frames2)
+                return self._flip_gpu_tensors(f1, f2).double().cpu().numpy()
+            except Exception as e:
+                warnings.warn(f"GPU FLIP failed, falling back to CPU: {e}")
+
+        if references is None:
+            references = [None] * len(frames1)
+        return np.array([
+            self.compute_flip_cpu(frame1, frame2, reference)
+            for frame1, frame2, reference in zip(frames1, frames2, references)
+        ])
+
+    def _flip_gpu_tensors(self, f1: 'torch.Tensor', f2: 'torch.Tensor') -> 'torch.Tensor':
+        """
+        FLIP scores of BGR tensor batches with Kornia.
+
+        Args:
+            f1, f2: BGR tensors (B, 3, H, W) in [0, 255]
+
+        Returns:
+            Tensor of B FLIP scores
+        """
+        import torch
+
         with torch.no_grad():
             # Convert BGR → RGB and normalize to [0, 1] for Kornia
             # Kornia expects RGB in range [0, 1], but OpenCV uses [0, 255]
@@ -504,10 +682,10 @@ class AdvancedMetrics:
             # Weight errors near edges more heavily
             weighted_diff = weighted_diff * (1.0 + edge_mask * 0.5)
 
-            # Compute mean
-            flip_score = torch.mean(weighted_diff).item()
+            # Mean per frame
+            flip_scores = torch.mean(weighted_diff, dim=(1, 2, 3))
 
-        return flip_score
+        return flip_scores
 
 
 def compute_all_metrics(frame1: np.ndarray,
@@ -516,7 +694,8 @@ def compute_all_metrics(frame1: np.ndarray,
                         prev_frame2: Optional[np.ndarray] = None,
                         next_frame1: Optional[np.ndarray] = None,
                         next_frame2: Optional[np.ndarray] = None,
-                        metrics_instance: Optional[AdvancedMetrics] = None) -> Dict[str, any]:
+                        metrics_instance: Optional[AdvancedMetrics] = None,
+                        reference: Optional[Dict] = None) -> Dict[str, any]:
     """
     Compute all available advanced metrics for a frame pair.
 
@@ -525,6 +704,8 @@ def compute_all_metrics(frame1: np.ndarray,
         prev_frame1, prev_frame2: Previous frames (for optical flow)
         next_frame1, next_frame2: Next frames (for optical flow)
         metrics_instance: Reusable AdvancedMetrics instance
+        reference: Optional AdvancedMetrics.prepare_reference() result for frame1,
+            shared when one reference frame is compared against several videos
 
     Returns:
         Dict with all computed metrics
@@ -535,28 +716,63 @@ def compute_all_metrics(frame1: np.ndarray,
     results = {}
 
     # LPIPS
-    lpips_score = metrics_instance.compute_lpips(frame1, frame2)
+    lpips_score = metrics_instance.compute_lpips(frame1, frame2, reference)
     if lpips_score is not None:
         results['lpips'] = lpips_score
 
     # FLIP
-    flip_score = metrics_instance.compute_flip(frame1, frame2)
+    flip_score = metrics_instance.compute_flip(frame1, frame2, reference)
     if flip_score is not None:
         results['flip'] = flip_score
 
     # Optical Flow (requires prev/next frames)
-    if prev_frame1 is not None and next_frame1 is not None and prev_frame2 is not None and next_frame2 is not None:
-        try:
-            of_error1 = metrics_instance.compute_optical_flow_error(prev_frame1, frame1, next_frame1)
-            of_error2 = metrics_instance.compute_optical_flow_error(prev_frame2, frame2, next_frame2)
-
-            # Combine errors from both videos
-            results['optical_flow'] = {
-                'video1_mean_error': of_error1['mean_error'],
-                'video2_mean_error': of_error2['mean_error'],
-                'difference': abs(of_error1['mean_error'] - of_error2['mean_error'])
-            }
-        except Exception as e:
-            warnings.warn(f"Optical flow computation failed: {e}")
+    optical_flow = compute_optical_flow_consistency(
+        frame1, frame2, prev_frame1, prev_frame2, next_frame1, next_frame2, metrics_instance, reference
+    )
+    if optical_flow is not None:
+        results['optical_flow'] = optical_flow
 
     return results
+
+
+def compute_optical_flow_consistency(frame1: np.ndarray,
+                                     frame2: np.ndarray,
+                                     prev_frame1: Optional[np.ndarray],
+                                     prev_frame2: Optional[np.ndarray],
+                                     next_frame1: Optional[np.ndarray],
+                                     next_frame2: Optional[np.ndarray],
+                                     metrics_instance: AdvancedMetrics,
+                                     reference: Optional[Dict] = None) -> Optional[Dict[str, float]]:
+    """
+    Compare the optical flow consistency of a frame pair (ghosting difference).
+
+    Args:
+        frame1, frame2: Current frames to compare (BGR)
+        prev_frame1, prev_frame2: Previous frames
+        next_frame1, next_frame2: Next frames
+        metrics_instance: AdvancedMetrics instance
+        reference: Optional prepare_reference() result for frame1 (cached 'flow_error')
+
+    Returns:
+        Dict with video1_mean_error, video2_mean_error and difference, or None
+        without temporal neighbours or if the flow computation failed
+    """
+    if prev_frame1 is None or next_frame1 is None or prev_frame2 is None or next_frame2 is None:
+        return None
+
+    try:
+        if reference is not None and 'flow_error' in reference:
+            of_error1 = reference['flow_error']
+        else:
+            of_error1 = metrics_instance.compute_optical_flow_error(prev_frame1, frame1, next_frame1)
+        of_error2 = metrics_instance.compute_optical_flow_error(prev_frame2, frame2, next_frame2)
+    except Exception as e:
+        warnings.warn(f"Optical flow computation failed: {e}")
+        return None
+
+    # Combine errors from both videos
+    return {
+        'video1_mean_error': of_error1['mean_error'],
+        'video2_mean_error': of_error2['mean_error'],
+        'difference': abs(of_error1['mean_error'] - of_error2['mean_error'])
+    }
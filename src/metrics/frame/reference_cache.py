@@ -0,0 +1,173 @@
+"""
+Persistent cache of reference-only metric features.
+
+Every comparison in an analysis config uses the same reference video, and
+some metric inputs depend on the reference alone:
+
+- the optical flow error of the reference (two Farneback/LK flows per frame)
+- the Canny edge mask that weights the CPU FLIP error
+
+These are computed once per reference frame and stored on disk, keyed by the
+reference's content fingerprint plus everything that affects the decoded
+frames and the flow implementation (sample rate, decoder, seek threshold,
+flow backend). Later comparisons read them back instead of recomputing.
+Cached values are the exact values the metrics would compute, so results do
+not change.
+
+One ``.refcache.npz`` file per key holds:
+- ``flow``: (N, 5) float64 rows of frame index + forward/backward/mean error
+  and flow magnitude
+- ``edges_<frame_index>``: Canny edge mask packed to one bit per pixel
+- ``edges_shape``: (height, width) of the edge masks
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.video.fingerprint import file_fingerprint
+
+CACHE_SUFFIX = '.refcache.npz'
+
+FLOW_FIELDS = ('forward_error', 'backward_error', 'mean_error', 'flow_magnitude')
+
+
+class ReferenceFeatures:
+    """Cached features of one reference video (for one decode/flow configuration)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._flow: Dict[int, Dict[str, float]] = {}
+        self._edges: Dict[int, np.ndarray] = {}
+        self._edges_shape = None
+        self._npz = None
+        self._dirty = False
+
+        self.stats = {'hits': 0, 'misses': 0}
+
+        if path.exists():
+            self._load()
+
+    def _load(self):
+        try:
+            npz = np.load(self.path)
+            for row in npz['flow']:
+                self._flow[int(row[0])] = dict(zip(FLOW_FIELDS, (float(v) for v in row[1:])))
+            self._edges_shape = tuple(int(v) for v in npz['edges_shape']) if 'edges_shape' in npz else None
+        except (OSError, ValueError, KeyError):
+            # Unreadable cache file: start over, it is rewritten on save()
+            self._flow = {}
+            self._edges_shape = None
+            return
+        self._npz = npz  # Edge masks are read lazily per frame
+
+    def get(self, frame_idx: int) -> Dict:
+        """
+        Cached features of one reference frame.
+
+        Returns:
+            Partial AdvancedMetrics.prepare_reference() dict ('flow_error', 'flip_edges')
+        """
+        cached = {}
+        if frame_idx in self._flow:
+            cached['flow_error'] = dict(self._flow[frame_idx])
+
+        edges = self._get_edges(frame_idx)
+        if edges is not None:
+            cached['flip_edges'] = edges
+
+        self.stats['hits' if cached else 'misses'] += 1
+        return cached
+
+    def _get_edges(self, frame_idx: int) -> Optional[np.ndarray]:
+        if frame_idx in self._edges:
+            packed = self._edges[frame_idx]
+        elif self._npz is not None and f'edges_{frame_idx}' in self._npz:
+            packed = self._npz[f'edges_{frame_idx}']
+        else:
+            return None
+
+        height, width = self._edges_shape
+        bits = np.unpackbits(packed, count=height * width).reshape(height, width)
+        return bits * np.uint8(255)  # Canny output values
+
+    def put(self, frame_idx: int, reference: Dict):
+        """Store the cacheable parts of a prepare_reference() result."""
+        if 'flow_error' in reference and frame_idx not in self._flow:
+            self._flow[frame_idx] = {field: reference['flow_error'][field] for field in FLOW_FIELDS}
+            self._dirty = True
+
+        edges = reference.get('flip_edges')
+        if edges is not None and frame_idx not in self._edges and \
+                not (self._npz is not None and f'edges_{frame_idx}' in self._npz):
+            if self._edges_shape is not None and self._edges_shape != edges.shape:
+                return  # Different resolution than the stored masks; keep the cache consistent
+            self._edges_shape = edges.shape
+            self._edges[frame_idx] = np.packbits(edges > 0)
+            self._dirty = True
+
+    def save(self):
+        """Write new entries to disk (atomically replaces the cache file)."""
+        if not self._dirty:
+            return
+
+        arrays = {}
+        if self._npz is not None:
+            for key in self._npz.files:
+                if key.startswith('edges_') and key != 'edges_shape':
+                    arrays[key] = self._npz[key]
+            self._npz.close()
+            self._npz = None
+
+        for frame_idx, packed in self._edges.items():
+            arrays[f'edges_{frame_idx}'] = packed
+        if self._edges_shape is not None:
+            arrays['edges_shape'] = np.array(self._edges_shape, dtype=np.int64)
+
+        arrays['flow'] = np.array(
+            [[frame_idx] + [values[field] for field in FLOW_FIELDS]
+             for frame_idx, values in sorted(self._flow.items())],
+            dtype=np.float64
+        ).reshape(-1, 1 + len(FLOW_FIELDS))
+
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.partial")
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, self.path)
+
+        self._dirty = False
+        self._edges = {}
+        self._load()
+
+
+class ReferenceFeatureCache:
+    """Directory of per-reference-video feature caches."""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Cache directory
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def open(self, video_path: str, sample_rate: int, decoder: str = 'opencv',
+             seek_threshold: int = 0, flow_backend: str = 'cpu') -> ReferenceFeatures:
+        """
+        Open the cached features of a reference video.
+
+        Args:
+            video_path: Reference video path
+            sample_rate: Sampling used for the comparison (flow uses the previous sample)
+            decoder: Frame source backend the frames are decoded with
+            seek_threshold: Seek threshold of the opencv backend (seeking may change frames)
+            flow_backend: Optical flow implementation ('cpu' or 'gpu', see AdvancedMetrics.flow_backend)
+
+        Returns:
+            ReferenceFeatures
+        """
+        fingerprint = file_fingerprint(video_path)
+        name = f"{fingerprint}_s{sample_rate}_{decoder}_k{seek_threshold}_{flow_backend}{CACHE_SUFFIX}"
+        return ReferenceFeatures(self.root / name)
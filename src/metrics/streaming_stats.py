@@ -0,0 +1,224 @@
+"""
+Streaming summary statistics.
+
+Summary blocks (mean/std/min/max/median of a metric, FPS averages and
+lows) used to be computed from lists holding every per-frame value.
+StreamingStats updates per value in bounded memory instead:
+
+- count and mean (running sum), variance with Welford's algorithm
+- min and max
+- quantiles from a KLL sketch (Karnin, Lang, Liberty 2016)
+
+The sketch keeps every value until EXACT_LIMIT values have been added, so
+medians and lows are exact for typical runs and match what the list-based
+code returned (np.median; lows as ``sorted(values)[int(n * q)]``). Above
+that it compacts into a KLL sketch with about K items per level, whose rank
+error is roughly 1.7 / K of n (0.1% at K = 1600).
+
+Two StreamingStats merge into the statistics of the combined values
+(e.g. parallel shards of a video). Counts, min, max and the Welford moments
+merge exactly; quantiles stay exact while the combined count is within
+EXACT_LIMIT.
+"""
+
+import math
+import random
+from typing import Dict, Iterable, List
+
+# Values kept verbatim before the quantile sketch starts compacting
+EXACT_LIMIT = 65536
+
+# KLL level capacity and its shrink factor for lower levels
+DEFAULT_K = 1600
+CAPACITY_DECAY = 2 / 3
+
+
+class QuantileSketch:
+    """Mergeable KLL quantile sketch, exact until EXACT_LIMIT values."""
+
+    def __init__(self, k: int = DEFAULT_K, exact_limit: int = EXACT_LIMIT, seed: int = 0):
+        """
+        Args:
+            k: Capacity of the top level (accuracy/memory trade-off)
+            exact_limit: Values kept verbatim before compacting
+            seed: Seed of the compaction coin flips (results are reproducible)
+        """
+        self.k = k
+        self.exact_limit = exact_limit
+        self.exact = True
+        self.count = 0
+        self._levels: List[List[float]] = [[]]  # Items of level h weigh 2**h
+        self._rng = random.Random(seed)
+
+    def add(self, value: float):
+        """Add one value."""
+        self._levels[0].append(value)
+        self.count += 1
+        if self.exact:
+            if self.count > self.exact_limit:
+                self.exact = False
+                self._compress()
+        elif len(self._levels[0]) > self._capacity(0):
+            self._compress()
+
+    def merge(self, other: 'QuantileSketch'):
+        """Add the values summarized by another sketch."""
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self.count += other.count
+
+        if self.exact and other.exact and self.count <= self.exact_limit:
+            return
+        self.exact = False
+        self._compress()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - 1 - level
+        return max(2, int(math.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    def _compress(self):
+        """Compact full levels: sort, keep every other item (random offset) at twice the weight."""
+        while sum(len(items) for items in self._levels) > \
+                sum(self._capacity(level) for level in range(len(self._levels))):
+            level = next(h for h, items in enumerate(self._levels) if len(items) > self._capacity(h))
+            if level + 1 == len(self._levels):
+                self._levels.append([])
+
+            items = sorted(self._levels[level])
+            keep = [items.pop()] if len(items) % 2 else []  # Odd item stays at this level
+            offset = self._rng.randint(0, 1)
+            self._levels[level + 1].extend(items[offset::2])
+            self._levels[level] = keep
+
+    def value_at_rank(self, rank: int) -> float:
+        """
+        Value at a 0-based rank of the sorted values (``sorted(values)[rank]`` while exact).
+
+        Raises:
+            ValueError: If the sketch is empty
+        """
+        if self.count == 0:
+            raise ValueError("No values")
+        rank = min(max(rank, 0), self.count - 1)
+
+        if self.exact:
+            return sorted(self._levels[0])[rank]
+
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self._levels) for value in items)
+        total = sum(weight for _, weight in weighted)
+        target = rank * total / self.count  # Compaction keeps the total weight close to count
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative > target:
+                return value
+        return weighted[-1][0]
+
+    def quantile(self, q: float) -> float:
+        """``sorted(values)[int(n * q)]`` (the convention of the FPS lows)."""
+        return self.value_at_rank(int(self.count * q))
+
+    def median(self) -> float:
+        """Median like np.median (mean of the two middle values for even counts)."""
+        middle = self.count // 2
+        if self.count % 2:
+            return self.value_at_rank(middle)
+        return (self.value_at_rank(middle - 1) + self.value_at_rank(middle)) / 2
+
+
+class StreamingStats:
+    """Count, mean, variance, min, max and quantiles of a stream of values."""
+
+    def __init__(self, k: int = DEFAULT_K, exact_limit: int = EXACT_LIMIT):
+        """
+        Args:
+            k: KLL sketch capacity (see QuantileSketch)
+            exact_limit: Values kept verbatim for exact quantiles
+        """
+        self.count = 0
+        self._sum = 0.0
+        self._mean = 0.0  # Welford running mean (for the variance)
+        self._m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(k, exact_limit)
+
+    def add(self, value: float):
+        """Add one value (Welford update)."""
+        value = float(value)
+        self.count += 1
+        self._sum += value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sketch.add(value)
+
+    def update(self, values: Iterable[float]) -> 'StreamingStats':
+        """Add several values."""
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: 'StreamingStats') -> 'StreamingStats':
+        """Combine with the statistics of another stream (Chan et al. parallel update)."""
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self._mean += delta * other.count / count
+        self._sum += other._sum
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def mean(self) -> float:
+        """Mean of the values (sum / count, exact for integer FPS readings)."""
+        return self._sum / self.count if self.count else 0.0
+
+    def variance(self, ddof: int = 0) -> float:
+        """Variance with ``ddof`` delta degrees of freedom (0 like np.var, 1 like statistics.variance)."""
+        if self.count - ddof <= 0:
+            return 0.0
+        return self._m2 / (self.count - ddof)
+
+    def std(self, ddof: int = 0) -> float:
+        """Standard deviation (see variance())."""
+        return math.sqrt(self.variance(ddof))
+
+    def quantile(self, q: float) -> float:
+        """``sorted(values)[int(n * q)]``, see QuantileSketch.quantile()."""
+        return self.sketch.quantile(q)
+
+    def median(self) -> float:
+        """Median like np.median."""
+        return self.sketch.median()
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summary block of a metric in comparison results.
+
+        Returns:
+            Dict with mean, std (population), min, max and median
+
+        Raises:
+            ValueError: If no values were added
+        """
+        if self.count == 0:
+            raise ValueError("No values")
+        return {
+            "mean": self.mean,
+            "std": self.std(),
+            "min": self.min,
+            "max": self.max,
+            "median": self.median()
+        }
@@ -11,12 +11,15 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.compare_alignment_quality import compare_alignment_quality
+from src.compare_alignment_quality import compare_fan_out
+from src.video.frame_store import DecodedFrameStore
+from src.video.sources import probe_video
+from src.metrics.frame.reference_cache import ReferenceFeatureCache
+from src.extraction.fps_cache import FPSTimelineCache
 import yaml
 import json
 from datetime import datetime
 import time
-import cv2
 import argparse
 
 
@@ -74,10 +77,9 @@ def scale_roi_for_video(roi: tuple, base_resolution: tuple, video_path: str) ->
         Scaled (x, y, width, height) for video resolution
     """
     # Get video resolution
-    cap = cv2.VideoCapture(video_path)
-    video_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    video_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    cap.release()
+    video_info = probe_video(video_path)
+    video_width = video_info['width']
+    video_height = video_info['height']
 
     base_width, base_height = base_resolution
 
@@ -125,6 +127,19 @@ def run_analysis(config_path: str, force_rerun: bool = False):
     compute_advanced = config['settings'].get('compute_advanced', True)
     use_gpu = config['settings'].get('use_gpu', True)
     extract_fps = config['settings'].get('extract_fps', True)
+    ocr_mode = config['settings'].get('ocr_mode', 'detect')
+    digit_templates = config['settings'].get('digit_templates', 0)
+    ocr_gate = config['settings'].get('ocr_gate', None)
+    seek_threshold = config['settings'].get('seek_threshold', 0)
+    prefetch_depth = config['settings'].get('prefetch_depth', 0)
+    decoder = config['settings'].get('decoder', 'opencv')
+    decoder_threads = config['settings'].get('decoder_threads', 0)
+    frame_store_config = config['settings'].get('frame_store', None)
+    fan_out = config['settings'].get('fan_out', False)
+    reference_cache_dir = config['settings'].get('reference_cache', None)
+    fps_cache_dir = config['settings'].get('fps_cache', None)
+    fused_fps = config['settings'].get('fused_fps', False)
+    metric_batch_size = config['settings'].get('metric_batch_size', 1)
 
     comparisons = config['comparisons']
 
@@ -139,121 +154,180 @@ def run_analysis(config_path: str, force_rerun: bool = False):
     print(f"Sample rate: every {sample_rate} frames")
     print(f"Advanced metrics: {compute_advanced}")
     print(f"GPU: {use_gpu}")
-    print(f"FPS extraction: {extract_fps}")
+    print(f"FPS extraction: {extract_fps}" + (" (fused with the metrics pass)" if extract_fps and fused_fps else ""))
+    print(f"Decoder: {decoder}")
+
+    # Decoded reference frames are shared across comparisons via the frame store
+    frame_store = None
+    if frame_store_config:
+        max_gb = frame_store_config.get('max_gb', 50)
+        frame_store = DecodedFrameStore(frame_store_config['dir'], int(max_gb * 1024**3))
+        print(f"Frame store: {frame_store_config['dir']} (cap {max_gb} GB)")
+    reference_cache = None
+    if reference_cache_dir:
+        reference_cache = ReferenceFeatureCache(reference_cache_dir)
+        print(f"Reference feature cache: {reference_cache_dir}")
+    fps_cache = None
+    if fps_cache_dir and extract_fps:
+        fps_cache = FPSTimelineCache(fps_cache_dir)
+        print(f"FPS timeline cache: {fps_cache_dir}")
+    if prefetch_depth > 0:
+        print(f"Prefetch depth: {prefetch_depth} frames")
+    if fan_out:
+        print(f"Fan-out: comparisons sharing a reference run in one pass")
     print(f"Total comparisons: {len(comparisons)}")
     print()
 
     summary = []
     batch_start_time = time.time()
 
+    # With fan_out, comparisons sharing a reference run as one group that
+    # decodes the reference once (groups keep the order of first appearance)
+    groups = {}
     for idx, comparison in enumerate(comparisons, 1):
-        ref_video = comparison['reference']
-        cmp_video = comparison['compare']
-        name = comparison['name']
-
-        print(f"\n{'='*80}")
-        print(f"Comparison {idx}/{len(comparisons)}: {name}")
-        print(f"{'='*80}")
-
+        key = comparison['reference'] if fan_out else idx
+        groups.setdefault(key, []).append((idx, comparison))
+
+    for group in groups.values():
+        pending = []
+
+        for idx, comparison in group:
+            name = comparison['name']
+
+            print(f"\n{'='*80}")
+            print(f"Comparison {idx}/{len(comparisons)}: {name}")
+            print(f"{'='*80}")
+
+            output_json = str(results_path / f"{name}.json")
+
+            # Check if comparison already exists (skip if completed, unless force_rerun)
+            if not force_rerun and Path(output_json).exists():
+                print(f"  ⏭️  SKIPPED - Result already exists: {output_json}")
+                print(f"     (use --force to re-run)")
+                try:
+                    with open(output_json) as f:
+                        existing_result = json.load(f)
+                        mean_ssim = existing_result.get('metrics', {}).get('ssim', {}).get('mean', 0)
+                        print(f"  Existing mean SSIM: {mean_ssim:.4f}")
+                        summary.append({
+                            'name': name,
+                            'status': 'skipped',
+                            'mean_ssim': mean_ssim
+                        })
+                except Exception as e:
+                    print(f"  ⚠️  Could not read existing result: {e}")
+                    print(f"  Will re-run this comparison")
+                else:
+                    continue  # Skip to next comparison
+
+            pending.append(comparison)
+
+        if not pending:
+            continue
+
+        ref_video = pending[0]['reference']
         ref_path = str(base_path / ref_video)
-        cmp_path = str(base_path / cmp_video)
-
-        output_json = str(results_path / f"{name}.json")
-
-        # Check if comparison already exists (skip if completed, unless force_rerun)
-        if not force_rerun and Path(output_json).exists():
-            print(f"  ⏭️  SKIPPED - Result already exists: {output_json}")
-            print(f"     (use --force to re-run)")
-            try:
-                with open(output_json) as f:
-                    existing_result = json.load(f)
-                    mean_ssim = existing_result.get('metrics', {}).get('ssim', {}).get('mean', 0)
-                    print(f"  Existing mean SSIM: {mean_ssim:.4f}")
-                    summary.append({
-                        'name': name,
-                        'status': 'skipped',
-                        'mean_ssim': mean_ssim
-                    })
-            except Exception as e:
-                print(f"  ⚠️  Could not read existing result: {e}")
-                print(f"  Will re-run this comparison")
-            else:
-                continue  # Skip to next comparison
 
         # Load ROI from roi_fps_coordinates.yaml
         roi_base, base_resolution = load_roi_from_yaml(base_path)
 
-        # Scale ROI for reference video resolution
-        roi_ref = scale_roi_for_video(roi_base, base_resolution, ref_path)
-        # Scale ROI for compare video resolution
-        roi_cmp = scale_roi_for_video(roi_base, base_resolution, cmp_path)
-
-        # Use reference video ROI for FPS extraction (both should be same resolution anyway)
-        roi = roi_ref
+        # Scale ROI for the reference video resolution; it is used for FPS
+        # extraction of every compare video (same resolution as the reference)
+        roi = scale_roi_for_video(roi_base, base_resolution, ref_path)
 
         print(f"  Reference: {ref_video}")
-        print(f"  Compare: {cmp_video}")
+        for comparison in pending:
+            print(f"  Compare: {comparison['compare']}")
         print(f"  Final ROI: {roi}")
 
         comparison_start_time = time.time()
 
         try:
-            results = compare_alignment_quality(
+            group_results = compare_fan_out(
                 video1_path=ref_path,
-                video2_path=cmp_path,
-                alignment_name=name,
+                comparisons=[
+                    {
+                        'video2': str(base_path / comparison['compare']),
+                        'name': comparison['name'],
+                        'fps_video2': str(base_path / comparison['compare'])
+                    }
+                    for comparison in pending
+                ],
                 sample_rate=sample_rate,
                 compute_advanced=compute_advanced,
                 use_gpu=use_gpu,
                 extract_fps=extract_fps,
                 fps_video1=ref_path,
-                fps_video2=cmp_path,
                 fps_roi=roi,
                 fps_sample_rate=sample_rate,
-                store_per_frame=True
+                fps_ocr_mode=ocr_mode,
+                fps_digit_templates=digit_templates,
+                fps_ocr_gate=ocr_gate,
+                store_per_frame=True,
+                seek_threshold=seek_threshold,
+                prefetch_depth=prefetch_depth,
+                decoder=decoder,
+                decoder_threads=decoder_threads,
+                frame_store=frame_store,
+                reference_cache=reference_cache,
+                fps_cache=fps_cache,
+                fused_fps=fused_fps,
+                metric_batch_size=metric_batch_size
             )
 
             comparison_duration = time.time() - comparison_start_time
 
-            # Add timing and metadata
-            results['execution_time'] = {
-                'start_time': datetime.fromtimestamp(comparison_start_time).isoformat(),
-                'end_time': datetime.fromtimestamp(time.time()).isoformat(),
-                'duration_seconds': round(comparison_duration, 2),
-                'frames_analyzed': results.get('frame_count', 0)
-            }
-
-            results['config'] = {
-                'roi_pixels': f"{roi[0]},{roi[1]},{roi[2]},{roi[3]}",
-                'roi_source': 'roi_fps_coordinates.yaml',
-                'sample_rate': sample_rate,
-                'compute_advanced': compute_advanced
-            }
-
-            # Save results
-            with open(output_json, 'w') as f:
-                json.dump(results, f, indent=2)
-
-            print(f"  ✓ Complete in {comparison_duration:.1f}s")
-            print(f"  Mean SSIM: {results.get('ssim', {}).get('mean', 0):.4f}")
-
-            summary.append({
-                'name': name,
-                'status': 'success',
-                'duration_seconds': round(comparison_duration, 2),
-                'mean_ssim': results.get('ssim', {}).get('mean', 0)
-            })
+            for comparison, results in zip(pending, group_results):
+                name = comparison['name']
+                output_json = str(results_path / f"{name}.json")
+
+                # Add timing and metadata (fan-out comparisons share the group's timing)
+                results['execution_time'] = {
+                    'start_time': datetime.fromtimestamp(comparison_start_time).isoformat(),
+                    'end_time': datetime.fromtimestamp(time.time()).isoformat(),
+                    'duration_seconds': round(comparison_duration, 2),
+                    'frames_analyzed': results.get('frame_count', 0)
+                }
+                if len(pending) > 1:
+                    results['execution_time']['fan_out_comparisons'] = len(pending)
+
+                results['config'] = {
+                    'roi_pixels': f"{roi[0]},{roi[1]},{roi[2]},{roi[3]}",
+                    'roi_source': 'roi_fps_coordinates.yaml',
+                    'sample_rate': sample_rate,
+                    'compute_advanced': compute_advanced
+                }
+
+                # Save results
+                with open(output_json, 'w') as f:
+                    json.dump(results, f, indent=2)
+
+                print(f"  ✓ {name} complete in {comparison_duration:.1f}s")
+                print(f"  Mean SSIM: {results.get('ssim', {}).get('mean', 0):.4f}")
+
+                summary_entry = {
+                    'name': name,
+                    'status': 'success',
+                    'duration_seconds': round(comparison_duration, 2),
+                    'mean_ssim': results.get('ssim', {}).get('mean', 0)
+                }
+                if len(pending) > 1:
+                    summary_entry['fan_out_reference'] = ref_video
+                if 'decode_pipeline' in results:
+                    summary_entry['decode_pipeline'] = results['decode_pipeline']
+                summary.append(summary_entry)
 
         except Exception as e:
             print(f"  ✗ Failed: {e}")
             import traceback
             traceback.print_exc()
 
-            summary.append({
-                'name': name,
-                'status': 'failed',
-                'error': str(e)
-            })
+            for comparison in pending:
+                summary.append({
+                    'name': comparison['name'],
+                    'status': 'failed',
+                    'error': str(e)
+                })
 
     batch_duration = time.time() - batch_start_time
 
@@ -312,11 +386,29 @@ Config file format (YAML):
     compute_advanced: true
     use_gpu: true
     extract_fps: true
+    ocr_mode: detect           # FPS OCR: detect, or recognize (recognition only, faster on CPU)
+    digit_templates: 0         # Read FPS digits by template matching after N OCR readings (0 = off)
+    ocr_gate: null             # Skip FPS OCR while < this fraction of ROI pixels changed (null = off)
+    seek_threshold: 0          # Seek over sample gaps larger than N frames (0 = frame-exact grab)
+    prefetch_depth: 8          # Background decode queue depth (0 = decode inline)
+    decoder: opencv            # Frame decoder: opencv or ffmpeg (rawvideo pipe)
+    decoder_threads: 0         # FFmpeg decoder threads (0 = one per core)
+    frame_store:               # Optional: decode each reference video once
+      dir: /scratch/frame_store
+      max_gb: 50
+    fan_out: true              # Stream each reference once against all its compare videos
+    reference_cache: /scratch/reference_cache  # Optional: persist reference-only metric features
+    fps_cache: /scratch/fps_cache  # Optional: persist FPS timelines (OCR each video once)
+    fused_fps: false           # OCR FPS from the metrics pass's frames on a background thread
+    metric_batch_size: 1       # Frame pairs per metric tensor pass (batched on CPU or GPU)
 
   comparisons:
     - reference: 1080p_dlaa_run1.mp4
       compare: 1080p_dlss_quality.mp4
       name: 1080p_DLAA_vs_Quality
+    - reference: 1080p_dlaa_run1.trim.json   # Trim manifests (virtual trims) work like videos
+      compare: 1080p_dlss_balanced.trim.json
+      name: 1080p_DLAA_vs_Balanced
         """
     )
 
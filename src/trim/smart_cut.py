@@ -0,0 +1,284 @@
+"""
+Frame-exact video trimming without re-encoding the whole segment.
+
+Smart cut: the GOPs that lie fully inside [first_frame, last_frame] are
+stream-copied, and only the partial GOPs at each edge are re-encoded. Every
+piece carries its parameter sets in-band (Annex B with SPS/PPS before each
+keyframe), so the re-encoded edges may use different encoder settings than
+the source. The pieces are written as NUT and joined with the concat
+demuxer. Frames in the copied middle are bit-identical to the source, which
+keeps trimming out of the quality measurement for almost the whole run.
+
+Lossless: the segment is re-encoded with FFV1 (Matroska), so every decoded
+frame is bit-identical to the source frame.
+
+Frame indices are presentation order frame numbers, which match OpenCV's
+frame indices. Keyframes come from a packet listing (frame_index.read_packets()),
+which reads the file without decoding it.
+"""
+
+import subprocess
+import tempfile
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.video.ffmpeg_pipe import get_ffmpeg_exe
+from src.video.frame_index import read_packets
+
+TRIM_MODES = ('reencode', 'smart', 'lossless')
+
+# Source codec -> (edge encoder arguments, MP4 -> Annex B bitstream filter for copied GOPs)
+SMART_CUT_CODECS = {
+    'h264': (['-c:v', 'libx264', '-crf', '18', '-preset', 'fast', '-bsf:v', 'dump_extra'], 'h264_mp4toannexb'),
+    'hevc': (['-c:v', 'libx265', '-crf', '18', '-preset', 'fast', '-bsf:v', 'dump_extra'], 'hevc_mp4toannexb'),
+}
+
+REENCODE_ARGS = ['-c:v', 'libx264', '-crf', '18', '-preset', 'fast', '-c:a', 'aac', '-b:a', '128k']
+LOSSLESS_ARGS = ['-c:v', 'ffv1', '-level', '3', '-g', '1', '-c:a', 'flac']
+LOSSLESS_SUFFIXES = {'.mkv', '.avi', '.nut'}
+
+
+def _run_ffmpeg(args: List[str]) -> str:
+    """Run FFmpeg, raising RuntimeError with its stderr on failure."""
+    cmd = [get_ffmpeg_exe(), '-hide_banner', '-loglevel', 'error', '-nostdin', '-y'] + args
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed: {' '.join(cmd)}\n{result.stderr}")
+    return result.stdout
+
+
+def probe_video_packets(video_path: str) -> Dict:
+    """
+    List the video packets of a file without decoding it.
+
+    Returns:
+        Dictionary with:
+        - codec: FFmpeg codec name (e.g. 'h264')
+        - frame_times: Presentation time of every frame in seconds, relative
+          to the first frame, indexed by frame number
+        - cut_points: Frame numbers of keyframes where the stream can be cut
+          cleanly (no frame before it in decode order is shown after it, and
+          no frame after it is shown before it)
+    """
+    info = read_packets(video_path)
+    time_base = info['time_base']
+    packets = [(pts, is_key) for pts, _, _, is_key in info['packets']]  # Decode order
+
+    if not packets:
+        raise RuntimeError(f"No video packets found in {video_path}")
+
+    sorted_pts = sorted(pts for pts, _ in packets)
+    frame_number = {pts: idx for idx, pts in enumerate(sorted_pts)}
+
+    # Clean cut point: max pts before it < its pts <= min pts after it
+    suffix_min = [0] * len(packets)
+    running = None
+    for i in range(len(packets) - 1, -1, -1):
+        suffix_min[i] = running
+        pts = packets[i][0]
+        running = pts if running is None else min(running, pts)
+
+    cut_points = []
+    prefix_max = None
+    for i, (pts, is_key) in enumerate(packets):
+        if is_key and (prefix_max is None or prefix_max < pts) and \
+                (suffix_min[i] is None or suffix_min[i] >= pts):
+            cut_points.append(frame_number[pts])
+        prefix_max = pts if prefix_max is None else max(prefix_max, pts)
+
+    return {
+        'codec': info['codec'],
+        'frame_times': [float((pts - sorted_pts[0]) * time_base) for pts in sorted_pts],
+        'cut_points': sorted(cut_points),
+    }
+
+
+def _seek_time(frame_times: List[float], frame_idx: int) -> float:
+    """Input seek time that lands exactly on frame_idx (halfway from the previous frame)."""
+    if frame_idx == 0:
+        return 0.0
+    return (frame_times[frame_idx - 1] + frame_times[frame_idx]) / 2
+
+
+def _plan_smart_cut(info: Dict, first_frame: int, last_frame: int) -> Optional[Tuple[int, int]]:
+    """
+    Choose the stream-copied part of a smart cut.
+
+    Returns:
+        (copy_start, copy_end): frames [copy_start, copy_end) are copied, or
+        None if no whole GOP lies inside the range
+    """
+    total_frames = len(info['frame_times'])
+    cut_points = info['cut_points'] + [total_frames]  # End of file closes the last GOP
+
+    copy_start = next((k for k in cut_points if k >= first_frame), None)
+    copy_end = next((k for k in reversed(cut_points) if k <= last_frame + 1), None)
+    if copy_start is None or copy_end is None or copy_start >= copy_end:
+        return None
+    return copy_start, copy_end
+
+
+def _frame_rate_arg(fps: float) -> str:
+    """FFmpeg frame rate argument (exact fraction for NTSC rates such as 59.94 = 60000/1001)."""
+    rate = Fraction(fps).limit_denominator(1001)
+    return f"{rate.numerator}/{rate.denominator}"
+
+
+def _reencode(input_path: str, output_path: str, first_frame: int, frame_count: int,
+              fps: float, codec_args: List[str]):
+    """
+    Re-encode frame_count frames starting at first_frame.
+
+    The input seek lands half a frame before first_frame, so the first decoded
+    frame has a small positive pts. Timestamps are rebased to start at 0;
+    otherwise CFR vsync can duplicate the first frame, and -frames:v then
+    drops the last one. setpts drops the stream's frame rate, so it is set
+    explicitly.
+    """
+    start_time = max(0.0, (first_frame - 0.5) / fps)
+    _run_ffmpeg([
+        '-ss', f"{start_time:.6f}",
+        '-i', input_path,
+        '-vf', 'setpts=PTS-STARTPTS',
+        '-r', _frame_rate_arg(fps),
+        '-frames:v', str(frame_count),
+    ] + codec_args + [output_path])
+
+
+def smart_cut(input_path: str, output_path: str, first_frame: int, last_frame: int,
+              fps: float) -> Dict:
+    """
+    Trim [first_frame, last_frame] by stream-copying whole GOPs and re-encoding the edges.
+
+    Falls back to a full re-encode when the codec has no matching edge
+    encoder or no whole GOP lies inside the range.
+
+    Args:
+        input_path: Source video
+        output_path: Output video (MP4/MKV/MOV)
+        first_frame: First frame to include
+        last_frame: Last frame to include
+        fps: Video frame rate (for the audio range)
+
+    Returns:
+        Dictionary with frame counts of the 'head', 'copied' and 'tail' pieces
+        ('reencoded' if it fell back to a full re-encode)
+    """
+    frame_count = last_frame - first_frame + 1
+    info = probe_video_packets(input_path)
+    frame_times = info['frame_times']
+
+    if last_frame >= len(frame_times):
+        raise ValueError(f"Frame {last_frame} out of range ({len(frame_times)} frames)")
+
+    plan = _plan_smart_cut(info, first_frame, last_frame)
+    if info['codec'] not in SMART_CUT_CODECS or plan is None:
+        reason = f"codec {info['codec']}" if plan is not None else "no whole GOP inside the range"
+        print(f"  Smart cut not possible ({reason}), re-encoding the whole segment")
+        _reencode(input_path, output_path, first_frame, frame_count, fps, REENCODE_ARGS)
+        return {'reencoded': frame_count}
+
+    copy_start, copy_end = plan
+    edge_args, annexb_filter = SMART_CUT_CODECS[info['codec']]
+    pieces = []  # (path, frame count)
+
+    with tempfile.TemporaryDirectory(prefix='smart_cut_', dir=Path(output_path).parent) as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+
+        if copy_start > first_frame:
+            head_path = tmp_dir / 'head.nut'
+            _reencode(input_path, str(head_path), first_frame, copy_start - first_frame, fps,
+                      ['-map', '0:v:0'] + edge_args)
+            pieces.append((head_path, copy_start - first_frame))
+
+        copy_path = tmp_dir / 'copy.nut'
+        _run_ffmpeg([
+            # Input seek in stream copy mode starts at the keyframe at or before this time
+            '-ss', f"{frame_times[copy_start]:.6f}",
+            '-i', input_path,
+            '-map', '0:v:0',
+            '-c:v', 'copy',
+            '-bsf:v', annexb_filter,
+            '-frames:v', str(copy_end - copy_start),
+            str(copy_path)
+        ])
+        pieces.append((copy_path, copy_end - copy_start))
+
+        if copy_end <= last_frame:
+            tail_path = tmp_dir / 'tail.nut'
+            _reencode(input_path, str(tail_path), copy_end, last_frame - copy_end + 1, fps,
+                      ['-map', '0:v:0'] + edge_args)
+            pieces.append((tail_path, last_frame - copy_end + 1))
+
+        concat_list = tmp_dir / 'pieces.txt'
+        # Explicit durations keep the frame spacing constant across piece boundaries
+        concat_list.write_text(''.join(f"file '{piece.name}'\nduration {count / fps:.6f}\n"
+                                       for piece, count in pieces))
+
+        # Join the video pieces; audio is cut from the source by time
+        _run_ffmpeg([
+            '-f', 'concat', '-safe', '0', '-i', str(concat_list),
+            '-ss', f"{_seek_time(frame_times, first_frame):.6f}",
+            '-t', f"{frame_count / fps:.6f}",
+            '-i', input_path,
+            '-map', '0:v:0', '-map', '1:a?',
+            '-c:v', 'copy',
+            '-c:a', 'aac', '-b:a', '128k',
+            '-frames:v', str(frame_count),
+            output_path
+        ])
+
+    return {
+        'head': copy_start - first_frame,
+        'copied': copy_end - copy_start,
+        'tail': last_frame + 1 - copy_end,
+    }
+
+
+def lossless_output_path(output_path: str) -> str:
+    """Output path with a container that supports FFV1 (switches to .mkv if needed)."""
+    path = Path(output_path)
+    if path.suffix.lower() in LOSSLESS_SUFFIXES:
+        return output_path
+    return str(path.with_suffix('.mkv'))
+
+
+def lossless_cut(input_path: str, output_path: str, first_frame: int, last_frame: int,
+                 fps: float) -> Dict:
+    """
+    Trim [first_frame, last_frame] into a lossless FFV1 file.
+
+    Args:
+        input_path: Source video
+        output_path: Output video (must be .mkv, .avi or .nut, see lossless_output_path())
+        first_frame: First frame to include
+        last_frame: Last frame to include
+        fps: Video frame rate
+
+    Returns:
+        Dictionary with the number of 'reencoded' frames
+    """
+    frame_count = last_frame - first_frame + 1
+    _reencode(input_path, output_path, first_frame, frame_count, fps, LOSSLESS_ARGS)
+    return {'reencoded': frame_count}
+
+
+def reencode_cut(input_path: str, output_path: str, first_frame: int, last_frame: int,
+                 fps: float) -> Dict:
+    """
+    Trim [first_frame, last_frame] by re-encoding the whole segment (libx264, CRF 18).
+
+    Args:
+        input_path: Source video
+        output_path: Output video
+        first_frame: First frame to include
+        last_frame: Last frame to include
+        fps: Video frame rate
+
+    Returns:
+        Dictionary with the number of 'reencoded' frames
+    """
+    frame_count = last_frame - first_frame + 1
+    _reencode(input_path, output_path, first_frame, frame_count, fps, REENCODE_ARGS)
+    return {'reencoded': frame_count}
@@ -27,16 +27,24 @@ Usage:
 import argparse
 import sys
 import cv2
+import numpy as np
 import yaml
 import re
 from pathlib import Path
 from typing import Optional, Tuple
-import subprocess
 
 # Import FPS OCR extractor
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
-from src.extraction.fps_ocr import FPSOCRExtractor
+from src.extraction.fps_ocr import FPSOCRExtractor, fill_fps_gaps, DEFAULT_OCR_BATCH_SIZE, OCR_MODES
+from src.extraction.ocr_templates import DigitTemplateRecognizer, DEFAULT_CALIBRATION_CROPS
+from src.extraction.fps_timeline import save_fps_timeline
+from src.video.sources import (open_frame_source, iter_frame_batches, probe_video, read_frame,
+                               FRAME_SOURCE_BACKENDS)
+from src.video.sampling import SampledFrameReader
+from src.video.frame_index import get_frame_index
+from src.trim.smart_cut import TRIM_MODES, smart_cut, lossless_cut, reencode_cut, lossless_output_path
+from src.video.trim_manifest import write_trim_manifest, manifest_path_for
 
 
 def load_roi_config(yaml_path: str) -> dict:
@@ -103,33 +111,87 @@ def parse_roi(roi_str: str, frame_width: int = None, frame_height: int = None) -
     return tuple(map(int, parts))
 
 
-def detect_marker_with_fps_extractor(roi_crop, extractor, marker_type: str, regex_pattern: str = None, debug: bool = False) -> bool:
+def detect_marker_with_fps_extractor(roi_crop, extractor, marker_type: str, regex_pattern: str = None,
+                                     debug: bool = False, fps_readings: dict = None,
+                                     frame_idx: int = None) -> bool:
     """
     Detect marker in ROI crop using FPS OCR extractor.
 
+    While the ROI is unchanged since the last OCR'd crop, the extractor's
+    change gate carries the previous result forward instead of running OCR.
+
     Args:
         roi_crop: Cropped frame region
         extractor: FPSOCRExtractor instance
         marker_type: "fps", "text", or "regex"
         regex_pattern: Pattern to match (for text/regex types)
         debug: If True, print OCR results
+        fps_readings: Optional dict receiving frame_idx -> (FPS value, carried) (fps markers)
+        frame_idx: Frame index of roi_crop (key for fps_readings)
 
     Returns:
         True if marker detected, False otherwise
     """
+    return detect_markers_with_fps_extractor([roi_crop], extractor, marker_type, regex_pattern, debug,
+                                             fps_readings, [frame_idx])[0]
+
+
+def detect_markers_with_fps_extractor(roi_crops, extractor, marker_type: str, regex_pattern: str = None,
+                                      debug: bool = False, fps_readings: dict = None,
+                                      frame_indices: list = None) -> list:
+    """
+    Detect marker in a window of ROI crops with batched OCR.
+
+    Crops that still need OCR after the change gate go to EasyOCR together
+    (extractor.ocr_batch_size crops per call); results are the same as
+    calling detect_marker_with_fps_extractor() on each crop in order.
+
+    Args:
+        roi_crops: Same-shape ROI crops in scan order
+        extractor: FPSOCRExtractor instance
+        marker_type: "fps", "text", or "regex"
+        regex_pattern: Pattern to match (for text/regex types)
+        debug: If True, print OCR results
+        fps_readings: Optional dict receiving frame_idx -> (FPS value, carried) (fps markers)
+        frame_indices: Frame index of each crop (keys for fps_readings)
+
+    Returns:
+        Detection result per crop
+    """
     if marker_type == "fps":
         # Use existing FPS detection logic
-        fps_value = extractor.read_fps_from_roi(roi_crop)
-        if debug and fps_value is not None:
-            print(f"    [DEBUG] FPS detected: {fps_value:.1f}")
-        return fps_value is not None and fps_value > 0
+        detections = []
+        for frame_idx, (fps_value, carried) in zip(frame_indices or [None] * len(roi_crops),
+                                                   extractor.read_fps_batch(roi_crops)):
+            if fps_readings is not None:
+                fps_readings[frame_idx] = (fps_value, carried)
+            if debug and fps_value is not None:
+                print(f"    [DEBUG] FPS detected: {fps_value:.1f}{' (carried)' if carried else ''}")
+            detections.append(fps_value is not None and fps_value > 0)
+        return detections
 
     # For text/regex, we need to get raw OCR text
     # Using EasyOCR directly
     if not hasattr(extractor, 'reader'):
-        return False
+        return [False] * len(roi_crops)
+
+    def read_text_markers(crops) -> list:
+        return [_match_text_marker(results, marker_type, regex_pattern, debug)
+                for results in extractor.readtext_batch(crops, detail=1)]
+
+    if extractor.gate is None:
+        return read_text_markers(roi_crops)
+
+    detections = []
+    for detected, carried in extractor.gate.get_or_compute_batch(roi_crops, read_text_markers):
+        if debug and carried:
+            print(f"    [DEBUG] ROI unchanged, carried: {detected}")
+        detections.append(detected)
+    return detections
 
-    results = extractor.reader.readtext(roi_crop, detail=1)
+
+def _match_text_marker(results, marker_type: str, regex_pattern: str, debug: bool) -> bool:
+    """Match EasyOCR results (detail=1) of a ROI crop against a text/regex marker."""
     if not results:
         if debug:
             print(f"    [DEBUG] No OCR results")
@@ -152,109 +214,58 @@ def detect_marker_with_fps_extractor(roi_crop, extractor, marker_type: str, rege
     return False
 
 
-def detect_marker_range(video_path: str, roi: Tuple[int, int, int, int],
-                        marker_type: str, regex_pattern: str = None,
-                        window_size: int = 30, debug: bool = False) -> Optional[Tuple[int, int]]:
+def _scan_exhaustive(video_path: str, roi: Tuple[int, int, int, int], total_frames: int, fps: float,
+                     is_marker_batch, window_size: int, decoder: str) -> Optional[Tuple[int, int]]:
     """
-    Detect frame range where marker is visible using sliding window OCR.
+    OCR every frame: forward until the first detection, then backward from the end.
 
-    Uses a sliding window approach to batch process frames efficiently:
-    - Loads frames in windows of `window_size` frames
-    - Processes entire window with OCR model (keeps model in memory)
-    - Finds first and last frame where marker is detected
+    Each window of ROI crops is OCR'd with one batched call, so the window
+    holding the first (last) detection is read in full.
 
     Args:
-        video_path: Path to video file
-        roi: (x, y, width, height) for marker location
-        marker_type: "fps", "text", or "regex"
-        regex_pattern: Pattern to match (for text/regex types)
-        window_size: Number of frames to process in each batch (default: 30)
+        is_marker_batch: Callable (roi_crops, frame_indices, debug) -> list of bool
 
     Returns:
         (first_frame, last_frame) or None if marker never detected
     """
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise RuntimeError(f"Cannot open video: {video_path}")
-
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    fps = cap.get(cv2.CAP_PROP_FPS)
-
-    print(f"Video: {total_frames} frames @ {fps:.2f} FPS")
-    print(f"Scanning for marker (type: {marker_type}) in ROI: x={roi[0]}, y={roi[1]}, w={roi[2]}, h={roi[3]}")
-    if regex_pattern:
-        print(f"Pattern: {regex_pattern}")
-    print(f"Using sliding window size: {window_size} frames")
-
-    # Initialize OCR extractor (loaded once, reused for all frames)
-    extractor = FPSOCRExtractor(roi=roi, use_easyocr=True)
+    from tqdm import tqdm
 
     x, y, w, h = roi
 
-    # Debug: Save first frame ROI crop for verification
-    if debug:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-        ret, test_frame = cap.read()
-        if ret:
-            test_crop = test_frame[y:y+h, x:x+w]
-            debug_path = Path(video_path).parent / "debug_roi_crop.png"
-            cv2.imwrite(str(debug_path), test_crop)
-            print(f"[DEBUG] Saved ROI crop from first frame to: {debug_path}")
-            print(f"[DEBUG] ROI coordinates: x={x}, y={y}, w={w}, h={h}")
-            print(f"[DEBUG] Crop size: {test_crop.shape}")
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Reset to start
-
     # Scan forward to find FIRST frame with marker using sliding window
     print("\n[1/2] Scanning forward with sliding window (every frame)...")
     first_frame = None
 
-    from tqdm import tqdm
+    # Only the ROI is decoded into Python (cropped in the frame source)
+    forward_source = open_frame_source(video_path, backend=decoder, crop=roi)
 
-    frame_idx = 0
     with tqdm(total=total_frames, desc="Scanning forward", unit="frame") as pbar:
-        while frame_idx < total_frames:
-            # Read window of frames
-            window_frames = []
-            window_indices = []
-
-            for i in range(window_size):
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                window_frames.append(frame)
-                window_indices.append(frame_idx + i)
-
-            if not window_frames:
-                break
-
-            # Process entire window with OCR (model stays in memory)
-            for i, (frame, idx) in enumerate(zip(window_frames, window_indices)):
-                # Extract ROI
-                roi_crop = frame[y:y+h, x:x+w]
-
-                # Detect marker
-                detected = detect_marker_with_fps_extractor(roi_crop, extractor, marker_type, regex_pattern, debug)
-
+        # Read window of ROI crops as one (N, h, w, 3) stack
+        for window_indices, window_crops in iter_frame_batches(forward_source, window_size):
+            # Process entire window with one batched OCR call (model stays in memory)
+            for idx, detected in zip(window_indices, is_marker_batch(window_crops, window_indices, True)):
                 if detected:
                     first_frame = idx
                     print(f"\n  ✓ First marker detection at frame {first_frame} (t={first_frame/fps:.2f}s)")
                     break
 
-            pbar.update(len(window_frames))
-            frame_idx += len(window_frames)
+            pbar.update(len(window_indices))
 
             if first_frame is not None:
                 break
 
+    forward_source.release()
+
     if first_frame is None:
-        print("\n  ✗ Marker never detected in video")
-        cap.release()
         return None
 
     # Scan backward to find LAST frame with marker using sliding window
     print(f"\n[2/2] Scanning backward with sliding window (every frame)...")
     last_frame = None
 
+    # Random access reader (keyframe-aware and frame-exact with a frame index)
+    reader = SampledFrameReader(video_path)
+
     # Start from end, move backward in windows
     frame_idx = total_frames - 1
     with tqdm(total=(total_frames - first_frame), desc="Scanning backward", unit="frame") as pbar:
@@ -263,45 +274,278 @@ def detect_marker_range(video_path: str, roi: Tuple[int, int, int, int],
             window_start = max(first_frame, frame_idx - window_size + 1)
             window_end = frame_idx
 
-            # Read window of frames backward
-            window_frames = []
+            # Read window of ROI crops backward
+            window_crops = []
             window_indices = []
 
-            for idx in range(window_end, window_start - 1, -1):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-                ret, frame = cap.read()
-                if not ret:
+            # Read the window forward (one seek), then process it backward
+            for idx in range(window_start, window_end + 1):
+                frame = reader.read_at(idx)
+                if frame is None:
                     continue
-                window_frames.append(frame)
-                window_indices.append(idx)
+                window_crops.insert(0, frame[y:y+h, x:x+w])
+                window_indices.insert(0, idx)
 
-            if not window_frames:
+            if not window_crops:
                 break
 
-            # Process entire window with OCR (model stays in memory)
-            for frame, idx in zip(window_frames, window_indices):
-                # Extract ROI
-                roi_crop = frame[y:y+h, x:x+w]
-
-                # Detect marker
-                detected = detect_marker_with_fps_extractor(roi_crop, extractor, marker_type, regex_pattern)
-
+            # Process entire window with one batched OCR call (model stays in memory)
+            for idx, detected in zip(window_indices, is_marker_batch(window_crops, window_indices, False)):
                 if detected:
                     last_frame = idx
                     print(f"\n  ✓ Last marker detection at frame {last_frame} (t={last_frame/fps:.2f}s)")
                     break
 
-            pbar.update(len(window_frames))
+            pbar.update(len(window_crops))
             frame_idx = window_start - 1
 
             if last_frame is not None:
                 break
 
+    reader.release()
+
     if last_frame is None:
         print(f"  ✗ Marker disappeared after frame {first_frame}, using end of video")
         last_frame = total_frames - 1
 
-    cap.release()
+    return first_frame, last_frame
+
+
+def _bisect_transition(crops: dict, lo: int, hi: int, lo_state: bool, is_marker) -> Tuple[int, int]:
+    """
+    Locate a marker state change between two probed frames by bisection.
+
+    Assumes the state changes exactly once in (lo, hi]. Only frames in
+    ``crops`` (every frame between the probes) are OCR'd.
+
+    Returns:
+        (last frame with lo_state, first frame with the other state)
+    """
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if is_marker(crops[mid], mid, False) == lo_state:
+            lo = mid
+        else:
+            hi = mid
+    return lo, hi
+
+
+def _scan_coarse_to_fine(video_path: str, roi: Tuple[int, int, int, int], total_frames: int, fps: float,
+                         is_marker, is_marker_batch, probe_step: int, decoder: str,
+                         timeline_step: int = None) -> Optional[Tuple[int, int]]:
+    """
+    Probe every ``probe_step`` frames and bisect each marker transition.
+
+    The video is streamed once (frame-exact, no seeking) with ROI crops since
+    the last probe kept in memory. OCR runs on probe frames only, plus
+    log2(probe_step) frames per transition. Assumes the marker state does not
+    change more than once between two probes.
+
+    With ``timeline_step``, probes switch to first_frame + k * timeline_step
+    once the first marker frame is known, so every timeline_step-th frame of
+    the detected range is OCR'd (the FPS timeline of the trimmed video).
+
+    Args:
+        is_marker: Callable (roi_crop, frame_idx, debug) -> bool
+        is_marker_batch: Callable (roi_crops, frame_indices, debug) -> list of bool
+        timeline_step: Optional step of the FPS timeline grid
+
+    Returns:
+        (first_frame, last_frame) or None if marker never detected
+    """
+    from tqdm import tqdm
+
+    print(f"\n[1/1] Probing every {probe_step} frames, bisecting transitions...")
+
+    first_frame = None
+    last_frame = None
+
+    prev_probe = None  # (frame index, detected)
+    pending = {}  # ROI crops since the previous probe, keyed by frame index
+    last_idx = None
+
+    def on_probe(idx: int, detected: bool):
+        nonlocal first_frame, last_frame
+        if prev_probe is not None and detected != prev_probe[1]:
+            before, after = _bisect_transition(pending, prev_probe[0], idx, prev_probe[1], is_marker)
+            if detected:
+                if first_frame is None:
+                    first_frame = after
+                    print(f"\n  ✓ First marker detection at frame {first_frame} (t={first_frame/fps:.2f}s)")
+                    if timeline_step:
+                        # Timeline frames already streamed past since the previous probe
+                        grid = list(range(first_frame, idx, timeline_step))
+                        is_marker_batch([pending[grid_idx] for grid_idx in grid], grid, False)
+            else:
+                last_frame = before
+        elif prev_probe is None and detected:
+            first_frame = idx
+            print(f"\n  ✓ First marker detection at frame {first_frame} (t={first_frame/fps:.2f}s)")
+
+        if detected:
+            last_frame = idx
+
+    source = open_frame_source(video_path, backend=decoder, crop=roi)
+    with tqdm(total=total_frames, desc="Scanning", unit="frame") as pbar:
+        try:
+            for idx, roi_crop in source:
+                pending[idx] = roi_crop if roi_crop.base is None else roi_crop.copy()
+                last_idx = idx
+
+                if timeline_step and first_frame is not None:
+                    is_probe = (idx - first_frame) % timeline_step == 0
+                else:
+                    is_probe = idx % probe_step == 0
+
+                if is_probe:
+                    detected = is_marker(roi_crop, idx, True)
+                    on_probe(idx, detected)
+                    prev_probe = (idx, detected)
+                    pending = {idx: pending[idx]}
+
+                pbar.update(1)
+        finally:
+            source.release()
+
+    # The last decoded frame closes the final interval
+    if last_idx is not None and prev_probe is not None and last_idx != prev_probe[0]:
+        on_probe(last_idx, is_marker(pending[last_idx], last_idx, True))
+
+    if first_frame is None:
+        return None
+
+    print(f"\n  ✓ Last marker detection at frame {last_frame} (t={last_frame/fps:.2f}s)")
+    return first_frame, last_frame
+
+
+def detect_marker_range(video_path: str, roi: Tuple[int, int, int, int],
+                        marker_type: str, regex_pattern: str = None,
+                        window_size: int = 30, debug: bool = False,
+                        decoder: str = 'opencv', exhaustive: bool = False,
+                        probe_step: int = None, timeline_step: int = None,
+                        fps_readings: dict = None, extractor=None,
+                        ocr_batch_size: int = None, ocr_mode: str = None,
+                        digit_templates: int = None) -> Optional[Tuple[int, int]]:
+    """
+    Detect frame range where marker is visible.
+
+    By default the video is probed every ``probe_step`` frames and each marker
+    transition is refined by bisection over frame-exact ROI crops, so OCR runs
+    O(frames / probe_step + log(probe_step)) times instead of once per frame.
+    This assumes the marker does not flicker on and off between two probes.
+
+    With ``exhaustive=True`` every frame is OCR'd (sliding windows forward from
+    the start and backward from the end), which is slow but makes no
+    assumption; use it to validate the fast search.
+
+    Args:
+        video_path: Path to video file
+        roi: (x, y, width, height) for marker location
+        marker_type: "fps", "text", or "regex"
+        regex_pattern: Pattern to match (for text/regex types)
+        window_size: Number of frames to process in each batch (exhaustive mode, default: 30)
+        decoder: Frame source backend for scanning ('opencv' or 'ffmpeg')
+        exhaustive: OCR every frame instead of probing + bisection
+        probe_step: Frames between probes (default: one second of video)
+        timeline_step: Also OCR every Nth frame of the detected range (probe scan
+            only), for save_scan_fps_timeline()
+        fps_readings: Optional dict receiving frame_idx -> (FPS value, carried)
+            for every OCR'd frame (fps markers); carried values skipped OCR
+            because the ROI was unchanged
+        extractor: Already initialized FPSOCRExtractor to reuse (e.g. in batch
+            workers); created here if omitted
+        ocr_batch_size: ROI crops per batched EasyOCR call (default: the
+            extractor's setting)
+        ocr_mode: EasyOCR mode, 'detect' or 'recognize' (default: the
+            extractor's setting)
+        digit_templates: Read fps markers by glyph template matching after
+            calibrating on this many OCR readings (kept if the extractor
+            already has templates, which carry over between videos)
+
+    Returns:
+        (first_frame, last_frame) or None if marker never detected
+    """
+    video_info = probe_video(video_path)
+    total_frames = video_info['frame_count']
+    fps = video_info['fps']
+
+    if probe_step is None:
+        probe_step = max(1, int(round(fps)))
+
+    print(f"Video: {total_frames} frames @ {fps:.2f} FPS")
+    print(f"Scanning for marker (type: {marker_type}) in ROI: x={roi[0]}, y={roi[1]}, w={roi[2]}, h={roi[3]}")
+    if regex_pattern:
+        print(f"Pattern: {regex_pattern}")
+    if exhaustive:
+        print(f"Exhaustive scan, sliding window size: {window_size} frames")
+    else:
+        print(f"Coarse-to-fine scan, probe step: {probe_step} frames")
+
+    # Initialize OCR extractor (loaded once, reused for all frames)
+    if extractor is None:
+        extractor = FPSOCRExtractor(roi=roi, use_easyocr=True)
+    else:
+        extractor.roi = roi
+    if ocr_batch_size:
+        extractor.ocr_batch_size = ocr_batch_size
+    if ocr_mode:
+        extractor.ocr_mode = ocr_mode
+    if digit_templates and extractor.templates is None:
+        extractor.templates = DigitTemplateRecognizer(digit_templates)
+    extractor.reset_video_state()
+    gate_carried = extractor.gate.stats['carried'] if extractor.gate is not None else 0
+
+    x, y, w, h = roi
+
+    # Debug: Save first frame ROI crop for verification
+    if debug:
+        test_frame = read_frame(video_path, 0)
+        if test_frame is not None:
+            test_crop = test_frame[y:y+h, x:x+w]
+            debug_path = Path(video_path).parent / "debug_roi_crop.png"
+            cv2.imwrite(str(debug_path), test_crop)
+            print(f"[DEBUG] Saved ROI crop from first frame to: {debug_path}")
+            print(f"[DEBUG] ROI coordinates: x={x}, y={y}, w={w}, h={h}")
+            print(f"[DEBUG] Crop size: {test_crop.shape}")
+
+    ocr_calls = 0
+    detections = {}  # frame_idx -> detected (bisection and timeline frames may coincide)
+
+    def is_marker(roi_crop, frame_idx: int, verbose: bool) -> bool:
+        return is_marker_batch([roi_crop], [frame_idx], verbose)[0]
+
+    def is_marker_batch(roi_crops, frame_indices, verbose: bool) -> list:
+        nonlocal ocr_calls
+        new = [i for i, frame_idx in enumerate(frame_indices) if frame_idx not in detections]
+        if new:
+            ocr_calls += len(new)
+            results = detect_markers_with_fps_extractor(
+                [roi_crops[i] for i in new], extractor, marker_type, regex_pattern, debug and verbose,
+                fps_readings=fps_readings, frame_indices=[frame_indices[i] for i in new]
+            )
+            for i, detected in zip(new, results):
+                detections[frame_indices[i]] = detected
+        return [detections[frame_idx] for frame_idx in frame_indices]
+
+    if exhaustive:
+        if timeline_step:
+            print("  ⚠️  The FPS timeline is only recorded by the probe scan (not with --exhaustive)")
+        marker_range = _scan_exhaustive(video_path, roi, total_frames, fps, is_marker_batch, window_size, decoder)
+    else:
+        marker_range = _scan_coarse_to_fine(video_path, roi, total_frames, fps, is_marker, is_marker_batch,
+                                            probe_step, decoder, timeline_step=timeline_step)
+
+    if extractor.gate is not None:
+        carried = extractor.gate.stats['carried'] - gate_carried
+        print(f"  OCR calls: {ocr_calls - carried} ({carried} frames skipped OCR, ROI unchanged)")
+    else:
+        print(f"  OCR calls: {ocr_calls}")
+
+    if marker_range is None:
+        print("\n  ✗ Marker never detected in video")
+        return None
+
+    first_frame, last_frame = marker_range
 
     print(f"\n{'='*80}")
     print(f"Marker Range Detected".center(80))
@@ -313,120 +557,157 @@ def detect_marker_range(video_path: str, roi: Tuple[int, int, int, int],
     return first_frame, last_frame
 
 
+def _matching_source_frame(frame, input_path: str, frame_idx: int, total_frames: int) -> Tuple[Optional[int], float]:
+    """
+    Source frame around frame_idx that a trimmed frame shows.
+
+    Returns:
+        (index of the closest of frame_idx - 1, frame_idx and frame_idx + 1,
+        its mean squared difference), or (None, inf) if no source frame could be read
+    """
+    best = (None, float('inf'))
+    for idx in (frame_idx, frame_idx - 1, frame_idx + 1):
+        if not 0 <= idx < total_frames:
+            continue
+        source = read_frame(input_path, idx)
+        if source is None or source.shape != frame.shape:
+            continue
+        mse = float(np.mean((source.astype(np.float32) - frame.astype(np.float32)) ** 2))
+        if mse < best[1]:
+            best = (idx, mse)
+    return best
+
+
+def verify_trim_alignment(input_path: str, output_path: str, first_frame: int, last_frame: int,
+                          output_frames: int, lossless: bool = False) -> bool:
+    """
+    Check that a trimmed video starts on first_frame and ends on last_frame.
+
+    The first and last output frames are matched against the source frames
+    at the range edges and their neighbours; a shift of one frame (duplicated
+    first frame, missing last frame) shows up as a closer neighbour. Lossless
+    output must match bit-exactly.
+
+    Returns:
+        True if both edges match, False otherwise (details are printed)
+    """
+    total_frames = probe_video(input_path)['frame_count']
+    aligned = True
+    for label, output_idx, source_idx in (('First', 0, first_frame), ('Last', output_frames - 1, last_frame)):
+        frame = read_frame(output_path, output_idx)
+        if frame is None:
+            print(f"  ⚠️  {label} output frame could not be read")
+            aligned = False
+            continue
+
+        match, mse = _matching_source_frame(frame, input_path, source_idx, total_frames)
+        if match != source_idx:
+            print(f"  ⚠️  {label} frame shows source frame {match}, expected {source_idx}")
+            aligned = False
+        elif lossless and mse != 0:
+            print(f"  ⚠️  {label} frame differs from source frame {source_idx} (MSE {mse:.3f}), expected bit-exact")
+            aligned = False
+    return aligned
+
+
 def trim_video(input_path: str, output_path: str,
-               first_frame: int, last_frame: int):
+               first_frame: int, last_frame: int, mode: str = 'reencode') -> str:
     """
-    Trim video using FFmpeg with frame-accurate seeking.
+    Trim video to frames [first_frame, last_frame] (inclusive) with FFmpeg.
+
+    Modes:
+    - reencode: re-encode the whole segment (libx264, CRF 18)
+    - smart: stream-copy the GOPs inside the range and re-encode only the
+      partial GOPs at each edge (falls back to reencode when not possible)
+    - lossless: re-encode to FFV1 in Matroska, bit-exact with the source frames
+    - virtual: write a trim manifest (<output>.trim.json) instead of a video;
+      frame sources read it as a view over the untrimmed source
 
     Args:
         input_path: Source video
         output_path: Output trimmed video
         first_frame: First frame to include
         last_frame: Last frame to include
+        mode: One of TRIM_MODES or 'virtual'
+
+    Returns:
+        Path of the written video or manifest (lossless mode switches to .mkv if needed)
+
+    Raises:
+        RuntimeError: If FFmpeg fails
     """
     # Get video FPS
-    cap = cv2.VideoCapture(input_path)
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    cap.release()
+    fps = probe_video(input_path)['fps']
 
     # Convert frames to timestamps
+    frame_count = last_frame - first_frame + 1
     start_time = first_frame / fps
-    duration = (last_frame - first_frame) / fps
+    duration = frame_count / fps
+
+    if mode == 'virtual':
+        manifest_path = manifest_path_for(output_path)
+        write_trim_manifest(manifest_path, input_path, first_frame, last_frame, fps=fps)
+        print(f"\n✓ Trim manifest saved: {manifest_path}")
+        print(f"  Frames {first_frame}-{last_frame} ({frame_count} frames) of {input_path}")
+        return manifest_path
 
-    print(f"\nTrimming video with FFmpeg...")
+    if mode == 'lossless':
+        output_path = lossless_output_path(output_path)
+
+    print(f"\nTrimming video with FFmpeg ({mode})...")
     print(f"  Start: {start_time:.3f}s (frame {first_frame})")
-    print(f"  Duration: {duration:.3f}s ({last_frame - first_frame} frames)")
+    print(f"  Duration: {duration:.3f}s ({frame_count} frames)")
 
     # Create output directory
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
-    # FFmpeg command for frame-accurate trimming
-    cmd = [
-        'ffmpeg',
-        '-y',  # Overwrite output
-        '-ss', str(start_time),  # Seek to start
-        '-i', input_path,
-        '-t', str(duration),  # Duration
-        '-c:v', 'libx264',  # Re-encode to ensure frame accuracy
-        '-crf', '18',  # High quality
-        '-preset', 'fast',
-        '-c:a', 'aac',
-        '-b:a', '128k',
-        output_path
-    ]
-
-    result = subprocess.run(cmd, capture_output=True, text=True)
-
-    if result.returncode != 0:
-        print(f"✗ FFmpeg failed:")
-        print(result.stderr)
-        sys.exit(1)
+    cut = {'reencode': reencode_cut, 'smart': smart_cut, 'lossless': lossless_cut}[mode]
+    pieces = cut(input_path, output_path, first_frame, last_frame, fps)
 
-    # Verify output
-    cap_out = cv2.VideoCapture(output_path)
-    output_frames = int(cap_out.get(cv2.CAP_PROP_FRAME_COUNT))
-    cap_out.release()
+    if 'copied' in pieces:
+        print(f"  Re-encoded {pieces['head']} + {pieces['tail']} edge frames, "
+              f"stream-copied {pieces['copied']} frames")
+
+    # Verify output by indexing it (container frame counts are estimates for MKV);
+    # the saved index also gives the analysis exact counts and seeks
+    output_frames = get_frame_index(output_path).frame_count
 
     print(f"  ✓ Trimmed video saved: {output_path}")
     print(f"  Output: {output_frames} frames")
+    if output_frames != frame_count:
+        print(f"  ⚠️  Expected {frame_count} frames")
+    if output_frames > 0 and verify_trim_alignment(input_path, output_path, first_frame, last_frame,
+                                                   output_frames, lossless=mode == 'lossless'):
+        print(f"  ✓ Aligned: output starts on frame {first_frame} and ends on frame {last_frame}")
 
+    return output_path
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='Generic video trimming based on text marker detection',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  # Using YAML ROI config
-  python src/trim/trim_by_marker.py \\
-      --video recordings/forza_extreme/1080p_dlaa_run1.mp4 \\
-      --roi-config recordings/forza_extreme/roi_trim_coordinates.yaml \\
-      --output recordings/forza_extreme/trimmed/1080p_dlaa_run1.mp4
 
-  # Manual ROI and FPS marker
-  python src/trim/trim_by_marker.py \\
-      --video recordings/cyberpunk/1080p_dlaa_run1.mp4 \\
-      --roi "top-left 10%" \\
-      --marker-type fps \\
-      --output recordings/cyberpunk/trimmed/1080p_dlaa_run1.mp4
+def resolve_marker_settings(video_path: str, roi_config: str = None, roi_spec: str = None,
+                            marker_type: str = None, marker_pattern: str = None) -> Tuple:
+    """
+    Resolve ROI and marker settings from a YAML config or manual arguments.
 
-  # Manual ROI and text marker
-  python src/trim/trim_by_marker.py \\
-      --video recordings/forza_extreme/1080p_dlaa_run1.mp4 \\
-      --roi "0,0,250,80" \\
-      --marker-type text \\
-      --marker-pattern "PROGRESSO" \\
-      --output recordings/forza_extreme/trimmed/1080p_dlaa_run1.mp4
-        """
-    )
-    parser.add_argument('--video', required=True,
-                       help='Input video path')
-    parser.add_argument('--output', required=True,
-                       help='Output trimmed video path')
-    parser.add_argument('--roi-config', type=str,
-                       help='Path to YAML ROI config file (generated by roi_selector.py)')
-    parser.add_argument('--roi', type=str,
-                       help='Manual ROI as "x,y,width,height" (pixels) or "top-left 15%%" (percentage)')
-    parser.add_argument('--marker-type', type=str, choices=['fps', 'text', 'regex'],
-                       help='Marker type (required if not using --roi-config)')
-    parser.add_argument('--marker-pattern', type=str,
-                       help='Pattern to match (required for text/regex types)')
-    parser.add_argument('--dry-run', action='store_true',
-                       help='Only detect range, do not trim')
-    parser.add_argument('--debug', action='store_true',
-                       help='Print OCR detection results for debugging')
+    ROIs from configs are scaled to the video resolution; percentage ROIs
+    ("top-left 10%") are converted to pixels.
 
-    args = parser.parse_args()
+    Args:
+        video_path: Video to trim
+        roi_config: Path to YAML ROI config (takes precedence)
+        roi_spec: Manual ROI ("x,y,width,height" or "top-left 15%")
+        marker_type: Manual marker type ("fps", "text" or "regex")
+        marker_pattern: Manual marker pattern (for text/regex types)
 
-    # Load configuration
-    roi = None
-    marker_type = None
-    marker_pattern = None
+    Returns:
+        (roi, marker_type, marker_pattern)
 
-    if args.roi_config:
+    Raises:
+        ValueError: If the settings are incomplete
+    """
+    if roi_config:
         # Load from YAML config
-        print(f"Loading ROI config from: {args.roi_config}")
-        config = load_roi_config(args.roi_config)
+        print(f"Loading ROI config from: {roi_config}")
+        config = load_roi_config(roi_config)
 
         # Extract ROI pixels
         roi_str = config['roi']['pixels']
@@ -437,7 +718,7 @@ Examples:
         ref_width, ref_height = map(int, ref_resolution.split('x'))
 
         # Get current video resolution
-        cap = cv2.VideoCapture(args.video)
+        cap = cv2.VideoCapture(video_path)
         curr_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         curr_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         cap.release()
@@ -468,31 +749,167 @@ Examples:
 
     else:
         # Use manual specification
-        if not args.roi or not args.marker_type:
-            print("✗ Error: Either --roi-config OR (--roi AND --marker-type) is required")
-            sys.exit(1)
+        if not roi_spec or not marker_type:
+            raise ValueError("Either --roi-config OR (--roi AND --marker-type) is required")
 
         # Parse manual ROI
-        if '%' in args.roi:
-            cap = cv2.VideoCapture(args.video)
+        if '%' in roi_spec:
+            cap = cv2.VideoCapture(video_path)
             frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             cap.release()
-            roi = parse_roi(args.roi, frame_width, frame_height)
-            print(f"Using percentage ROI: {args.roi} -> {roi}")
+            roi = parse_roi(roi_spec, frame_width, frame_height)
+            print(f"Using percentage ROI: {roi_spec} -> {roi}")
         else:
-            roi = parse_roi(args.roi)
+            roi = parse_roi(roi_spec)
             print(f"Using manual ROI: {roi}")
 
-        marker_type = args.marker_type
-        marker_pattern = args.marker_pattern
-
         if marker_type in ['text', 'regex'] and not marker_pattern:
-            print(f"✗ Error: --marker-pattern is required for marker type '{marker_type}'")
-            sys.exit(1)
+            raise ValueError(f"--marker-pattern is required for marker type '{marker_type}'")
+
+    return roi, marker_type, marker_pattern
+
+
+def save_scan_fps_timeline(trimmed_path: str, source_path: str, roi: Tuple[int, int, int, int],
+                           first_frame: int, last_frame: int, timeline_step: int,
+                           fps_readings: dict, fps: float) -> Optional[Path]:
+    """
+    Save the FPS values read by the marker scan as the trimmed video's FPS timeline.
+
+    Args:
+        trimmed_path: Trimmed video or trim manifest written by trim_video()
+        source_path: Untrimmed video that was scanned
+        roi: Scanned ROI
+        first_frame: First trimmed frame in the source
+        last_frame: Last trimmed frame in the source
+        timeline_step: Step of the timeline grid used during the scan
+        fps_readings: frame_idx -> (FPS value, carried) filled by detect_marker_range()
+        fps: Video frame rate
+
+    Returns:
+        Sidecar path, or None if the scan did not read every timeline frame
+    """
+    grid = range(first_frame, last_frame + 1, timeline_step)
+    missing = sum(1 for idx in grid if idx not in fps_readings)
+    if missing:
+        print(f"  ⚠️  Marker scan did not read {missing} timeline frames, FPS timeline not saved")
+        return None
+
+    readings = [(idx - first_frame, fps_readings[idx][0]) for idx in grid]
+    carried_frames = {idx - first_frame for idx in grid if fps_readings[idx][1]}
+    fps_data = fill_fps_gaps(readings, fps, carried_frames=carried_frames)
+    path = save_fps_timeline(trimmed_path, roi, timeline_step, fps_data,
+                             FPSOCRExtractor.calculate_statistics(fps_data),
+                             last_frame - first_frame + 1,
+                             source_path=source_path, source_first_frame=first_frame)
+    print(f"  ✓ FPS timeline saved: {path} ({len(fps_data)} measurements, every {timeline_step} frames)")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generic video trimming based on text marker detection',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Using YAML ROI config
+  python src/trim/trim_by_marker.py \\
+      --video recordings/forza_extreme/1080p_dlaa_run1.mp4 \\
+      --roi-config recordings/forza_extreme/roi_trim_coordinates.yaml \\
+      --output recordings/forza_extreme/trimmed/1080p_dlaa_run1.mp4
+
+  # Manual ROI and FPS marker
+  python src/trim/trim_by_marker.py \\
+      --video recordings/cyberpunk/1080p_dlaa_run1.mp4 \\
+      --roi "top-left 10%" \\
+      --marker-type fps \\
+      --output recordings/cyberpunk/trimmed/1080p_dlaa_run1.mp4
+
+  # Smart cut: copy whole GOPs, re-encode only the edges
+  python src/trim/trim_by_marker.py \\
+      --video recordings/cyberpunk/1080p_dlaa_run1.mp4 \\
+      --roi-config recordings/cyberpunk/roi_trim_coordinates.yaml \\
+      --trim-mode smart \\
+      --output recordings/cyberpunk/trimmed/1080p_dlaa_run1.mp4
+
+  # Virtual trim: write trimmed/1080p_dlaa_run1.trim.json, no video is encoded
+  python src/trim/trim_by_marker.py \\
+      --video recordings/cyberpunk/1080p_dlaa_run1.mp4 \\
+      --roi-config recordings/cyberpunk/roi_trim_coordinates.yaml \\
+      --trim-mode virtual \\
+      --output recordings/cyberpunk/trimmed/1080p_dlaa_run1.mp4
+
+  # Manual ROI and text marker
+  python src/trim/trim_by_marker.py \\
+      --video recordings/forza_extreme/1080p_dlaa_run1.mp4 \\
+      --roi "0,0,250,80" \\
+      --marker-type text \\
+      --marker-pattern "PROGRESSO" \\
+      --output recordings/forza_extreme/trimmed/1080p_dlaa_run1.mp4
+        """
+    )
+    parser.add_argument('--video', required=True,
+                       help='Input video path')
+    parser.add_argument('--output', required=True,
+                       help='Output trimmed video path')
+    parser.add_argument('--roi-config', type=str,
+                       help='Path to YAML ROI config file (generated by roi_selector.py)')
+    parser.add_argument('--roi', type=str,
+                       help='Manual ROI as "x,y,width,height" (pixels) or "top-left 15%%" (percentage)')
+    parser.add_argument('--marker-type', type=str, choices=['fps', 'text', 'regex'],
+                       help='Marker type (required if not using --roi-config)')
+    parser.add_argument('--marker-pattern', type=str,
+                       help='Pattern to match (required for text/regex types)')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Only detect range, do not trim')
+    parser.add_argument('--debug', action='store_true',
+                       help='Print OCR detection results for debugging')
+    parser.add_argument('--decoder', choices=FRAME_SOURCE_BACKENDS, default='opencv',
+                       help='Frame decoder backend for marker scanning (default: opencv)')
+    parser.add_argument('--trim-mode', choices=TRIM_MODES + ('virtual',), default='reencode',
+                       help='reencode: full libx264 re-encode (default); smart: stream-copy whole GOPs, '
+                            're-encode only the edges; lossless: FFV1 .mkv, bit-exact frames; '
+                            'virtual: write <output>.trim.json instead of a video')
+    parser.add_argument('--fps-timeline', type=int, metavar='N',
+                       help='FPS markers: also OCR every Nth frame of the detected range and save it as '
+                            '<output>.fps.json for the analysis (use the analysis sample_rate)')
+    parser.add_argument('--exhaustive', action='store_true',
+                       help='OCR every frame instead of probing + bisection (slow; for validation)')
+    parser.add_argument('--probe-step', type=int,
+                       help='Frames between marker probes (default: one second of video)')
+    parser.add_argument('--ocr-mode', choices=OCR_MODES,
+                       help='EasyOCR mode: detect (text detection on every crop, default) or recognize '
+                            '(recognition only on the ROI text lines; much faster on CPU)')
+    parser.add_argument('--ocr-batch-size', type=int,
+                       help=f'ROI crops per batched EasyOCR call (default: {DEFAULT_OCR_BATCH_SIZE})')
+    parser.add_argument('--digit-templates', type=int, nargs='?', const=DEFAULT_CALIBRATION_CROPS, metavar='N',
+                       help='FPS markers: read the counter by glyph template matching, calibrated on the first '
+                            f'N OCR readings (EasyOCR fallback on low match confidence; N defaults to '
+                            f'{DEFAULT_CALIBRATION_CROPS})')
+
+    args = parser.parse_args()
+
+    # Load configuration
+    try:
+        roi, marker_type, marker_pattern = resolve_marker_settings(
+            args.video, args.roi_config, args.roi, args.marker_type, args.marker_pattern
+        )
+    except ValueError as e:
+        print(f"✗ Error: {e}")
+        sys.exit(1)
+
+    timeline_step = args.fps_timeline
+    if timeline_step and marker_type != 'fps':
+        print(f"  ⚠️  --fps-timeline needs an fps marker (got '{marker_type}'), ignoring")
+        timeline_step = None
+    fps_readings = {} if timeline_step else None
 
     # Detect marker range
-    marker_range = detect_marker_range(args.video, roi, marker_type, marker_pattern, debug=args.debug)
+    marker_range = detect_marker_range(args.video, roi, marker_type, marker_pattern, debug=args.debug,
+                                       decoder=args.decoder, exhaustive=args.exhaustive,
+                                       probe_step=args.probe_step, timeline_step=timeline_step,
+                                       fps_readings=fps_readings, ocr_batch_size=args.ocr_batch_size,
+                                       ocr_mode=args.ocr_mode, digit_templates=args.digit_templates)
 
     if marker_range is None:
         print("\n✗ Marker never detected in video. Cannot trim.")
@@ -506,7 +923,15 @@ Examples:
         print(f"Would trim: {args.video} -> {args.output}")
         print(f"Range: frames {first_frame}-{last_frame}")
     else:
-        trim_video(args.video, args.output, first_frame, last_frame)
+        try:
+            output_path = trim_video(args.video, args.output, first_frame, last_frame, mode=args.trim_mode)
+        except (RuntimeError, ValueError) as e:
+            print(f"✗ FFmpeg failed:")
+            print(e)
+            sys.exit(1)
+        if timeline_step:
+            save_scan_fps_timeline(output_path, args.video, roi, first_frame, last_frame, timeline_step,
+                                   fps_readings, probe_video(args.video)['fps'])
         print("\n✓ Video trimming complete")
 
 
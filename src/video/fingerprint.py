@@ -0,0 +1,52 @@
+"""
+Content fingerprints for video files.
+
+Caches and sidecars derived from a video (decoded frames, indexes, OCR
+timelines) are keyed by a fingerprint of the file content rather than its
+path, so renamed or copied recordings still hit, and re-encoded files with
+the same name do not.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+# Bytes hashed from the start and the end of the file
+FINGERPRINT_CHUNK_SIZE = 1024 * 1024
+
+_fingerprint_cache = {}
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    Compute a fast content fingerprint for a file.
+
+    Hashes the file size together with the first and last 1 MiB, which covers
+    the container header, the moov/index atoms and the first/last GOPs. This is
+    cheap even for multi-GB 4K recordings and changes whenever the file is
+    re-encoded or trimmed.
+
+    Args:
+        path: Path to file
+
+    Returns:
+        32-character hex digest
+    """
+    path = Path(path)
+    stat = path.stat()
+    cache_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if cache_key in _fingerprint_cache:
+        return _fingerprint_cache[cache_key]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(stat.st_size).encode())
+
+    with open(path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_CHUNK_SIZE))
+        if stat.st_size > FINGERPRINT_CHUNK_SIZE:
+            f.seek(max(FINGERPRINT_CHUNK_SIZE, stat.st_size - FINGERPRINT_CHUNK_SIZE), os.SEEK_SET)
+            digest.update(f.read(FINGERPRINT_CHUNK_SIZE))
+
+    fingerprint = digest.hexdigest()
+    _fingerprint_cache[cache_key] = fingerprint
+    return fingerprint
@@ -0,0 +1,356 @@
+"""
+Per-video frame index sidecars.
+
+OpenCV's CAP_PROP_FRAME_COUNT and CAP_PROP_FPS are container estimates
+(duration x nominal rate), which are off on variable frame rate recordings
+and on files converted to constant frame rate, and CAP_PROP_POS_FRAMES seeks
+convert frame numbers to timestamps with the same estimate. The index here
+is built once per video from a demux pass (no decoding) and lists every
+frame in presentation order with its timestamp, keyframe flag, packet size
+and byte offset. Frame sources use it for exact frame counts and frame
+rates and for keyframe-aware seeks.
+
+File layout (``<video>.fidx`` next to the video, e.g. ``run1.mp4.fidx``):
+
+    [8 bytes magic][4 bytes header length][JSON header][frame records...]
+
+The JSON header holds the content fingerprint of the video, the codec and
+the stream time base; stale indexes (re-encoded or trimmed videos) are
+ignored. Each frame record is a packed FRAME_RECORD (pts, byte offset,
+packet size, flags).
+
+Byte offsets come from PyAV when it is installed (``pip install av``);
+otherwise packets are listed with FFmpeg (``-f framecrc``), which does not
+report offsets, and they are stored as -1.
+
+Usage:
+    python src/video/frame_index.py recordings/cyberpunk/*.mp4
+"""
+
+import argparse
+import json
+import os
+import struct
+import subprocess
+import sys
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+# Add project root to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.video.fingerprint import file_fingerprint
+
+try:
+    import av
+    PYAV_AVAILABLE = True
+except ImportError:
+    PYAV_AVAILABLE = False
+
+FRAME_INDEX_SUFFIX = '.fidx'
+INDEX_MAGIC = b'FIDX0001'
+INDEX_VERSION = 1
+
+FLAG_KEYFRAME = 1
+
+# One record per frame, presentation order; pos is -1 when unknown
+FRAME_RECORD = np.dtype([('pts', '<i8'), ('pos', '<i8'), ('size', '<u4'), ('flags', 'u1')])
+
+NOPTS_VALUE = -(1 << 63)
+
+_index_cache = {}
+
+
+def frame_index_path(video_path: str) -> Path:
+    """Sidecar path of a video: ``x.mp4`` -> ``x.mp4.fidx``."""
+    return Path(str(video_path) + FRAME_INDEX_SUFFIX)
+
+
+def read_packets(video_path: str) -> Dict:
+    """
+    List the video packets of a file without decoding it.
+
+    Returns:
+        Dictionary with:
+        - codec: FFmpeg codec name (e.g. 'h264')
+        - time_base: Stream time base (Fraction)
+        - packets: (pts, pos, size, is_keyframe) tuples in decode order;
+          pos is -1 when unknown
+    """
+    if PYAV_AVAILABLE:
+        return _read_packets_pyav(video_path)
+    return _read_packets_ffmpeg(video_path)
+
+
+def _read_packets_pyav(video_path: str) -> Dict:
+    packets = []
+    try:
+        with av.open(str(video_path)) as container:
+            if not container.streams.video:
+                raise RuntimeError(f"No video stream in {video_path}")
+            stream = container.streams.video[0]
+            codec = stream.codec_context.name
+            time_base = Fraction(stream.time_base)
+            for packet in container.demux(stream):
+                if packet.size == 0:
+                    continue  # Flush packet
+                pts = packet.pts if packet.pts is not None else packet.dts
+                pos = packet.pos if packet.pos is not None else -1
+                packets.append((int(pts), int(pos), packet.size, bool(packet.is_keyframe)))
+    except av.FFmpegError as e:
+        raise RuntimeError(f"PyAV failed to read packets of {video_path}: {e}")
+
+    return {'codec': codec, 'time_base': time_base, 'packets': packets}
+
+
+def _read_packets_ffmpeg(video_path: str) -> Dict:
+    from src.video.ffmpeg_pipe import get_ffmpeg_exe
+
+    output = subprocess.run(
+        [get_ffmpeg_exe(), '-hide_banner', '-loglevel', 'error', '-nostdin',
+         '-i', str(video_path), '-map', '0:v:0', '-c', 'copy', '-f', 'framecrc', '-'],
+        capture_output=True, text=True
+    )
+    if output.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed to read packets of {video_path}:\n{output.stderr}")
+
+    codec = None
+    time_base = Fraction(1)
+    packets = []
+    for line in output.stdout.splitlines():
+        if line.startswith('#tb 0:'):
+            time_base = Fraction(line.split(':', 1)[1].strip())
+        elif line.startswith('#codec_id 0:'):
+            codec = line.split(':', 1)[1].strip()
+        elif line and not line.startswith('#'):
+            # stream, dts, pts, duration, size, crc[, flags]
+            fields = [field.strip() for field in line.split(',')]
+            flags = fields[6] if len(fields) > 6 else 'F=0x1'  # Key flag only is omitted
+            dts, pts = int(fields[1]), int(fields[2])
+            packets.append((pts if pts != NOPTS_VALUE else dts, -1, int(fields[4]),
+                            bool(int(flags[2:], 16) & 1)))
+
+    return {'codec': codec, 'time_base': time_base, 'packets': packets}
+
+
+class FrameIndex:
+    """Timestamps, keyframe flags and byte offsets of every frame of a video."""
+
+    def __init__(self, frames: np.ndarray, time_base: Fraction, codec: str = None,
+                 fingerprint: str = None):
+        """
+        Args:
+            frames: FRAME_RECORD array in presentation order
+            time_base: Stream time base of the pts values
+            codec: FFmpeg codec name
+            fingerprint: file_fingerprint() of the indexed video
+        """
+        self.frames = frames
+        self.time_base = time_base
+        self.codec = codec
+        self.fingerprint = fingerprint
+
+        self.keyframes = np.flatnonzero(frames['flags'] & FLAG_KEYFRAME)
+        pts = frames['pts']
+        self.frame_times = (pts - pts[0]) * float(time_base) if len(frames) else np.empty(0)
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames)
+
+    @property
+    def fps(self) -> float:
+        """Average frame rate (exact for constant frame rate video), 0.0 if unknown."""
+        if self.frame_count < 2:
+            return 0.0
+        span = int(self.frames['pts'][-1] - self.frames['pts'][0])
+        if span <= 0:
+            return 0.0
+        return float((self.frame_count - 1) / (span * self.time_base))
+
+    @property
+    def has_positions(self) -> bool:
+        """True if byte offsets were recorded."""
+        return self.frame_count > 0 and bool((self.frames['pos'] >= 0).all())
+
+    def keyframe_before(self, frame_idx: int) -> int:
+        """Last keyframe at or before frame_idx (0 if there is none)."""
+        i = int(np.searchsorted(self.keyframes, frame_idx, side='right')) - 1
+        return int(self.keyframes[i]) if i >= 0 else 0
+
+    def seek_time(self, frame_idx: int) -> float:
+        """Input seek time that lands exactly on frame_idx (halfway from the previous frame)."""
+        if frame_idx <= 0:
+            return 0.0
+        return float(self.frame_times[frame_idx - 1] + self.frame_times[frame_idx]) / 2
+
+    def frame_at_time(self, seconds: float) -> Optional[int]:
+        """
+        Frame shown at a timestamp (seconds from the first frame).
+
+        Returns:
+            Frame index, or None if no frame lies within half a frame of the time
+        """
+        if self.frame_count == 0:
+            return None
+
+        i = int(np.searchsorted(self.frame_times, seconds))
+        candidates = [c for c in (i - 1, i) if 0 <= c < self.frame_count]
+        best = min(candidates, key=lambda c: abs(self.frame_times[c] - seconds))
+
+        tolerance = 0.5 / self.fps if self.fps > 0 else 0.001
+        return best if abs(self.frame_times[best] - seconds) < tolerance else None
+
+
+def build_frame_index(video_path: str) -> FrameIndex:
+    """
+    Index a video with one demux pass (packets are not decoded).
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        FrameIndex
+    """
+    info = read_packets(video_path)
+    if not info['packets']:
+        raise RuntimeError(f"No video packets found in {video_path}")
+
+    records = np.array([(pts, pos, size, FLAG_KEYFRAME if is_key else 0)
+                        for pts, pos, size, is_key in info['packets']], dtype=FRAME_RECORD)
+    records = records[np.argsort(records['pts'], kind='stable')]
+
+    return FrameIndex(records, info['time_base'], info['codec'], file_fingerprint(video_path))
+
+
+def save_frame_index(index: FrameIndex, video_path: str) -> Path:
+    """
+    Write the index sidecar of a video.
+
+    Returns:
+        Sidecar path
+    """
+    path = frame_index_path(video_path)
+    header_bytes = json.dumps({
+        'version': INDEX_VERSION,
+        'fingerprint': index.fingerprint,
+        'codec': index.codec,
+        'time_base': [index.time_base.numerator, index.time_base.denominator],
+        'frame_count': index.frame_count
+    }).encode()
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    with open(tmp_path, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        index.frames.tofile(f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_frame_index(video_path: str) -> Optional[FrameIndex]:
+    """
+    Load the index sidecar of a video.
+
+    Returns:
+        FrameIndex, or None if there is no valid index for the current file content
+    """
+    path = frame_index_path(video_path)
+    if not path.exists():
+        return None
+
+    fingerprint = file_fingerprint(video_path)
+    cache_key = (str(path.resolve()), fingerprint)
+    if cache_key in _index_cache:
+        return _index_cache[cache_key]
+
+    index = None
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(INDEX_MAGIC)) == INDEX_MAGIC:
+                (header_length,) = struct.unpack('<I', f.read(4))
+                header = json.loads(f.read(header_length))
+                frames = np.fromfile(f, dtype=FRAME_RECORD, count=header['frame_count'])
+                if header.get('version') == INDEX_VERSION and len(frames) == header['frame_count']:
+                    if header['fingerprint'] == fingerprint:
+                        index = FrameIndex(frames, Fraction(*header['time_base']), header['codec'],
+                                           fingerprint)
+                    else:
+                        print(f"  ⚠️  Ignoring stale frame index {path.name} (video changed)")
+    except (OSError, ValueError, KeyError, struct.error):
+        index = None
+
+    _index_cache[cache_key] = index
+    return index
+
+
+def get_frame_index(video_path: str) -> FrameIndex:
+    """
+    Load the index sidecar of a video, building and saving it if needed.
+
+    Returns:
+        FrameIndex
+    """
+    index = load_frame_index(video_path)
+    if index is not None:
+        return index
+
+    index = build_frame_index(video_path)
+    try:
+        path = save_frame_index(index, video_path)
+        _index_cache[(str(path.resolve()), index.fingerprint)] = index
+    except OSError as e:
+        print(f"  ⚠️  Could not save frame index of {video_path}: {e}")
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build frame index sidecars (.fidx) for videos',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Index all recordings of a game
+  python src/video/frame_index.py recordings/cyberpunk/*.mp4
+
+  # Rebuild existing indexes
+  python src/video/frame_index.py recordings/cyberpunk/*.mp4 --force
+        """
+    )
+    parser.add_argument('videos', nargs='+', help='Videos (or trim manifests) to index')
+    parser.add_argument('--force', action='store_true', help='Rebuild indexes that are already up to date')
+
+    args = parser.parse_args()
+
+    from src.video.trim_manifest import resolve_video
+
+    if not PYAV_AVAILABLE:
+        print("⚠️  PyAV not installed, byte offsets are not recorded. Install with: pip install av")
+
+    failed = 0
+    for video in args.videos:
+        media_path, _, _ = resolve_video(video)
+        if not args.force and load_frame_index(media_path) is not None:
+            print(f"✓ {media_path}: up to date")
+            continue
+
+        try:
+            index = build_frame_index(media_path)
+            path = save_frame_index(index, media_path)
+        except (RuntimeError, OSError) as e:
+            print(f"✗ {media_path}: {e}")
+            failed += 1
+            continue
+
+        print(f"✓ {path}: {index.frame_count} frames, {len(index.keyframes)} keyframes, "
+              f"{index.fps:.3f} FPS ({index.codec})")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
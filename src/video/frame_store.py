@@ -0,0 +1,320 @@
+"""
+On-disk store of decoded frames shared across comparisons.
+
+Every analysis config compares one reference video (``*_dlaa_run1.mp4``)
+against several others, so the reference used to be decoded once per
+comparison. The store writes the sampled frames of a video once into a raw
+file that later comparisons map with ``np.memmap`` instead of decoding again.
+
+File layout (one file per video fingerprint, sample rate, pixel format,
+decoder backend and seek threshold, since seeking and the ffmpeg pipe may
+yield different frames than exact sequential OpenCV decoding):
+
+    [8 bytes magic][4 bytes header length][JSON header][padding][frames...]
+
+Frames start at the 4096-byte aligned offset recorded in the header and are
+stored contiguously as uint8 arrays of the recorded shape. The store is
+capped in size; least recently used entries (by file mtime, refreshed on
+every hit) are evicted before a new entry is written.
+"""
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from src.video.fingerprint import file_fingerprint
+from src.video.sources import FrameSource, open_frame_source
+
+STORE_MAGIC = b'FISTORE1'
+STORE_VERSION = 1
+STORE_SUFFIX = '.frames'
+DATA_ALIGNMENT = 4096
+
+
+def _data_offset(header_bytes: bytes) -> int:
+    size = len(STORE_MAGIC) + 4 + len(header_bytes)
+    return (size + DATA_ALIGNMENT - 1) // DATA_ALIGNMENT * DATA_ALIGNMENT
+
+
+def read_store_header(path: Path) -> Optional[Dict]:
+    """
+    Read the JSON header of a store file.
+
+    Returns:
+        Header dict or None if the file is not a valid store file
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(STORE_MAGIC)) != STORE_MAGIC:
+                return None
+            (header_length,) = struct.unpack('<I', f.read(4))
+            header_bytes = f.read(header_length)
+    except (OSError, struct.error):
+        return None
+
+    try:
+        header = json.loads(header_bytes)
+    except ValueError:
+        return None
+
+    if header.get('version') != STORE_VERSION:
+        return None
+
+    return header
+
+
+class DecodedFrameStore:
+    """
+    Size-capped directory of memory-mapped decoded frame files.
+
+    Entries are keyed by (video content fingerprint, sample rate, pixel format,
+    decoder backend, seek threshold).
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        """
+        Args:
+            root: Store directory (e.g. on a scratch SSD)
+            max_bytes: Size cap for all entries together
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+    def entry_path(self, video_path: str, sample_rate: int, pix_fmt: str = 'bgr24',
+                   decoder: str = 'opencv', seek_threshold: int = 0) -> Path:
+        """
+        Path of the store file for a video.
+
+        Args:
+            video_path: Video path
+            sample_rate: Step between stored frames
+            pix_fmt: Pixel format of the stored frames
+            decoder: Frame source backend the frames are decoded with
+            seek_threshold: Seek threshold of the opencv backend (seeking may change frames)
+        """
+        fingerprint = file_fingerprint(video_path)
+        return self.root / f"{fingerprint}_s{sample_rate}_{pix_fmt}_{decoder}_k{seek_threshold}{STORE_SUFFIX}"
+
+    def lookup(self, video_path: str, sample_rate: int, max_frames: int,
+               pix_fmt: str = 'bgr24', decoder: str = 'opencv',
+               seek_threshold: int = 0) -> Optional[Tuple[Path, Dict]]:
+        """
+        Find a stored entry covering frames [0, max_frames) of a video.
+
+        Only entries decoded with the same backend and seek threshold match
+        (see entry_path()). Marks the entry as recently used on a hit.
+
+        Returns:
+            (path, header) or None on a miss
+        """
+        path = self.entry_path(video_path, sample_rate, pix_fmt, decoder, seek_threshold)
+        header = read_store_header(path) if path.exists() else None
+
+        if header is None or (header['covered_frames'] < max_frames and not header['end_of_stream']):
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            os.utime(path)  # LRU bookkeeping
+        except OSError:
+            pass
+        self.stats['hits'] += 1
+        return path, header
+
+    def total_bytes(self) -> int:
+        """Current size of all store entries."""
+        return sum(p.stat().st_size for p in self.root.glob(f"*{STORE_SUFFIX}"))
+
+    def reserve(self, nbytes: int) -> bool:
+        """
+        Evict least recently used entries until nbytes fit under the cap.
+
+        Returns:
+            False if nbytes exceeds the cap on its own (nothing is evicted)
+        """
+        if nbytes > self.max_bytes:
+            return False
+
+        entries = []
+        for path in self.root.glob(f"*{STORE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total + nbytes <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue  # Still mapped by another process (Windows) or already gone
+            total -= size
+            self.stats['evicted'] += 1
+
+        return True
+
+
+class StoreBackedFrameSource(FrameSource):
+    """
+    Frame source that serves sampled frames from a DecodedFrameStore.
+
+    On a hit, frames are yielded as read-only views into the memory-mapped
+    store file (zero-copy). On a miss, frames are decoded with the configured
+    backend and written to the store while they are yielded. Whether the
+    store covers the request is decided when iteration starts, so max_frames
+    can still be adjusted after construction.
+    """
+
+    backend = 'store'
+
+    def __init__(self, video_path: str, store: DecodedFrameStore, sample_rate: int = 1,
+                 max_frames: Optional[int] = None, **source_options):
+        """
+        Args:
+            video_path: Path to video file
+            store: DecodedFrameStore to read from / write to
+            sample_rate: Yield every Nth frame (1 = all frames)
+            max_frames: Stop before this frame index (default: container frame count)
+            **source_options: Options for open_frame_source() used on a miss
+        """
+        self.store = store
+        self.source_options = source_options
+        self.pix_fmt = 'bgr24'
+        self.decoder = source_options.get('backend', 'opencv')
+        self.seek_threshold = source_options.get('seek_threshold', 0)
+        self._source = None
+        self._storing = False
+        super().__init__(video_path, sample_rate, max_frames)
+
+        self.stats = {'store_hit': False}
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        entry = self.store.lookup(self.video_path, self.sample_rate, self.max_frames, self.pix_fmt,
+                                  self.decoder, self.seek_threshold)
+        if entry is not None:
+            self.stats['store_hit'] = True
+            yield from self._iter_stored(*entry)
+        else:
+            yield from self._iter_decode_and_store()
+
+    @property
+    def drain_on_early_stop(self) -> bool:
+        """
+        Whether a consumer that stops early should still exhaust this source.
+
+        True while a miss is being written to the store: only a full pass up
+        to max_frames is kept, so lockstep readers drain the remaining frames
+        instead of discarding the entry when the other videos end first.
+        """
+        return self._storing
+
+    def _iter_stored(self, path: Path, header: Dict) -> Iterator[Tuple[int, np.ndarray]]:
+        count = header['frame_count']
+        if count == 0:
+            return
+
+        frames = np.memmap(path, dtype=np.uint8, mode='r', offset=header['data_offset'],
+                           shape=(count,) + tuple(header['shape']))
+        for i in range(count):
+            frame_idx = i * self.sample_rate
+            if frame_idx >= self.max_frames:
+                break
+            yield frame_idx, frames[i]
+
+    def _iter_decode_and_store(self) -> Iterator[Tuple[int, np.ndarray]]:
+        self._source = open_frame_source(self.video_path, sample_rate=self.sample_rate,
+                                         max_frames=self.max_frames, **self.source_options)
+        capacity = (self.max_frames + self.sample_rate - 1) // self.sample_rate
+
+        writer = None
+        count = 0
+        completed = False
+        try:
+            for frame_idx, frame in self._source:
+                if count == 0:
+                    writer = self._open_writer(frame, capacity)
+                    self._storing = writer is not None
+                if writer is not None:
+                    writer[0][count] = frame
+                count += 1
+                yield frame_idx, frame
+            completed = True
+        finally:
+            self._storing = False
+            self._source.release()
+            if writer is not None:
+                # Only a full pass is reusable; partial passes are discarded
+                self._finish_writer(writer, count, completed)
+
+    def _open_writer(self, first_frame: np.ndarray, capacity: int):
+        frame_bytes = first_frame.nbytes
+        if not self.store.reserve(capacity * frame_bytes):
+            print(f"  ⚠️  Frame store too small for {Path(self.video_path).name}, not caching")
+            return None
+
+        final_path = self.store.entry_path(self.video_path, self.sample_rate, self.pix_fmt,
+                                           self.decoder, self.seek_threshold)
+        tmp_path = final_path.with_suffix(f".{os.getpid()}.partial")
+
+        # Reserve header space generously; the real header is written when finished
+        header_bytes = json.dumps(self._header(first_frame.shape, capacity, capacity, 0)).encode()
+        offset = _data_offset(header_bytes + b' ' * 1024)
+
+        frames = np.memmap(tmp_path, dtype=np.uint8, mode='w+', offset=offset,
+                           shape=(capacity,) + first_frame.shape)
+        return frames, tmp_path, final_path, offset, first_frame.shape
+
+    def _header(self, shape, frame_count: int, covered_frames: int, data_offset: int) -> Dict:
+        return {
+            'version': STORE_VERSION,
+            'data_offset': data_offset,
+            'fingerprint': file_fingerprint(self.video_path),
+            'source': self.video_path,
+            'sample_rate': self.sample_rate,
+            'pix_fmt': self.pix_fmt,
+            'decoder': self.decoder,
+            'seek_threshold': self.seek_threshold,
+            'shape': list(shape),
+            'frame_count': frame_count,
+            'covered_frames': covered_frames,
+            'end_of_stream': frame_count * self.sample_rate < covered_frames,
+            'source_frame_count': self.frame_count,
+            'fps': self.fps
+        }
+
+    def _finish_writer(self, writer, count: int, completed: bool):
+        frames, tmp_path, final_path, offset, shape = writer
+        frames.flush()
+        del frames
+
+        if not completed:
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        header_bytes = json.dumps(self._header(shape, count, self.max_frames, offset)).encode()
+        if _data_offset(header_bytes) > offset:
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with open(tmp_path, 'r+b') as f:
+            f.write(STORE_MAGIC)
+            f.write(struct.pack('<I', len(header_bytes)))
+            f.write(header_bytes)
+            f.truncate(offset + count * int(np.prod(shape)))
+
+        os.replace(tmp_path, final_path)
+
+    def release(self):
+        if self._source is not None:
+            self._source.release()
@@ -0,0 +1,217 @@
+"""
+Background prefetching for lockstep video decoding.
+
+Decoding and metric computation otherwise run back to back on one thread,
+so the CPU idles in OpenCV decode while SSIM/LPIPS wait and vice versa.
+PrefetchingFrameReader runs each frame reader on its own thread and hands
+lockstep frame tuples to the consumer through bounded queues, so decode
+overlaps with metric computation while memory stays capped at ``depth``
+frames per video.
+
+Lockstep semantics (shared with iter_lockstep): the first reader is the
+reference. Iteration stops when the reference is exhausted or when every
+other reader is exhausted; readers that end earlier yield None from then on.
+With two readers this is exactly ``zip(reader1, reader2)``. A reference that
+sets ``drain_on_early_stop`` (a frame store being filled) is read to its end
+even when the other readers stop first.
+"""
+
+import queue
+import threading
+import time
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+_END = object()
+
+
+def iter_lockstep(readers: Sequence) -> Iterator[Tuple[Optional[object], ...]]:
+    """
+    Iterate readers in lockstep on the calling thread.
+
+    Args:
+        readers: Reference reader followed by one or more other readers
+
+    Yields:
+        Tuples with one item per reader (None for readers that already ended)
+    """
+    iterators = [iter(reader) for reader in readers]
+    active = [True] * len(iterators)
+
+    for item in iterators[0]:
+        items = [item]
+        for slot in range(1, len(iterators)):
+            other = next(iterators[slot], None) if active[slot] else None
+            if other is None:
+                active[slot] = False
+            items.append(other)
+
+        if not any(active[1:]):
+            if getattr(readers[0], 'drain_on_early_stop', False):
+                for _ in iterators[0]:
+                    pass
+            return
+        yield tuple(items)
+
+
+class _ProducerError:
+    """Wraps an exception raised on a decode thread so it can be re-raised by the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class PrefetchingFrameReader:
+    """
+    Decode several frame streams on background threads into bounded queues.
+
+    Iterating yields the same tuples as iter_lockstep(readers). Producers block
+    when their queue holds ``depth`` frames (backpressure), so at most
+    ``depth + 1`` decoded frames per video are alive at any time.
+
+    Queue occupancy and wait times are recorded so callers can tell whether a
+    run is decode-bound (consumer waits for frames) or compute-bound (decoders
+    wait for free queue slots). See stats().
+    """
+
+    def __init__(self, readers: Sequence, depth: int = 8):
+        """
+        Args:
+            readers: Reference reader followed by one or more other readers
+                (e.g. frame sources)
+            depth: Maximum number of decoded items buffered per stream
+        """
+        if depth < 1:
+            raise ValueError(f"depth must be >= 1, got {depth}")
+        if len(readers) < 2:
+            raise ValueError("PrefetchingFrameReader needs at least two readers")
+
+        self.readers = tuple(readers)
+        self.depth = depth
+
+        count = len(self.readers)
+        self._queues = tuple(queue.Queue(maxsize=depth) for _ in range(count))
+        self._stop = threading.Event()
+        self._threads = []
+
+        # Occupancy / wait accounting
+        self._tuples_requested = 0
+        self._occupancy_total = 0
+        self._tuples_waited = 0
+        self._consumer_wait = 0.0
+        self._producer_puts = [0] * count
+        self._producer_blocked = [0] * count
+        self._producer_wait = [0.0] * count
+
+    def _produce(self, slot: int):
+        try:
+            for item in self.readers[slot]:
+                if not self._put(slot, item):
+                    return
+        except Exception as e:
+            self._put(slot, _ProducerError(e))
+            return
+        self._put(slot, _END)
+
+    def _put(self, slot: int, item) -> bool:
+        """Put with backpressure; returns False if the reader was closed while waiting."""
+        q = self._queues[slot]
+        self._producer_puts[slot] += 1
+        if q.full():
+            self._producer_blocked[slot] += 1
+
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            self._producer_wait[slot] += time.perf_counter() - start
+            return True
+        return False
+
+    def _get(self, slot: int):
+        item = self._queues[slot].get()
+        if isinstance(item, _ProducerError):
+            raise item.error
+        return item
+
+    def __iter__(self) -> Iterator[Tuple]:
+        self._threads = [
+            threading.Thread(target=self._produce, args=(slot,), daemon=True,
+                             name=f"frame-prefetch-{slot}")
+            for slot in range(len(self.readers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        active = [True] * len(self.readers)
+
+        try:
+            while True:
+                # Tuples ready right now = the shortest queue among live streams
+                occupancy = min(self._queues[slot].qsize()
+                                for slot in range(len(active)) if active[slot])
+                self._tuples_requested += 1
+                self._occupancy_total += occupancy
+                if occupancy == 0:
+                    self._tuples_waited += 1
+
+                start = time.perf_counter()
+                reference = self._get(0)
+                if reference is _END:
+                    return
+
+                items = [reference]
+                for slot in range(1, len(active)):
+                    item = self._get(slot) if active[slot] else _END
+                    if item is _END:
+                        active[slot] = False
+                        item = None
+                    items.append(item)
+                self._consumer_wait += time.perf_counter() - start
+
+                if not any(active[1:]):
+                    if getattr(self.readers[0], 'drain_on_early_stop', False):
+                        while self._get(0) is not _END:
+                            pass
+                    return
+                yield tuple(items)
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop decode threads and discard buffered frames."""
+        self._stop.set()
+        for q in self._queues:
+            try:
+                while True:
+                    q.get_nowait()
+            except queue.Empty:
+                pass
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def stats(self) -> Dict:
+        """
+        Summarize queue occupancy and waiting.
+
+        Returns:
+            Dict with queue depth, mean occupancy (frame tuples ready), the
+            fraction of requests that found nothing ready, the fraction of
+            producer puts that found their queue full, wait times, and a
+            'bound' verdict ('decode' or 'compute').
+        """
+        requested = max(self._tuples_requested, 1)
+        puts = max(sum(self._producer_puts), 1)
+        producer_wait = max(self._producer_wait)
+
+        return {
+            'depth': self.depth,
+            'mean_occupancy': round(self._occupancy_total / requested, 3),
+            'empty_fraction': round(self._tuples_waited / requested, 3),
+            'full_fraction': round(sum(self._producer_blocked) / puts, 3),
+            'consumer_wait_seconds': round(self._consumer_wait, 3),
+            'producer_wait_seconds': round(producer_wait, 3),
+            'bound': 'decode' if self._consumer_wait > producer_wait else 'compute'
+        }
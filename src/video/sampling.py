@@ -0,0 +1,181 @@
+"""
+Sampled video decoding.
+
+Most analyses only measure every Nth frame (``sample_rate``). Reading every
+frame with ``cv2.VideoCapture.read()`` pays the full decode + BGR conversion
+cost for frames that are thrown away. The reader here advances over skipped
+frames with ``grab()`` (decode only, no color conversion or copy into Python)
+and only ``retrieve()``s the frames that are actually measured.
+
+This is the 'opencv' frame source backend (see sources.py).
+"""
+
+from typing import Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.video.sources import FrameSource
+
+# OpenCV's FFmpeg backend starts a seek this many frames before the requested
+# frame (then decodes forward), so it only skips work when the keyframe before
+# that point lies ahead of the current position
+OPENCV_SEEK_BACKOFF = 16
+
+
+class SampledFrameReader(FrameSource):
+    """
+    Iterate over every Nth frame of a video, retrieving only sampled frames.
+
+    Yields ``(frame_index, frame)`` tuples where ``frame_index`` is the index
+    of the frame in the source video. The sequence of yielded frames is
+    identical to reading every frame with ``cap.read()`` and keeping those
+    where ``frame_index % sample_rate == 0``.
+
+    When ``seek_threshold`` is set, gaps larger than that many frames are
+    crossed with ``cap.set(CAP_PROP_POS_FRAMES, ...)`` instead of grabbing
+    frame by frame. OpenCV seeks to the preceding keyframe and decodes
+    forward, so this only pays off when the gap spans a keyframe (e.g. large
+    sample rates on short-GOP recordings). Seeking is disabled by default
+    because container timestamps can make OpenCV seeks off by a frame.
+
+    With a frame index (see frame_index.py), seek_threshold is not used:
+    the reader seeks by timestamp whenever the seek would start decoding at
+    a keyframe ahead of the current position, and checks the timestamp of
+    the frame it lands on against the index, so seeks are frame-exact. If a
+    landing cannot be matched, the reader reopens the video and stops seeking.
+    """
+
+    backend = 'opencv'
+
+    def __init__(self, video_path: str, sample_rate: int = 1,
+                 max_frames: Optional[int] = None, seek_threshold: int = 0,
+                 crop: Optional[Tuple[int, int, int, int]] = None, pix_fmt: str = 'bgr24'):
+        """
+        Open a video for sampled reading.
+
+        Args:
+            video_path: Path to video file
+            sample_rate: Yield every Nth frame (1 = all frames)
+            max_frames: Stop before this frame index (default: container frame count)
+            seek_threshold: Seek instead of grabbing when the gap to the next sampled
+                frame exceeds this many frames (0 = never seek)
+            crop: Only yield this (x, y, width, height) region (copied out of the
+                decoded frame, so the full frame is released right away)
+            pix_fmt: Output pixel format ('bgr24', 'rgb24' or 'gray')
+        """
+        self.cap = None
+        self.seek_threshold = seek_threshold
+        self.position = 0  # Index of the next frame the decoder will return
+        self._index_seeks = True
+        super().__init__(video_path, sample_rate, max_frames, crop=crop, pix_fmt=pix_fmt)
+
+        # Decode counters (useful to verify how much work was skipped)
+        self.stats = {'grabbed': 0, 'retrieved': 0, 'seeks': 0}
+
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.media_path)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Cannot open video: {self.media_path}")
+
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def _should_seek(self, target: int) -> bool:
+        if target < self.position:
+            return True  # Backward (random access)
+        if self.index is not None and self._index_seeks:
+            return self.index.keyframe_before(target - OPENCV_SEEK_BACKOFF) > self.position
+        return bool(self.seek_threshold) and target - self.position > self.seek_threshold
+
+    def _seek(self, target: int):
+        """Seek to target (with a frame index: at or before it, landing frame grabbed)."""
+        self.stats['seeks'] += 1
+        if self.index is None or not self._index_seeks:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            self.position = target
+            return
+
+        # Halfway from the previous frame, so rounding never lands past target
+        self.cap.set(cv2.CAP_PROP_POS_MSEC, self.index.seek_time(target) * 1000)
+        landed = None
+        if self.cap.grab():
+            landed = self.index.frame_at_time(self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000)
+
+        if landed is None or landed > target:
+            # Timestamps don't match the index: decode from the start instead
+            self.cap.release()
+            self.cap = cv2.VideoCapture(self.media_path)
+            self.position = 0
+            self._index_seeks = False
+            return
+        self.position = landed + 1
+
+    def _grab(self, target: int) -> bool:
+        """Advance until the last grabbed frame is target; skipped frames are not converted."""
+        if self._should_seek(target):
+            self._seek(target)
+
+        while self.position <= target:
+            if not self.cap.grab():
+                return False
+            if self.position < target:
+                self.stats['grabbed'] += 1
+            self.position += 1
+        return True
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        # Trim manifests start at start_frame; frames before it are skipped like unsampled frames
+        for target in range(self.start_frame, self.start_frame + self.max_frames, self.sample_rate):
+            if not self._grab(target):
+                return
+            ret, frame = self.cap.retrieve()
+            if not ret:
+                return
+            self.stats['retrieved'] += 1
+
+            yield target - self.start_frame, self._convert(frame)
+
+    def read_at(self, frame_idx: int) -> Optional[np.ndarray]:
+        """
+        Read one frame by seeking.
+
+        Args:
+            frame_idx: Frame index (relative to start_frame for trim manifests)
+
+        Returns:
+            Converted frame or None if it cannot be read
+        """
+        target = self.start_frame + frame_idx
+        if self.index is None and target != self.position:
+            self._seek(target)  # Container seek; grabbing forward would decode everything before it
+
+        if not self._grab(target):
+            return None
+        ret, frame = self.cap.retrieve()
+        if not ret:
+            return None
+        self.stats['retrieved'] += 1
+        return self._convert(frame)
+
+    def _convert(self, frame: np.ndarray) -> np.ndarray:
+        """Apply crop and pixel format conversion to a retrieved BGR frame."""
+        if self.crop is not None:
+            x, y, w, h = self.crop
+            frame = frame[y:y+h, x:x+w]
+
+        if self.pix_fmt == 'gray':
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.pix_fmt == 'rgb24':
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if self.crop is not None:
+            return frame.copy()  # Don't keep the full decoded frame alive through the view
+        return frame
+
+    def release(self):
+        """Release the underlying capture."""
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
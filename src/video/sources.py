@@ -0,0 +1,282 @@
+"""
+Pluggable frame sources.
+
+A frame source iterates over the sampled frames of one video and yields
+``(frame_index, frame)`` tuples, where ``frame_index`` is the index of the
+frame in the source video and ``frame`` is an (H, W, C) uint8 array
+(BGR by default, matching OpenCV).
+
+Backends:
+- opencv: cv2.VideoCapture with grab()/retrieve() skipping (see sampling.py)
+- ffmpeg: FFmpeg subprocess streaming rawvideo over a pipe (see ffmpeg_pipe.py),
+  with multi-threaded decode and sampling done by a ``select`` filter
+
+Sources can crop to a region of interest (``crop=(x, y, w, h)``) and convert
+to another pixel format (``pix_fmt``). OCR-style workloads that only look at a
+small ROI then never hold full frames in Python; with the ffmpeg backend the
+crop happens in the filter graph before color conversion, so only ROI pixels
+are converted and piped. iter_frame_batches() groups ROI frames into compact
+(N, H, W[, C]) uint8 stacks.
+
+Every source also accepts a trim manifest (``*.trim.json``, see
+trim_manifest.py) in place of a video: it decodes the untrimmed original and
+yields only the manifest's frame range, numbered from 0.
+
+When a video has a frame index sidecar (``<video>.fidx``, see
+frame_index.py), sources take the exact frame count and frame rate from it
+instead of the container estimates, and seek by keyframe (opencv) or
+timestamp (ffmpeg) instead of decoding up to a trim start.
+
+Use open_frame_source() to create a source from analysis settings.
+"""
+
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.video.frame_index import load_frame_index
+from src.video.trim_manifest import resolve_video
+
+FRAME_SOURCE_BACKENDS = ('opencv', 'ffmpeg')
+
+# Output pixel formats and their channel counts
+PIXEL_FORMATS = {'bgr24': 3, 'rgb24': 3, 'gray': 1}
+
+
+class FrameSource:
+    """
+    Base class for frame sources.
+
+    Subclasses implement __iter__() and may override _open() and release().
+    Container metadata (frame_count, fps, width, height) is available right
+    after construction; decoding starts when iteration begins. width/height
+    are the full video size; frame_shape is the shape of yielded frames.
+
+    ``video_path`` may be a trim manifest. Backends then decode
+    ``media_path`` and yield its frames from ``start_frame`` on, with frame
+    indices relative to ``start_frame``; frame_count is the trimmed length.
+
+    ``index`` is the FrameIndex of media_path, or None if it has no index
+    sidecar.
+    """
+
+    backend = None
+
+    def __init__(self, video_path: str, sample_rate: int = 1, max_frames: Optional[int] = None,
+                 crop: Optional[Tuple[int, int, int, int]] = None, pix_fmt: str = 'bgr24'):
+        """
+        Args:
+            video_path: Path to video file or trim manifest
+            sample_rate: Yield every Nth frame (1 = all frames)
+            max_frames: Stop before this frame index (default: container frame count)
+            crop: Only yield this (x, y, width, height) region of each frame
+            pix_fmt: Output pixel format ('bgr24', 'rgb24' or 'gray')
+        """
+        if sample_rate < 1:
+            raise ValueError(f"sample_rate must be >= 1, got {sample_rate}")
+        if pix_fmt not in PIXEL_FORMATS:
+            raise ValueError(f"Unsupported pix_fmt: {pix_fmt}. Use one of: {', '.join(PIXEL_FORMATS)}")
+
+        self.video_path = str(video_path)
+        self.sample_rate = sample_rate
+        self.pix_fmt = pix_fmt
+        self.media_path, self.start_frame, trimmed_count = resolve_video(self.video_path)
+
+        self.frame_count = 0
+        self.fps = 0.0
+        self.width = 0
+        self.height = 0
+        self._open()
+
+        self.index = load_frame_index(self.media_path)
+        if self.index is not None:
+            # Exact packet count and average rate instead of container estimates
+            self.frame_count = self.index.frame_count
+            self.fps = self.index.fps or self.fps
+
+        if trimmed_count is not None:
+            self.frame_count = max(0, min(trimmed_count, self.frame_count - self.start_frame))
+
+        self.max_frames = self.frame_count if max_frames is None else min(max_frames, self.frame_count)
+        self.crop = self._clip_crop(crop) if crop is not None else None
+
+        # Backend-specific decode counters
+        self.stats = {}
+
+    def _clip_crop(self, crop: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+        """Clip a crop rectangle to the frame, like slicing frame[y:y+h, x:x+w] would."""
+        x, y, w, h = (int(v) for v in crop)
+        if x < 0 or y < 0:
+            raise ValueError(f"Crop origin must be inside the frame, got x={x}, y={y}")
+
+        w = min(w, self.width - x)
+        h = min(h, self.height - y)
+        if w <= 0 or h <= 0:
+            raise ValueError(f"Crop {crop} lies outside the {self.width}x{self.height} frame")
+        return (x, y, w, h)
+
+    @property
+    def frame_shape(self) -> Tuple[int, ...]:
+        """Shape of the yielded frames (after cropping and pixel format conversion)."""
+        width, height = (self.crop[2], self.crop[3]) if self.crop else (self.width, self.height)
+        channels = PIXEL_FORMATS[self.pix_fmt]
+        if channels == 1:
+            return (height, width)
+        return (height, width, channels)
+
+    def _open(self):
+        """Read container metadata of media_path. Default implementation probes with OpenCV."""
+        cap = cv2.VideoCapture(self.media_path)
+        if not cap.isOpened():
+            raise RuntimeError(f"Cannot open video: {self.media_path}")
+
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = cap.get(cv2.CAP_PROP_FPS)
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        raise NotImplementedError
+
+    def release(self):
+        """Release decoder resources."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+def probe_video(video_path: str) -> dict:
+    """
+    Read video metadata without decoding (trim manifests report the trimmed range).
+
+    Returns:
+        Dictionary with frame_count, fps, width, height
+    """
+    source = FrameSource(video_path)
+    return {'frame_count': source.frame_count, 'fps': source.fps,
+            'width': source.width, 'height': source.height}
+
+
+def read_frame(video_path: str, frame_idx: int = 0) -> Optional[np.ndarray]:
+    """
+    Read a single BGR frame by seeking (for previews and ROI detection).
+
+    With a frame index the read is frame-exact (keyframe seek, then decode
+    forward); without one it is a container seek.
+
+    Args:
+        video_path: Path to video file or trim manifest
+        frame_idx: Frame index (relative to the trim start for manifests)
+
+    Returns:
+        Frame or None if it cannot be read
+    """
+    from src.video.sampling import SampledFrameReader
+
+    try:
+        with SampledFrameReader(video_path) as reader:
+            return reader.read_at(frame_idx)
+    except RuntimeError:
+        return None
+
+
+def iter_frame_batches(source, batch_size: int) -> Iterator[Tuple[List[int], np.ndarray]]:
+    """
+    Group frames of a source into stacked batches.
+
+    Frames are copied into one contiguous array per batch, so the source may
+    reuse its buffers. Intended for small (ROI-cropped) frames.
+
+    Args:
+        source: Iterable of (frame_index, frame) tuples, e.g. a FrameSource
+        batch_size: Maximum frames per batch
+
+    Yields:
+        (frame_indices, frames) with frames shaped (N, H, W[, C])
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+
+    indices = []
+    stack = None
+    for frame_idx, frame in source:
+        if stack is None:
+            stack = np.empty((batch_size,) + frame.shape, dtype=frame.dtype)
+        stack[len(indices)] = frame
+        indices.append(frame_idx)
+
+        if len(indices) == batch_size:
+            yield indices, stack
+            indices = []
+            stack = None
+
+    if indices:
+        yield indices, stack[:len(indices)]
+
+
+def open_frame_source(
+    video_path: str,
+    backend: str = 'opencv',
+    sample_rate: int = 1,
+    max_frames: Optional[int] = None,
+    seek_threshold: int = 0,
+    threads: int = 0,
+    buffer_count: int = 0,
+    frame_store=None,
+    crop: Optional[Tuple[int, int, int, int]] = None,
+    pix_fmt: str = 'bgr24'
+) -> FrameSource:
+    """
+    Create a frame source for a video.
+
+    Args:
+        video_path: Path to video file or trim manifest (.trim.json)
+        backend: 'opencv' or 'ffmpeg'
+        sample_rate: Yield every Nth frame (1 = all frames)
+        max_frames: Stop before this frame index (default: container frame count)
+        seek_threshold: (opencv) Seek over gaps larger than this many frames (0 = never)
+        threads: (ffmpeg) Decoder threads (0 = FFmpeg auto, one per core)
+        buffer_count: (ffmpeg) Size of the preallocated frame buffer ring
+            (0 = allocate a new array per frame)
+        frame_store: Optional DecodedFrameStore; frames are served from it when
+            stored and written to it after the first decode
+        crop: Only decode/yield this (x, y, width, height) region. The ffmpeg
+            backend crops before color conversion; opencv crops right after retrieve()
+        pix_fmt: Output pixel format ('bgr24', 'rgb24' or 'gray')
+
+    Returns:
+        FrameSource instance
+    """
+    if not Path(video_path).exists():
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+
+    if frame_store is not None and (crop is not None or pix_fmt != 'bgr24'):
+        raise ValueError("frame_store only stores full bgr24 frames; do not combine it with crop/pix_fmt")
+
+    if frame_store is not None:
+        from src.video.frame_store import StoreBackedFrameSource
+        return StoreBackedFrameSource(video_path, frame_store, sample_rate, max_frames=max_frames,
+                                      backend=backend, seek_threshold=seek_threshold,
+                                      threads=threads, buffer_count=buffer_count)
+
+    if backend == 'opencv':
+        from src.video.sampling import SampledFrameReader
+        return SampledFrameReader(video_path, sample_rate, max_frames=max_frames,
+                                  seek_threshold=seek_threshold, crop=crop, pix_fmt=pix_fmt)
+
+    if backend == 'ffmpeg':
+        from src.video.ffmpeg_pipe import FFmpegPipeFrameSource
+        return FFmpegPipeFrameSource(video_path, sample_rate, max_frames=max_frames,
+                                     threads=threads, buffer_count=buffer_count,
+                                     crop=crop, pix_fmt=pix_fmt)
+
+    raise ValueError(f"Unknown frame source backend: {backend}. "
+                     f"Use one of: {', '.join(FRAME_SOURCE_BACKENDS)}")
@@ -0,0 +1,154 @@
+"""
+Virtual trims: sidecar manifests describing a frame range of a recording.
+
+Instead of re-encoding ``recordings/<game>/trimmed/<video>.mp4``,
+trim_by_marker.py can write ``<video>.trim.json`` next to where the trimmed
+video would go. Frame sources opened on a manifest decode the untrimmed
+original and yield only the manifest's frames, numbered from 0 as if the
+trimmed file existed, so the comparison engine and FPS OCR accept manifests
+and videos interchangeably.
+
+Manifest format (JSON):
+
+    {
+      "version": 1,
+      "source": "../1080p_dlaa_run1.mp4",   # relative to the manifest directory
+      "first_frame": 412,
+      "last_frame": 9871,                    # inclusive
+      "fingerprint": "<file_fingerprint() of the source>",
+      "fps": 60.0
+    }
+
+The fingerprint is checked when the manifest is loaded, so a manifest never
+silently applies to a re-recorded or re-encoded source.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+from src.video.fingerprint import file_fingerprint
+
+TRIM_MANIFEST_SUFFIX = '.trim.json'
+MANIFEST_VERSION = 1
+
+
+def is_trim_manifest(path: str) -> bool:
+    """True if path names a trim manifest (by suffix)."""
+    return str(path).endswith(TRIM_MANIFEST_SUFFIX)
+
+
+def manifest_path_for(output_path: str) -> str:
+    """Manifest path replacing a trimmed video path (``x.mp4`` -> ``x.trim.json``)."""
+    if is_trim_manifest(output_path):
+        return str(output_path)
+    return str(Path(output_path).with_suffix(TRIM_MANIFEST_SUFFIX))
+
+
+class TrimManifest:
+    """Frame range [first_frame, last_frame] of a source video."""
+
+    def __init__(self, source_path: str, first_frame: int, last_frame: int,
+                 fingerprint: str, fps: float = 0.0):
+        self.source_path = source_path
+        self.first_frame = first_frame
+        self.last_frame = last_frame
+        self.fingerprint = fingerprint
+        self.fps = fps
+
+    @property
+    def frame_count(self) -> int:
+        return self.last_frame - self.first_frame + 1
+
+
+def write_trim_manifest(manifest_path: str, source_path: str, first_frame: int, last_frame: int,
+                        fps: float = 0.0) -> TrimManifest:
+    """
+    Write a trim manifest.
+
+    Args:
+        manifest_path: Output path (should end with .trim.json)
+        source_path: Untrimmed source video
+        first_frame: First frame to include
+        last_frame: Last frame to include
+        fps: Source frame rate (informational)
+
+    Returns:
+        TrimManifest
+    """
+    if first_frame < 0 or last_frame < first_frame:
+        raise ValueError(f"Invalid trim range: {first_frame}-{last_frame}")
+
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+    manifest = TrimManifest(str(source_path), first_frame, last_frame,
+                            file_fingerprint(source_path), fps)
+
+    # Relative source path keeps the recordings folder relocatable
+    source = os.path.relpath(Path(source_path).resolve(), manifest_path.parent.resolve())
+    data = {
+        'version': MANIFEST_VERSION,
+        'source': Path(source).as_posix(),
+        'first_frame': first_frame,
+        'last_frame': last_frame,
+        'fingerprint': manifest.fingerprint,
+        'fps': fps
+    }
+
+    tmp_path = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.partial")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    return manifest
+
+
+def load_trim_manifest(manifest_path: str, verify: bool = True) -> TrimManifest:
+    """
+    Load a trim manifest.
+
+    Args:
+        manifest_path: Path to .trim.json file
+        verify: Check that the source still matches the recorded fingerprint
+
+    Returns:
+        TrimManifest with an absolute/resolved source path
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path) as f:
+        data = json.load(f)
+
+    if data.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported trim manifest version in {manifest_path}: {data.get('version')}")
+
+    source_path = Path(data['source'])
+    if not source_path.is_absolute():
+        source_path = manifest_path.parent / source_path
+
+    if not source_path.exists():
+        raise FileNotFoundError(f"Source video of trim manifest {manifest_path} not found: {source_path}")
+
+    manifest = TrimManifest(str(source_path), int(data['first_frame']), int(data['last_frame']),
+                            data['fingerprint'], float(data.get('fps', 0.0)))
+
+    if verify and file_fingerprint(str(source_path)) != manifest.fingerprint:
+        raise ValueError(f"Source video {source_path} changed since trim manifest {manifest_path} was written")
+
+    return manifest
+
+
+def resolve_video(video_path: str) -> Tuple[str, int, Optional[int]]:
+    """
+    Resolve a video or trim manifest path to the file that has to be decoded.
+
+    Returns:
+        (media_path, start_frame, frame_count); frame_count is None for plain
+        videos (use the container frame count)
+    """
+    if not is_trim_manifest(video_path):
+        return str(video_path), 0, None
+
+    manifest = load_trim_manifest(video_path)
+    return manifest.source_path, manifest.first_frame, manifest.frame_count